@@ -0,0 +1,240 @@
+"""
+XASE SDK - Recording Path Benchmarks
+
+Measures ``XaseClient.record`` against a local stand-in API server:
+records/sec, caller-side ``record()`` overhead (µs), flush time and peak
+memory, for synchronous and fire-and-forget modes.
+
+Usage:
+    python benchmarks/bench_record.py
+    python benchmarks/bench_record.py --latency-ms 20 --error-rate 0.01
+    python benchmarks/bench_record.py --baseline benchmarks/baseline.json   # fail on regressions
+    python benchmarks/bench_record.py --update-baseline
+
+Exits with status 1 when a gated metric regresses by more than ``--threshold``
+relative to the baseline.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from server import StandInServer  # noqa: E402
+from xase import XaseClient  # noqa: E402
+from xase.types import XaseError  # noqa: E402
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# metric -> True if higher is better. Only these fail CI; the rest are reported.
+GATED_METRICS = {
+    "records_per_s": True,
+    "record_overhead_us_p50": False,
+    "peak_memory_mb": False,
+}
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "sync": {"fire_and_forget": False},
+    "fire_and_forget": {"fire_and_forget": True},
+    "fire_and_forget_batched": {
+        "fire_and_forget": True,
+        "batch_size": 100,
+        "batch_linger_ms": 5.0,
+        "queue_workers": 4,
+    },
+}
+
+
+def _payload(i: int) -> Dict[str, Any]:
+    return {
+        "policy": "credit_policy_v4",
+        "input": {
+            "user_id": f"u_{i:08d}",
+            "amount": 50000,
+            "credit_score": 720,
+            "features": list(range(16)),
+        },
+        "output": {"decision": "APPROVED" if i % 7 else "DENIED", "score": 0.87},
+        "confidence": 0.91,
+        "decision_type": "loan_approval",
+    }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+def _run_once(
+    base_url: str, options: Dict[str, Any], records: int
+) -> Tuple[List[float], float, float]:
+    """Record ``records`` payloads; returns per-call durations (s), record time and flush time."""
+    client = XaseClient({
+        "api_key": "xase_pk_bench",
+        "base_url": base_url,
+        "max_retries": 3,
+        "queue_max_size": max(10000, records),
+        **options,
+    })
+    payloads = [_payload(i) for i in range(records)]
+    durations: List[float] = []
+    record = client.record
+    clock = time.perf_counter
+    
+    gc.collect()
+    start = clock()
+    for payload in payloads:
+        t0 = clock()
+        try:
+            record(payload)
+        except XaseError:
+            # Injected errors fail sync records; only the call's cost is measured
+            pass
+        durations.append(clock() - t0)
+    record_s = clock() - start
+    
+    flush_start = clock()
+    try:
+        client.flush(timeout_s=120.0)
+    finally:
+        flush_s = clock() - flush_start
+        client.close()
+    return durations, record_s, flush_s
+
+
+def _measure(base_url: str, options: Dict[str, Any], records: int) -> Dict[str, float]:
+    durations, record_s, flush_s = _run_once(base_url, options, records)
+    durations.sort()
+    
+    # Separate pass: tracemalloc slows allocation-heavy code and would skew timings
+    tracemalloc.start()
+    _run_once(base_url, options, records)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        "records": records,
+        "records_per_s": records / (record_s + flush_s),
+        "record_overhead_us_p50": _percentile(durations, 0.50) * 1e6,
+        "record_overhead_us_p99": _percentile(durations, 0.99) * 1e6,
+        "record_s": record_s,
+        "flush_s": flush_s,
+        "peak_memory_mb": peak / (1024 * 1024),
+    }
+
+
+def run(records: int, sync_records: int, latency_ms: float, error_rate: float) -> Dict[str, Any]:
+    """Run all scenarios against a fresh stand-in server."""
+    results: Dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_ms": latency_ms,
+            "error_rate": error_rate,
+        },
+        "scenarios": {},
+    }
+    with StandInServer(latency_ms=latency_ms, error_rate=error_rate) as server:
+        for name, options in SCENARIOS.items():
+            count = sync_records if not options["fire_and_forget"] else records
+            results["scenarios"][name] = _measure(server.base_url, options, count)
+    return results
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+) -> List[str]:
+    """Return a description of every gated metric that regressed beyond ``threshold``."""
+    regressions = []
+    for scenario, metrics in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(scenario)
+        if not base:
+            continue
+        for metric, higher_is_better in GATED_METRICS.items():
+            old, new = base.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > threshold:
+                regressions.append(
+                    f"{scenario}.{metric}: {old:.2f} -> {new:.2f} ({change:+.0%} worse)"
+                )
+    return regressions
+
+
+def _print_table(results: Dict[str, Any]) -> None:
+    columns: List[Tuple[str, str, Callable[[float], str]]] = [
+        ("records/s", "records_per_s", lambda v: f"{v:,.0f}"),
+        ("p50 µs", "record_overhead_us_p50", lambda v: f"{v:,.1f}"),
+        ("p99 µs", "record_overhead_us_p99", lambda v: f"{v:,.1f}"),
+        ("flush s", "flush_s", lambda v: f"{v:.3f}"),
+        ("peak MB", "peak_memory_mb", lambda v: f"{v:.1f}"),
+    ]
+    print(f"{'scenario':<26}" + "".join(f"{title:>12}" for title, _, _ in columns))
+    for name, metrics in results["scenarios"].items():
+        print(f"{name:<26}" + "".join(f"{fmt(metrics[key]):>12}" for _, key, fmt in columns))
+
+
+def main(argv: Any = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--records", type=int, default=5000, help="records per fire-and-forget scenario"
+    )
+    parser.add_argument(
+        "--sync-records", type=int, default=300, help="records in the sync scenario"
+    )
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="stand-in server latency")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of requests answered with 503"
+    )
+    parser.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.3, help="allowed relative regression (0.3 = 30%%)"
+    )
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help=f"overwrite {DEFAULT_BASELINE}"
+    )
+    args = parser.parse_args(argv)
+    
+    results = run(args.records, args.sync_records, args.latency_ms, args.error_rate)
+    _print_table(results)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nPerformance regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+XASE SDK - Sidecar Receive Path Benchmarks
+
+Measures ``SidecarClient.get_segment`` against a local stand-in sidecar:
+throughput (MB/s) and peak memory allocated per segment, as a multiple of
+the segment size, for several segment sizes. ``v1-concat`` is the previous
+receive loop (``data += chunk``), kept here as the "before" reference.
+
+Usage:
+    python benchmarks/bench_sidecar.py
+    python benchmarks/bench_sidecar.py --sizes 65536,8388608 --total-mb 512
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+from stand_in_sidecar import StandInSidecar  # noqa: E402
+from xase.sidecar import SidecarClient  # noqa: E402
+
+
+class _ConcatClient(SidecarClient):
+    """The receive loop before recv_into, for comparison."""
+    
+    def _recv_exact(self, n: int, out: Any = None) -> bytes:  # type: ignore[override]
+        data = b''
+        while len(data) < n:
+            chunk = self.sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("Socket connection closed")
+            data += chunk
+        return data
+
+
+# name -> (client class, protocol, use a caller-provided buffer)
+VARIANTS: Dict[str, Tuple[type, str, bool]] = {
+    "v1-concat": (_ConcatClient, "v1", False),
+    "v1": (SidecarClient, "v1", False),
+    "v1-out": (SidecarClient, "v1", True),
+    "v2": (SidecarClient, "v2", False),
+    "v2-out": (SidecarClient, "v2", True),
+}
+
+
+def _fetch(client: SidecarClient, count: int, out: Optional[bytearray]) -> None:
+    for i in range(count):
+        client.get_segment(f"seg_{i:08d}", out=out)
+
+
+def _measure(socket_path: str, variant: str, size: int, count: int) -> Dict[str, float]:
+    client_class, protocol, use_out = VARIANTS[variant]
+    client = client_class(socket_path, protocol=protocol)
+    out = bytearray(size) if use_out else None
+    try:
+        _fetch(client, 2, out)  # connect and warm up
+        gc.collect()
+        start = time.perf_counter()
+        _fetch(client, count, out)
+        elapsed = time.perf_counter() - start
+        
+        # Separate pass: tracemalloc slows allocation and would skew timings
+        peaks: List[int] = []
+        tracemalloc.start()
+        for i in range(min(count, 20)):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            client.get_segment(f"seg_{i:08d}", out=out)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+    finally:
+        client.close()
+    
+    return {
+        "segment_bytes": size,
+        "segments": count,
+        "mb_per_s": count * size / elapsed / (1024 * 1024),
+        "peak_alloc_per_segment": sum(peaks) / len(peaks) / size,
+    }
+
+
+def run(sizes: List[int], total_mb: float) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            count = max(10, int(total_mb * 1024 * 1024 / size))
+            socket_path = os.path.join(directory, f"sidecar-{size}.sock")
+            payload = os.urandom(size)
+            segments = {f"seg_{i:08d}": payload for i in range(count)}
+            with StandInSidecar(socket_path, segments):
+                for variant in VARIANTS:
+                    results["scenarios"][f"{variant}@{size}"] = _measure(
+                        socket_path, variant, size, count
+                    )
+    return results
+
+
+def _print_table(results: Dict[str, Any]) -> None:
+    columns: List[Tuple[str, str, Callable[[float], str]]] = [
+        ("segment KB", "segment_bytes", lambda v: f"{v / 1024:,.0f}"),
+        ("MB/s", "mb_per_s", lambda v: f"{v:,.0f}"),
+        ("alloc x size", "peak_alloc_per_segment", lambda v: f"{v:.2f}"),
+    ]
+    print(f"{'scenario':<22}" + "".join(f"{title:>14}" for title, _, _ in columns))
+    for name, metrics in results["scenarios"].items():
+        print(f"{name:<22}" + "".join(f"{fmt(metrics[key]):>14}" for _, key, fmt in columns))
+
+
+def main(argv: Any = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes", default="65536,1048576,8388608", help="comma-separated segment sizes in bytes"
+    )
+    parser.add_argument("--total-mb", type=float, default=256.0, help="data fetched per scenario")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    args = parser.parse_args(argv)
+    
+    results = run([int(size) for size in args.sizes.split(",")], args.total_mb)
+    _print_table(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+XASE SDK - Stand-in API Server for Benchmarks
+
+Minimal local HTTP server answering ``POST /records`` and
+``POST /records/batch`` like the Xase API, with configurable latency and
+error rate. Used by the benchmark suite; not test doubles for API semantics.
+"""
+
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "StandInServer"
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment; avoids delayed-ACK stalls on keep-alive
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+    
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "zstd":
+            import zstandard  # type: ignore
+            body = zstandard.ZstdDecompressor().decompress(body)
+        
+        settings = self.server.settings
+        if settings["latency_ms"] > 0:
+            time.sleep(settings["latency_ms"] / 1000.0)
+        
+        if random.random() < settings["error_rate"]:
+            self._reply(503, {"error": "Service unavailable", "code": "UNAVAILABLE"})
+            return
+        
+        payload = json.loads(body or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+        
+        if self.path.endswith("/records/batch"):
+            records = payload.get("records", [])
+            with self.server.lock:
+                self.server.records += len(records)
+            self._reply(200, {"results": [self._result() for _ in records]})
+        else:
+            with self.server.lock:
+                self.server.records += 1
+            self._reply(200, self._result())
+    
+    def _result(self) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "transaction_id": f"txn_{random.getrandbits(48):012x}",
+            "receipt_url": "http://localhost/receipt",
+            "timestamp": "2024-01-01T00:00:00Z",
+            "record_hash": "0" * 64,
+            "chain_position": "chained",
+        }
+    
+    def _reply(self, status: int, data: Dict[str, Any]) -> None:
+        raw = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded local server; counts received requests and records."""
+    
+    daemon_threads = True
+    
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.settings = {"latency_ms": latency_ms, "error_rate": error_rate}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.records = 0
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+    
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+    
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -19,9 +19,12 @@ Example:
     ... })
 """
 
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 from .client import XaseClient
-from .training import GovernedDataset
-from .sidecar import SidecarClient, SidecarDataset
+from .context import register_context_provider, unregister_context_provider
+from .digest import payload_digest, verify_digest
 from .types import (
     RecordPayload,
     RecordResult,
@@ -29,10 +32,18 @@ from .types import (
     XaseError,
 )
 
+if TYPE_CHECKING:
+    from .async_client import AsyncXaseClient
+    from .async_sidecar import AsyncSidecarClient
+    from .sidecar import SidecarClient, SidecarDataset
+    from .training import GovernedDataset
+
 __version__ = "0.2.0"
 
 __all__ = [
     "XaseClient",
+    "AsyncXaseClient",
+    "AsyncSidecarClient",
     "GovernedDataset",
     "SidecarClient",
     "SidecarDataset",
@@ -40,4 +51,31 @@ __all__ = [
     "RecordResult",
     "XaseClientConfig",
     "XaseError",
+    "register_context_provider",
+    "unregister_context_provider",
+    "payload_digest",
+    "verify_digest",
 ]
+
+# Imported on first access: training pulls in torch, sidecar and the asyncio
+# client pull in httpx/asyncio, none of which record() needs.
+_LAZY_ATTRIBUTES = {
+    "AsyncXaseClient": ".async_client",
+    "AsyncSidecarClient": ".async_sidecar",
+    "GovernedDataset": ".training",
+    "SidecarClient": ".sidecar",
+    "SidecarDataset": ".sidecar",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
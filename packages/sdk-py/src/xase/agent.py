@@ -0,0 +1,357 @@
+"""
+XASE SDK - Local Aggregator Agent
+
+One agent per host receives records from every worker process over a Unix
+domain socket and ships them through a single client, so batches are larger
+and the host keeps one connection pool instead of one per worker.
+
+Run the agent:
+    XASE_API_KEY=xase_pk_... python -m xase.agent --socket /var/run/xase/agent.sock
+
+and point workers at it:
+    XaseClient({"api_key": "...", "agent_socket": "/var/run/xase/agent.sock"})
+
+Wire format: each record is a 4-byte big-endian length followed by
+``QueuedRecord.to_bytes()`` (idempotency key and the serialized API body), so
+the agent splices bodies into batches without re-serializing them.
+"""
+
+import logging
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from .queue import Queue, QueuedRecord
+from .types import XaseError
+
+if TYPE_CHECKING:
+    from .client import XaseClient
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_AGENT_SOCKET = "/var/run/xase/agent.sock"
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+def encode_frame(record: QueuedRecord) -> bytes:
+    """Frame a serialized record for the agent socket."""
+    data = record.to_bytes()
+    return FRAME_HEADER.pack(len(data)) + data
+
+
+class AgentSender:
+    """
+    Worker-side connection to the agent.
+    
+    ``send`` returns False when the agent cannot be reached so the caller can
+    fall back to its own queue; after a failure, reconnects are attempted at
+    most every ``reconnect_interval_s``. The connection is re-established in
+    forked children instead of sharing the parent's socket.
+    """
+    
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_AGENT_SOCKET,
+        timeout: float = 1.0,
+        reconnect_interval_s: float = 1.0,
+    ) -> None:
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.reconnect_interval_s = reconnect_interval_s
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._pid = os.getpid()
+        self._retry_at = 0.0
+        self._sent = 0
+        self._failed = 0
+    
+    def _after_fork(self) -> None:
+        # The inherited socket is shared with the parent; interleaved frames would
+        # corrupt the stream. The lock may have been held by a thread that no
+        # longer exists in this process.
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._lock = threading.Lock()
+        self._sock = None
+        self._retry_at = 0.0
+        self._pid = os.getpid()
+    
+    def _connect(self) -> Optional[socket.socket]:
+        """Open the connection (lock held); None while the agent is unreachable."""
+        if time.monotonic() < self._retry_at:
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            self._retry_at = time.monotonic() + self.reconnect_interval_s
+            logger.debug(f"Xase agent unreachable at {self.socket_path}: {e}")
+            return None
+        self._sock = sock
+        return sock
+    
+    def send(self, record: QueuedRecord) -> bool:
+        """Hand a record to the agent; False if it was not delivered."""
+        frame = encode_frame(record)
+        if self._pid != os.getpid():
+            self._after_fork()
+        
+        with self._lock:
+            sock = self._sock or self._connect()
+            if sock is None:
+                self._failed += 1
+                return False
+            try:
+                sock.sendall(frame)
+            except OSError as e:
+                # A partial frame may have been written; the agent discards it on EOF
+                logger.warning(f"Lost connection to Xase agent: {e}")
+                sock.close()
+                self._sock = None
+                self._retry_at = time.monotonic() + self.reconnect_interval_s
+                self._failed += 1
+                return False
+            self._sent += 1
+            return True
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get agent connection statistics."""
+        return {
+            "socket": self.socket_path,
+            "connected": self._sock is not None,
+            "sent": self._sent,
+            "failed": self._failed,
+        }
+
+
+class _AgentHandler(socketserver.BaseRequestHandler):
+    server: "_AgentServer"
+    
+    def handle(self) -> None:
+        agent = self.server.agent
+        agent._connection_opened()
+        rfile = self.request.makefile("rb", buffering=256 * 1024)
+        try:
+            while True:
+                header = rfile.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    return
+                (length,) = FRAME_HEADER.unpack(header)
+                if length > MAX_FRAME_BYTES:
+                    logger.warning(
+                        f"Closing agent connection: frame of {length} bytes exceeds limit"
+                    )
+                    agent._rejected(1)
+                    return
+                data = rfile.read(length)
+                if len(data) < length:
+                    return
+                agent.receive(data)
+        finally:
+            rfile.close()
+            agent._connection_closed()
+
+
+class _AgentServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    
+    def __init__(self, socket_path: str, agent: "Agent") -> None:
+        self.agent = agent
+        super().__init__(socket_path, _AgentHandler)
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Unlink a socket file nobody listens on; refuse to take over a live agent."""
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise XaseError(f"Agent socket path {path} exists and is not a socket", "INVALID_CONFIG")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except FileNotFoundError:
+        return
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise XaseError(f"An agent is already listening on {path}", "AGENT_RUNNING")
+
+
+class Agent:
+    """
+    Aggregator serving ``socket_path`` and forwarding records to ``client``'s queue.
+    
+    The client should run in fire-and-forget mode; its batching, compression,
+    spool and circuit breaker settings apply to records from all workers.
+    """
+    
+    def __init__(
+        self,
+        client: "XaseClient",
+        socket_path: str = DEFAULT_AGENT_SOCKET,
+        socket_mode: int = 0o660,
+    ) -> None:
+        if client.queue is None:
+            raise XaseError("The agent's client must use fire_and_forget mode", "INVALID_CONFIG")
+        
+        self.client = client
+        self.queue: Queue = client.queue
+        self.socket_path = socket_path
+        self._lock = threading.Lock()
+        self._received = 0
+        self._rejected_count = 0
+        self._connections = 0
+        
+        # A socket file left by a previous agent would make bind() fail
+        _remove_stale_socket(socket_path)
+        directory = os.path.dirname(socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._server = _AgentServer(socket_path, self)
+        os.chmod(socket_path, socket_mode)
+    
+    def receive(self, data: bytes) -> None:
+        """Enqueue one framed record."""
+        try:
+            record = QueuedRecord.from_bytes(data)
+            self.queue.enqueue_encoded(record, record.idempotency_key)
+        except (XaseError, struct.error, UnicodeDecodeError) as e:
+            logger.warning(f"Agent rejected a record: {e}")
+            self._rejected(1)
+            return
+        with self._lock:
+            self._received += 1
+    
+    def _rejected(self, n: int) -> None:
+        with self._lock:
+            self._rejected_count += n
+    
+    def _connection_opened(self) -> None:
+        with self._lock:
+            self._connections += 1
+    
+    def _connection_closed(self) -> None:
+        with self._lock:
+            self._connections -= 1
+    
+    def serve_forever(self) -> None:
+        logger.info(f"Xase agent listening on {self.socket_path}")
+        self._server.serve_forever()
+    
+    def shutdown(self) -> None:
+        """Stop accepting records; call from a thread other than serve_forever's."""
+        self._server.shutdown()
+    
+    def close(self, drain_timeout_s: float = 30.0) -> None:
+        """Close the socket, then drain (up to ``drain_timeout_s``) and close the client."""
+        self._server.server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+        self.client.close(drain_timeout_s)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get agent statistics, including the client's queue statistics."""
+        with self._lock:
+            stats: Dict[str, Any] = {
+                "connections": self._connections,
+                "received": self._received,
+                "rejected": self._rejected_count,
+            }
+        stats["client"] = self.client.get_stats()
+        return stats
+
+
+def main(argv: Any = None) -> int:
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="python -m xase.agent",
+        description=(
+            "Per-host Xase aggregator: batches records from local workers over a Unix socket."
+        ),
+    )
+    parser.add_argument("--socket", default=os.getenv("XASE_AGENT_SOCKET", DEFAULT_AGENT_SOCKET))
+    parser.add_argument(
+        "--socket-mode", type=lambda v: int(v, 8), default=0o660, help="octal permissions"
+    )
+    parser.add_argument("--api-key", default=os.getenv("XASE_API_KEY"))
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--batch-linger-ms", type=float, default=50.0)
+    parser.add_argument("--workers", type=int, default=2, help="sender threads")
+    parser.add_argument("--queue-max-size", type=int, default=100_000)
+    parser.add_argument("--compression", choices=["gzip", "zstd", "none"], default="gzip")
+    parser.add_argument("--spool-dir", default=None)
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(
+        level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    
+    from .client import XaseClient
+    
+    try:
+        client = XaseClient({
+            "api_key": args.api_key,
+            "base_url": args.base_url,
+            "fire_and_forget": True,
+            "batch_size": args.batch_size,
+            "batch_linger_ms": args.batch_linger_ms,
+            "queue_workers": args.workers,
+            "queue_max_size": args.queue_max_size,
+            "compression": None if args.compression == "none" else args.compression,
+            "spool_dir": args.spool_dir,
+            "handle_signals": False,
+        })
+        agent = Agent(client, args.socket, args.socket_mode)
+    except (XaseError, OSError) as e:
+        logger.error(f"Cannot start Xase agent: {e}")
+        return 1
+    
+    # Stop serving, then drain in close()
+    def _stop(signum: int, frame: Any) -> None:
+        threading.Thread(target=agent.shutdown, daemon=True).start()
+    
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    
+    try:
+        agent.serve_forever()
+    finally:
+        stats = agent.get_stats()
+        agent.close()
+        logger.info(
+            f"Xase agent stopped: received={stats['received']} rejected={stats['rejected']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+XASE SDK - Asyncio Client
+
+Native asyncio counterpart of ``XaseClient`` for FastAPI/uvicorn style services.
+Recording never blocks the event loop and needs no extra OS thread.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from .async_queue import AsyncQueue
+from .circuit import CircuitBreaker
+from .client import (
+    prepare_record,
+    resolve_config,
+    resolve_digester,
+    resolve_idempotency_key,
+    validate_payload,
+)
+from .dedup import DedupWindow, record_fingerprint
+from .http import AsyncHttpClient
+from .metrics import Metrics
+from .queue import build_record_body
+from .sampling import RecordGate
+from .serialization import resolve_serializer
+from .types import RecordPayload, RecordResult, XaseClientConfig, XaseError
+
+logger = logging.getLogger(__name__)
+
+# XaseClient options backed by threads or the disk spool, pinned to how the
+# asyncio client behaves: no spool (records are dropped while the circuit is
+# open) and callbacks run inline on the event loop
+_FIXED_OPTIONS: Dict[str, Any] = {
+    "spool_dir": None,
+    "circuit_fallback": "drop",
+    "callback_queue_size": 0,
+    "callback_batch_size": None,
+    "queue_preserve_order": False,
+    "agent_socket": None,
+}
+
+
+class AsyncXaseClient:
+    """
+    Asyncio client for recording AI decisions as immutable evidence.
+    
+    Example:
+        >>> async with AsyncXaseClient({"api_key": "xase_pk_..."}) as xase:
+        ...     await xase.record({
+        ...         "policy": "credit_policy_v4",
+        ...         "input": {"user_id": "u_001"},
+        ...         "output": {"decision": "APPROVED"},
+        ...     })
+    """
+    
+    def __init__(self, config: XaseClientConfig) -> None:
+        """Initialize AsyncXaseClient with configuration."""
+        self.config: Dict[str, Any] = resolve_config(config)
+        for key, value in _FIXED_OPTIONS.items():
+            if config.get(key, value) != value:
+                raise XaseError(f"AsyncXaseClient only supports {key}={value!r}", "INVALID_CONFIG")
+            self.config[key] = value
+        serializer = resolve_serializer(self.config["json_serializer"])
+        
+        self.metrics: Optional[Metrics] = None
+        if self.config["metrics"]:
+            self.metrics = Metrics()
+            if self.config["otel_meter"] is not None:
+                self.metrics.bind_opentelemetry(self.config["otel_meter"])
+        circuit_breaker = None
+        if self.config["circuit_breaker"]:
+            circuit_breaker = CircuitBreaker(
+                failure_threshold=self.config["circuit_failure_threshold"],
+                reset_timeout_s=self.config["circuit_reset_timeout"],
+            )
+        
+        self.gate: Optional[RecordGate] = None
+        if self.config["policy_rules"]:
+            self.gate = RecordGate(self.config["policy_rules"])
+        
+        self.dedup: Optional[DedupWindow] = None
+        if self.config["dedup_window_s"]:
+            self.dedup = DedupWindow(self.config["dedup_window_s"], self.config["dedup_max_keys"])
+        
+        self.digester = resolve_digester(self.config)
+        
+        self.http_client = AsyncHttpClient(
+            api_key=self.config["api_key"],
+            base_url=self.config["base_url"],
+            timeout=self.config["timeout"],
+            max_retries=self.config["max_retries"],
+            max_connections=self.config["max_connections"],
+            max_keepalive_connections=self.config["max_keepalive_connections"],
+            keepalive_expiry=self.config["keepalive_expiry"],
+            http2=self.config["http2"],
+            serializer=serializer,
+            compression=self.config["compression"],
+            compression_threshold=self.config["compression_threshold"],
+            compression_level=self.config["compression_level"],
+            circuit_breaker=circuit_breaker,
+            metrics=self.metrics,
+        )
+        
+        self.queue: Optional[AsyncQueue] = None
+        if self.config["fire_and_forget"]:
+            self.queue = AsyncQueue(
+                http_client=self.http_client,
+                max_size=self.config["queue_max_size"],
+                max_bytes=self.config["queue_max_bytes"],
+                on_error=self.config["on_error"],
+                on_success=self.config["on_success"],
+                batch_size=self.config["batch_size"],
+                batch_linger_ms=self.config["batch_linger_ms"],
+                num_workers=self.config["queue_workers"],
+                overflow_policy=self.config["overflow_policy"],
+                block_timeout_s=self.config["overflow_block_timeout"],
+                shed_threshold=self.config["shed_threshold"],
+                priority_fn=self.config["priority_fn"],
+                serializer=serializer,
+                metrics=self.metrics,
+                dedup=self.dedup,
+            )
+    
+    async def record(
+        self,
+        payload: RecordPayload,
+        *,
+        idempotency_key: Optional[str] = None,
+        skip_queue: bool = False,
+    ) -> Optional[RecordResult]:
+        """
+        Record an AI decision as immutable evidence.
+        
+        Args:
+            payload: Decision data (policy, input, output, etc.)
+            idempotency_key: Custom idempotency key (UUID or alphanumeric 16-64 chars)
+            skip_queue: Force synchronous mode even with fire_and_forget enabled
+        
+        Returns:
+            RecordResult if sync mode, None if fire-and-forget, sampled out,
+            throttled or suppressed as a duplicate
+        """
+        validate_payload(payload)
+        final_idempotency_key = resolve_idempotency_key(payload, idempotency_key)
+        
+        # Duplicate suppression (payload hash excludes the runtime context),
+        # before sampling so duplicates do not spend rate-limit tokens
+        fingerprint = None
+        if self.dedup is not None:
+            fingerprint = record_fingerprint(payload, final_idempotency_key)
+            if self.dedup.check(fingerprint):
+                return None
+        
+        # Per-policy sampling and rate limits, before any enrichment work
+        if self.gate is not None and not self.gate.admit(payload):
+            self._forget_fingerprint(fingerprint)
+            return None
+        
+        enriched_payload, _ = prepare_record(payload, final_idempotency_key, validate=False)
+        
+        # Digest mode: only hashes and whitelisted fields leave the process
+        if self.digester is not None:
+            enriched_payload = self.digester.apply(enriched_payload)
+        
+        # Fire-and-forget mode
+        if self.config["fire_and_forget"] and not skip_queue and self.queue:
+            try:
+                accepted = await self.queue.enqueue(
+                    enriched_payload, final_idempotency_key, fingerprint
+                )
+            except Exception:
+                self._forget_fingerprint(fingerprint)
+                raise
+            if not accepted:
+                # Dropped by the overflow policy
+                self._forget_fingerprint(fingerprint)
+            return None
+        
+        # Synchronous mode
+        headers: Dict[str, str] = {}
+        if final_idempotency_key:
+            headers["Idempotency-Key"] = final_idempotency_key
+        try:
+            return await self.http_client.post(
+                "/records", build_record_body(enriched_payload), headers
+            )
+        except Exception:
+            self._forget_fingerprint(fingerprint)
+            raise
+    
+    def _forget_fingerprint(self, fingerprint: Optional[bytes]) -> None:
+        """Let a retry of a record that was never sent through the duplicate window."""
+        if fingerprint is not None and self.dedup is not None:
+            self.dedup.forget(fingerprint)
+    
+    async def flush(self, timeout_s: float = 5.0) -> None:
+        """
+        Flush pending queue items.
+        
+        Args:
+            timeout_s: Maximum time to wait (default: 5.0 seconds)
+        """
+        if self.queue:
+            await self.queue.flush(timeout_s)
+    
+    async def aclose(self) -> None:
+        """
+        Flush the queue, stop worker tasks and release pooled connections.
+        
+        Records not sent within the flush timeout are reported with
+        ``QUEUE_CLOSED`` instead of raising, so ``async with`` never masks the
+        exception of its body.
+        """
+        try:
+            await self.flush(2.0)
+        except XaseError as e:
+            if e.code != "FLUSH_TIMEOUT":
+                raise
+            logger.warning(f"Closing AsyncXaseClient with unsent records: {e}")
+        finally:
+            if self.queue:
+                await self.queue.close()
+            await self.http_client.aclose()
+    
+    def get_stats(self) -> Optional[Dict[str, Any]]:
+        """Get queue, connection pool and compression statistics (None unless fire-and-forget)."""
+        if not self.config["fire_and_forget"]:
+            return None
+        stats: Dict[str, Any] = self.queue.get_stats() if self.queue else {}
+        stats["http"] = self.http_client.get_pool_stats()
+        stats["compression"] = self.http_client.get_compression_stats()
+        circuit = self.http_client.get_circuit_stats()
+        if circuit is not None:
+            stats["circuit"] = circuit
+        if self.dedup is not None:
+            stats["dedup"] = self.dedup.get_stats()
+        if self.gate is not None:
+            stats["sampling"] = self.gate.get_stats()
+        if self.digester is not None:
+            stats["digest"] = self.digester.get_stats()
+        return stats
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get pipeline metrics (counters, gauges and p50/p99 histogram estimates)."""
+        return self.metrics.snapshot() if self.metrics is not None else {}
+    
+    def export_prometheus(self) -> str:
+        """Render pipeline metrics in the Prometheus text exposition format."""
+        return self.metrics.to_prometheus() if self.metrics is not None else ""
+    
+    async def __aenter__(self) -> "AsyncXaseClient":
+        return self
+    
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        await self.aclose()
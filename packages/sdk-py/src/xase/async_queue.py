@@ -0,0 +1,412 @@
+"""
+XASE SDK - Asyncio Fire-and-Forget Queue
+
+asyncio counterpart of ``Queue``: records are buffered in an ``asyncio.Queue``
+and sent in batches by worker tasks on the caller's event loop.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .dedup import DedupWindow
+from .http import AsyncHttpClient
+from .metrics import Metrics
+from .queue import (
+    DROP_REASONS,
+    OVERFLOW_POLICIES,
+    OverflowPolicy,
+    QueuedRecord,
+    batch_outcomes,
+    build_batch_content,
+    default_priority,
+    encode_record,
+    is_retryable_error,
+    shed_probability,
+)
+from .serialization import Serializer
+from .types import RecordPayload, RecordResult, XaseError
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncQueue:
+    """
+    Fire-and-forget queue served by asyncio worker tasks.
+    
+    Like ``Queue``, records are serialized at enqueue time and bounded by
+    both count and bytes. Supports the same overflow policies except ``spill``.
+    """
+    
+    def __init__(
+        self,
+        http_client: AsyncHttpClient,
+        max_size: int,
+        on_error: Optional[Callable[[XaseError], None]] = None,
+        on_success: Optional[Callable[[RecordResult], None]] = None,
+        batch_size: int = 1,
+        batch_linger_ms: float = 0.0,
+        batch_endpoint: str = "/records/batch",
+        num_workers: int = 1,
+        overflow_policy: Optional[OverflowPolicy] = None,
+        block_timeout_s: float = 1.0,
+        shed_threshold: float = 0.8,
+        priority_fn: Optional[Callable[[RecordPayload], float]] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        serializer: Optional[Serializer] = None,
+        metrics: Optional[Metrics] = None,
+        dedup: Optional[DedupWindow] = None,
+    ) -> None:
+        if batch_size < 1:
+            raise XaseError("batch_size must be >= 1", "INVALID_CONFIG")
+        if num_workers < 1:
+            raise XaseError("num_workers must be >= 1", "INVALID_CONFIG")
+        if overflow_policy is None:
+            overflow_policy = "drop_oldest"
+        if overflow_policy not in OVERFLOW_POLICIES or overflow_policy == "spill":
+            raise XaseError(f"Unsupported overflow policy: {overflow_policy}", "INVALID_CONFIG")
+        
+        self.http_client = http_client
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.on_error = on_error
+        self.on_success = on_success
+        self.batch_size = batch_size
+        self.batch_linger_s = max(0.0, batch_linger_ms) / 1000.0
+        self.batch_endpoint = batch_endpoint
+        self.num_workers = num_workers
+        self.overflow_policy = overflow_policy
+        self.block_timeout_s = block_timeout_s
+        self.shed_threshold = shed_threshold
+        self.priority_fn = priority_fn or default_priority
+        self.serializer = serializer
+        self.metrics = metrics
+        self.dedup = dedup
+        
+        # Created lazily: the constructor may run outside the event loop
+        self._queue: Optional[asyncio.Queue[QueuedRecord]] = None
+        # Notified by the workers when they take records, for the block policy
+        self._space: Optional[asyncio.Condition] = None
+        self._bytes = 0
+        self._workers: List[asyncio.Task[None]] = []
+        self._in_flight = [0] * num_workers
+        self._sent = [0] * num_workers
+        self._closed = False
+        self._overflow_counts = {
+            "blocked": 0,
+            "block_timeouts": 0,
+            "dropped_newest": 0,
+            "dropped_oldest": 0,
+            "shed": 0,
+            "spilled": 0,
+        }
+    
+    def _ensure_started(self) -> "asyncio.Queue[QueuedRecord]":
+        """Create the queue and worker tasks on the running loop."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._space = asyncio.Condition()
+            self._workers = [
+                asyncio.get_running_loop().create_task(self._process_queue(i))
+                for i in range(self.num_workers)
+            ]
+        return self._queue
+    
+    async def enqueue(
+        self,
+        payload: RecordPayload,
+        idempotency_key: Optional[str] = None,
+        fingerprint: Optional[bytes] = None,
+    ) -> bool:
+        """
+        Enqueue a record for async processing; only the ``block`` policy awaits.
+        
+        ``fingerprint`` is removed from ``dedup`` if the record is later
+        dropped or rejected, so a retry by the caller is not suppressed.
+        
+        Returns:
+            False if the overflow policy dropped the record
+        """
+        if self._closed:
+            raise XaseError("Queue is closed", "QUEUE_CLOSED")
+        
+        q = self._ensure_started()
+        
+        priority = 0.5
+        if self.overflow_policy == "shed":
+            priority = self.priority_fn(payload)
+            fill_ratio = max(
+                q.qsize() / q.maxsize if q.maxsize > 0 else 0.0,
+                self._bytes / self.max_bytes if self.max_bytes > 0 else 0.0,
+            )
+            if random.random() < shed_probability(fill_ratio, priority, self.shed_threshold):
+                self._count("shed")
+                self._report_error(XaseError("Record shed under load", "QUEUE_SHED"))
+                return False
+        
+        record = encode_record(payload, idempotency_key, self.serializer)
+        record.fingerprint = fingerprint
+        record.enqueued_at = time.monotonic()
+        if self._put_nowait(q, record):
+            self._enqueued(q)
+            return True
+        
+        if self.overflow_policy == "block":
+            assert self._space is not None
+            self._count("blocked")
+            try:
+                async with self._space:
+                    await asyncio.wait_for(
+                        self._space.wait_for(lambda: self._put_nowait(q, record)),
+                        self.block_timeout_s,
+                    )
+            except asyncio.TimeoutError:
+                self._count("block_timeouts")
+                self._report_error(
+                    XaseError("Queue full, record dropped after blocking", "QUEUE_FULL")
+                )
+                return False
+            self._enqueued(q)
+            return True
+        
+        if self.overflow_policy == "drop_newest" or (
+            self.overflow_policy == "shed" and priority < 1.0
+        ):
+            self._count("dropped_newest")
+            self._report_error(XaseError("Queue full, record dropped", "QUEUE_FULL"))
+            return False
+        
+        # Drop oldest items until the record fits
+        while not self._put_nowait(q, record):
+            try:
+                dropped = q.get_nowait()
+            except asyncio.QueueEmpty:
+                raise XaseError("Queue full", "QUEUE_FULL")
+            self._bytes -= dropped.size
+            q.task_done()
+            self._forget(dropped)
+            self._count("dropped_oldest")
+            self._report_error(XaseError("Queue full, item dropped", "QUEUE_FULL"))
+        self._enqueued(q)
+        return True
+    
+    def _enqueued(self, q: "asyncio.Queue[QueuedRecord]") -> None:
+        if self.metrics is not None:
+            self.metrics.inc("records_enqueued_total")
+            self.metrics.track_queue_size(q.qsize())
+    
+    def _count(self, name: str) -> None:
+        self._overflow_counts[name] += 1
+        if name in DROP_REASONS:
+            self._dropped(DROP_REASONS[name])
+    
+    def _dropped(self, reason: str, n: int = 1) -> None:
+        if self.metrics is not None:
+            self.metrics.inc("records_dropped_total", n, reason=reason)
+    
+    def _acked(self, record: QueuedRecord) -> None:
+        if self.metrics is not None:
+            self.metrics.inc("records_acked_total")
+            if record.enqueued_at:
+                self.metrics.observe(
+                    "record_ack_latency_seconds", time.monotonic() - record.enqueued_at
+                )
+    
+    def _forget(self, record: QueuedRecord) -> None:
+        """Let the caller retry a lost record through the duplicate window."""
+        if self.dedup is not None and record.fingerprint is not None:
+            self.dedup.forget(record.fingerprint)
+    
+    def _failed(self, error: Exception, records: List[QueuedRecord]) -> None:
+        """Count records lost to a send error; the async queue has no spool to retry from."""
+        for record in records:
+            self._forget(record)
+        if isinstance(error, XaseError) and error.code == "CIRCUIT_OPEN":
+            self._dropped("circuit_open", len(records))
+        elif is_retryable_error(error):
+            self._dropped("send_failed", len(records))
+        else:
+            self._dropped("rejected", len(records))
+    
+    def _put_nowait(self, q: "asyncio.Queue[QueuedRecord]", record: QueuedRecord) -> bool:
+        """Add a record if it fits the count and byte budgets."""
+        if q.full():
+            return False
+        if self.max_bytes > 0 and not q.empty() and self._bytes + record.size > self.max_bytes:
+            return False
+        q.put_nowait(record)
+        self._bytes += record.size
+        return True
+    
+    def _get_nowait(self, q: "asyncio.Queue[QueuedRecord]") -> QueuedRecord:
+        record = q.get_nowait()
+        self._bytes -= record.size
+        return record
+    
+    async def _process_queue(self, worker_index: int) -> None:
+        """Process queue items until cancelled."""
+        q = self._ensure_started()
+        
+        while True:
+            first = await q.get()
+            self._bytes -= first.size
+            batch = [first]
+            try:
+                await self._drain_batch(q, batch)
+                await self._notify_space()
+                if self.metrics is not None:
+                    self.metrics.observe("batch_size", len(batch))
+                    self.metrics.track_queue_size(q.qsize())
+                self._in_flight[worker_index] = len(batch)
+                # Only acknowledged records count as sent; failures are counted as dropped
+                self._sent[worker_index] += await self._send_batch(batch)
+            except asyncio.CancelledError:
+                # close() cancelled us while lingering or mid-request: the
+                # batch has no outcome yet, so report it like queued records
+                self._abandon(batch)
+                raise
+            finally:
+                self._in_flight[worker_index] = 0
+                for _ in batch:
+                    q.task_done()
+    
+    async def _notify_space(self) -> None:
+        """Wake producers blocked on a full queue."""
+        assert self._space is not None
+        async with self._space:
+            self._space.notify_all()
+    
+    async def _drain_batch(
+        self,
+        q: "asyncio.Queue[QueuedRecord]",
+        batch: List[QueuedRecord],
+    ) -> None:
+        """Fill ``batch`` up to batch_size items, waiting at most batch_linger_ms."""
+        deadline = time.monotonic() + self.batch_linger_s
+        
+        while len(batch) < self.batch_size:
+            if not q.empty():
+                batch.append(self._get_nowait(q))
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                record = await asyncio.wait_for(q.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            self._bytes -= record.size
+            batch.append(record)
+    
+    async def _send_batch(self, batch: List[QueuedRecord]) -> int:
+        """Send a batch, report each item's outcome and return how many were acknowledged."""
+        if len(batch) == 1:
+            record = batch[0]
+            headers: Dict[str, str] = {}
+            if record.idempotency_key:
+                headers["Idempotency-Key"] = record.idempotency_key
+            try:
+                result = await self.http_client.post("/records", record.body, headers)
+            except XaseError as e:
+                self._failed(e, batch)
+                self._report_error(e)
+                return 0
+            self._acked(record)
+            self._report_success(result)
+            return 1
+        
+        try:
+            response = await self.http_client.post(
+                self.batch_endpoint, build_batch_content(batch)
+            )
+        except XaseError as e:
+            self._failed(e, batch)
+            for _ in batch:
+                self._report_error(e)
+            return 0
+        
+        acked = 0
+        for record, outcome in zip(batch, batch_outcomes(response, len(batch))):
+            if isinstance(outcome, XaseError):
+                self._failed(outcome, [record])
+                self._report_error(outcome)
+            else:
+                self._acked(record)
+                self._report_success(outcome)
+                acked += 1
+        return acked
+    
+    def _report_success(self, result: RecordResult) -> None:
+        """Invoke on_success; a failing callback is reported via on_error."""
+        if self.on_success:
+            try:
+                self.on_success(result)
+            except Exception as e:  # noqa: BLE001 - user callback
+                self._report_error(e)
+    
+    def _report_error(self, error: Exception) -> None:
+        """Invoke on_error without letting it kill the worker."""
+        if self.on_error:
+            xase_error = (
+                error if isinstance(error, XaseError)
+                else XaseError(str(error), "QUEUE_ERROR", None, {"exception": type(error).__name__})
+            )
+            try:
+                self.on_error(xase_error)
+            except Exception:  # noqa: BLE001 - user callback
+                logger.warning("Xase on_error callback failed", exc_info=True)
+    
+    async def flush(self, timeout_s: float = 5.0) -> None:
+        """Wait until all pending items have been sent."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout_s)
+        except asyncio.TimeoutError:
+            raise XaseError(
+                f"Flush timeout: {self._queue.qsize()} items remaining",
+                "FLUSH_TIMEOUT",
+            )
+    
+    async def close(self) -> None:
+        """
+        Close queue and cancel worker tasks.
+        
+        Records still queued, and those a worker held unsent when it was
+        cancelled, are dropped and reported with ``QUEUE_CLOSED``; call
+        ``flush()`` first to send them.
+        """
+        self._closed = True
+        for task in self._workers:
+            task.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        
+        q = self._queue
+        while q is not None and not q.empty():
+            self._abandon([self._get_nowait(q)])
+            q.task_done()
+    
+    def _abandon(self, records: List[QueuedRecord]) -> None:
+        """Drop and report records left unsent when the queue closed."""
+        for record in records:
+            self._forget(record)
+            self._dropped("close_timeout")
+            self._report_error(XaseError("Queue closed before the record was sent", "QUEUE_CLOSED"))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics."""
+        return {
+            "size": self._queue.qsize() if self._queue is not None else 0,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "closed": self._closed,
+            "workers": [
+                {"in_flight": self._in_flight[i], "sent": self._sent[i]}
+                for i in range(self.num_workers)
+            ],
+            "overflow": {"policy": self.overflow_policy, **self._overflow_counts},
+        }
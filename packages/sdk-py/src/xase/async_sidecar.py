@@ -0,0 +1,363 @@
+"""
+XASE SDK - Asyncio Sidecar Client
+
+Native asyncio counterpart of ``SidecarClient`` built on
+``asyncio.open_unix_connection``: no threads and no blocking sleeps, so one
+event loop can keep the sidecar saturated. Speaks the same ``v1`` (one
+request per connection at a time) and ``v2`` (pipelined, request ids)
+protocols, over a small pool of connections.
+"""
+
+import asyncio
+import itertools
+import logging
+import struct
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .sidecar import (
+    PROTOCOL_V1,
+    PROTOCOL_V2,
+    V2_GET_SEGMENT,
+    V2_HEADER,
+    V2_MAGIC,
+    V2_STATUS_OK,
+    V2_VERSION,
+    encode_v2_frame,
+)
+from .types import XaseError
+
+logger = logging.getLogger(__name__)
+
+_V1_LENGTH = struct.Struct(">I")
+
+# Failures that warrant a new connection and a retry
+_RETRYABLE = (ConnectionError, OSError, EOFError, asyncio.TimeoutError)
+
+
+class _AsyncConnection:
+    """
+    One Unix-socket connection.
+    
+    v1 connections serve one request at a time; v2 connections multiplex any
+    number of requests, with a reader task resolving responses by id.
+    """
+    
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, protocol: str
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.protocol = protocol
+        self.users = 0
+        self._closed = False
+        self._lock = asyncio.Lock()
+        self._pending: Dict[int, "asyncio.Future[bytes]"] = {}
+        self._ids = itertools.count(1)
+        self._reader_task: Optional["asyncio.Task[None]"] = None
+        if protocol == PROTOCOL_V2:
+            self._reader_task = asyncio.ensure_future(self._read_loop())
+    
+    @property
+    def alive(self) -> bool:
+        return not self._closed
+    
+    async def request(self, segment_id: str) -> bytes:
+        if self.protocol == PROTOCOL_V2:
+            return await self._request_v2(segment_id)
+        return await self._request_v1(segment_id)
+    
+    async def _request_v1(self, segment_id: str) -> bytes:
+        async with self._lock:
+            if self._closed:
+                raise ConnectionError("Sidecar connection closed")
+            try:
+                data = segment_id.encode("utf-8")
+                self.writer.write(_V1_LENGTH.pack(len(data)) + data)
+                await self.writer.drain()
+                (length,) = _V1_LENGTH.unpack(await self.reader.readexactly(_V1_LENGTH.size))
+                return await self.reader.readexactly(length)
+            except BaseException:
+                # Failed or cancelled mid-exchange: the stream position is unknown
+                self.close()
+                raise
+    
+    async def _request_v2(self, segment_id: str) -> bytes:
+        if self._closed:
+            raise ConnectionError("Sidecar connection closed")
+        request_id = next(self._ids) & 0xFFFFFFFF
+        future: "asyncio.Future[bytes]" = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            # write() queues the whole frame at once, so frames never interleave
+            self.writer.write(
+                encode_v2_frame(V2_GET_SEGMENT, request_id, segment_id.encode("utf-8"))
+            )
+            await self.writer.drain()
+            return await future
+        finally:
+            # Cancelled or timed out: a late response for this id is discarded
+            self._pending.pop(request_id, None)
+    
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                header = await self.reader.readexactly(V2_HEADER.size)
+                magic, version, status, request_id, length = V2_HEADER.unpack(header)
+                if magic != V2_MAGIC or version != V2_VERSION:
+                    raise ConnectionError(
+                        f"Unexpected Sidecar frame (magic={magic!r}, version={version})"
+                    )
+                payload = await self.reader.readexactly(length)
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if status == V2_STATUS_OK:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(XaseError(
+                        payload.decode("utf-8", "replace") or "Sidecar request failed",
+                        "SIDECAR_ERROR",
+                        None,
+                        {"status": status, "request_id": request_id},
+                    ))
+        except asyncio.CancelledError:
+            self._fail(ConnectionError("Sidecar connection closed"))
+            raise
+        except (ConnectionError, OSError, EOFError) as e:
+            if not isinstance(e, ConnectionError):
+                e = ConnectionError(f"Sidecar connection lost: {e}")
+            self._fail(e)
+    
+    def _fail(self, error: ConnectionError) -> None:
+        self._closed = True
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+        self.writer.close()
+    
+    def close(self) -> None:
+        self._fail(ConnectionError("Sidecar connection closed"))
+        if self._reader_task is not None and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+    
+    async def wait_closed(self) -> None:
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class AsyncSidecarClient:
+    """
+    Asyncio client for the Xase Sidecar with a connection pool and auto-recovery.
+    
+    Example:
+        >>> async with AsyncSidecarClient(protocol="v2") as sidecar:
+        ...     data = await sidecar.get_segment("seg_00001")
+        ...     async for segment_id, data in sidecar.get_segments(ids):
+        ...         ...
+    """
+    
+    def __init__(
+        self,
+        socket_path: str = "/var/run/xase/sidecar.sock",
+        max_retries: int = 3,
+        backoff_base: float = 2.0,
+        timeout: float = 30.0,
+        protocol: str = PROTOCOL_V1,
+        pool_size: int = 4,
+        max_concurrency: int = 64,
+    ) -> None:
+        """
+        Initialize the async Sidecar client.
+        
+        Args:
+            socket_path: Path to Unix socket (default: /var/run/xase/sidecar.sock)
+            max_retries: Maximum number of attempts per segment (default: 3)
+            backoff_base: Base for exponential backoff in seconds (default: 2.0)
+            timeout: Per-attempt timeout in seconds (default: 30.0)
+            protocol: "v1" (lock-step) or "v2" (pipelined) (default: "v1")
+            pool_size: Maximum open connections (default: 4)
+            max_concurrency: Maximum requests in flight across the pool (default: 64)
+        """
+        if protocol not in (PROTOCOL_V1, PROTOCOL_V2):
+            raise XaseError(
+                f"Unknown Sidecar protocol '{protocol}': use 'v1' or 'v2'", "INVALID_CONFIG"
+            )
+        if pool_size < 1 or max_concurrency < 1:
+            raise XaseError("pool_size and max_concurrency must be at least 1", "INVALID_CONFIG")
+        self.socket_path = socket_path
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.protocol = protocol
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self._connections: List[_AsyncConnection] = []
+        self._opening = 0
+        # Created on first use so they bind to the running loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pool_changed: Optional[asyncio.Condition] = None
+    
+    def _limits(self) -> Tuple[asyncio.Semaphore, asyncio.Condition]:
+        if self._semaphore is None or self._pool_changed is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._pool_changed = asyncio.Condition()
+        return self._semaphore, self._pool_changed
+    
+    async def _acquire(self) -> _AsyncConnection:
+        """Least-busy live connection; opens another while all are busy and the pool has room."""
+        _, pool_changed = self._limits()
+        while True:
+            self._connections = [conn for conn in self._connections if conn.alive]
+            best = min(self._connections, key=lambda conn: conn.users, default=None)
+            if best is not None and (
+                best.users == 0 or len(self._connections) + self._opening >= self.pool_size
+            ):
+                best.users += 1
+                return best
+            if len(self._connections) + self._opening < self.pool_size:
+                break
+            # Only connections still being opened; wait for one of them
+            async with pool_changed:
+                await pool_changed.wait()
+        
+        self._opening += 1
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(self.socket_path), self.timeout
+            )
+        finally:
+            self._opening -= 1
+            async with pool_changed:
+                pool_changed.notify_all()
+        conn = _AsyncConnection(reader, writer, self.protocol)
+        logger.info(f"Connected to Sidecar at {self.socket_path}")
+        self._connections.append(conn)
+        conn.users += 1
+        return conn
+    
+    async def get_segment(self, segment_id: str) -> bytes:
+        """
+        Get a segment from the Sidecar with auto-recovery.
+        
+        Cancelling the calling task abandons the request; a v1 connection in
+        the middle of the exchange is closed, a v2 one discards the late reply.
+        
+        Raises:
+            ConnectionError: If unable to fetch segment after retries
+            XaseError: If the sidecar answered a v2 request with an error
+        """
+        semaphore, _ = self._limits()
+        for attempt in range(self.max_retries):
+            try:
+                async with semaphore:
+                    conn = await self._acquire()
+                    try:
+                        return await asyncio.wait_for(conn.request(segment_id), self.timeout)
+                    finally:
+                        conn.users -= 1
+            
+            except _RETRYABLE as e:
+                logger.warning(
+                    f"Failed to get segment {segment_id} "
+                    f"(attempt {attempt + 1}/{self.max_retries}): {e or type(e).__name__}"
+                )
+                if attempt < self.max_retries - 1:
+                    wait_time = self.backoff_base ** attempt
+                    logger.info(f"Retrying in {wait_time:.1f}s...")
+                    await asyncio.sleep(wait_time)
+        
+        logger.error(f"Failed to get segment {segment_id} after {self.max_retries} attempts")
+        raise ConnectionError(
+            f"Unable to fetch segment {segment_id} after {self.max_retries} retries"
+        )
+    
+    async def get_segments(
+        self,
+        segment_ids: Iterable[str],
+        max_in_flight: Optional[int] = None,
+        ordered: bool = False,
+    ) -> AsyncIterator[Tuple[str, Union[bytes, Exception]]]:
+        """
+        Fetch many segments concurrently, yielding ``(segment_id, data)`` pairs.
+        
+        Same contract as ``SidecarClient.get_segments``: pairs come in
+        completion order unless ``ordered`` is set, a failed segment yields its
+        exception instead of aborting the batch, and only failed ids are
+        retried. Closing the iterator early cancels the outstanding requests.
+        
+        Args:
+            segment_ids: Segment identifiers, consumed lazily
+            max_in_flight: Concurrent requests for this call (default: max_concurrency)
+            ordered: Yield in request order instead of completion order
+        """
+        window = max_in_flight or self.max_concurrency
+        if window < 1:
+            raise XaseError("max_in_flight must be at least 1", "INVALID_CONFIG")
+        
+        async def fetch(index: int, segment_id: str) -> Tuple[int, str, Union[bytes, Exception]]:
+            try:
+                return index, segment_id, await self.get_segment(segment_id)
+            except (ConnectionError, XaseError) as e:
+                return index, segment_id, e
+        
+        source = enumerate(segment_ids)
+        exhausted = False
+        running: Set["asyncio.Future[Tuple[int, str, Union[bytes, Exception]]]"] = set()
+        buffered: Dict[int, Tuple[str, Union[bytes, Exception]]] = {}
+        next_index = 0
+        try:
+            while True:
+                while not exhausted and len(running) < window:
+                    try:
+                        index, segment_id = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    running.add(asyncio.ensure_future(fetch(index, segment_id)))
+                if not running:
+                    return
+                
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, segment_id, result = task.result()
+                    if not ordered:
+                        yield segment_id, result
+                        continue
+                    buffered[index] = (segment_id, result)
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        live = [conn for conn in self._connections if conn.alive]
+        return {
+            "connections": len(live),
+            "in_flight": sum(conn.users for conn in live),
+            "pool_size": self.pool_size,
+        }
+    
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        for conn in connections:
+            await conn.wait_closed()
+    
+    async def __aenter__(self) -> "AsyncSidecarClient":
+        return self
+    
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        await self.aclose()
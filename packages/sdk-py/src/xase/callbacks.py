@@ -0,0 +1,169 @@
+"""
+XASE SDK - Callback Dispatcher
+
+Runs user ``on_success``/``on_error`` callbacks on a dedicated thread so a slow
+callback cannot throttle the sender threads. Pending callbacks are bounded;
+when the bound is hit new ones are dropped and counted.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .types import RecordResult, XaseError
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackDispatcher:
+    """
+    Bounded executor for queue callbacks.
+    
+    With ``batch_size`` set, callbacks receive lists of up to ``batch_size``
+    results (or errors) instead of one item per call.
+    """
+    
+    def __init__(
+        self,
+        on_success: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Any], None]] = None,
+        max_pending: int = 10000,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        if batch_size is not None and batch_size < 1:
+            raise XaseError("callback batch_size must be >= 1", "INVALID_CONFIG")
+        
+        self.on_success = on_success
+        self.on_error = on_error
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        
+        # (is_error, value, enqueued_at)
+        self._pending: Deque[Tuple[bool, Any, float]] = deque()
+        self._cond = threading.Condition()
+        self._running = 0
+        self._closed = False
+        self._dispatched = 0
+        self._dropped = 0
+        self._failed = 0
+        self._last_lag_s = 0.0
+        self._max_lag_s = 0.0
+        self._thread: Optional[threading.Thread] = None
+    
+    def _ensure_thread(self) -> None:
+        # Called with the condition held
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True, name="xase-callbacks")
+            self._thread.start()
+    
+    def _reset_in_child(self) -> None:
+        """Fresh lock and no thread after fork; pending callbacks belong to the parent."""
+        self._cond = threading.Condition()
+        self._pending.clear()
+        self._running = 0
+        self._thread = None
+    
+    def submit_success(self, result: RecordResult) -> None:
+        if self.on_success:
+            self._submit(False, result)
+    
+    def submit_error(self, error: XaseError) -> None:
+        if self.on_error:
+            self._submit(True, error)
+    
+    def _submit(self, is_error: bool, value: Any) -> None:
+        with self._cond:
+            if self._closed or len(self._pending) >= self.max_pending:
+                self._dropped += 1
+                return
+            self._pending.append((is_error, value, time.monotonic()))
+            self._ensure_thread()
+            self._cond.notify_all()
+    
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                items = self._take()
+                self._running = len(items)
+            
+            try:
+                self._invoke(items)
+            finally:
+                with self._cond:
+                    self._running = 0
+                    self._dispatched += len(items)
+                    self._cond.notify_all()
+    
+    def _take(self) -> List[Tuple[bool, Any, float]]:
+        """Pop the next item, or the next run of same-kind items when batching (lock held)."""
+        items = [self._pending.popleft()]
+        if self.batch_size:
+            kind = items[0][0]
+            while self._pending and len(items) < self.batch_size and self._pending[0][0] == kind:
+                items.append(self._pending.popleft())
+        return items
+    
+    def _invoke(self, items: List[Tuple[bool, Any, float]]) -> None:
+        lag = time.monotonic() - items[0][2]
+        self._last_lag_s = lag
+        self._max_lag_s = max(self._max_lag_s, lag)
+        
+        is_error = items[0][0]
+        callback = self.on_error if is_error else self.on_success
+        if callback is None:
+            return
+        calls = (
+            [[value for _, value, _ in items]]
+            if self.batch_size
+            else [value for _, value, _ in items]
+        )
+        
+        for arg in calls:
+            try:
+                callback(arg)
+            except Exception as e:  # noqa: BLE001 - user callback
+                self._failed += 1
+                if not is_error and self.on_error:
+                    # A failing on_success is reported via on_error, like inline callbacks were
+                    error = XaseError(str(e), "QUEUE_ERROR", None, {"exception": type(e).__name__})
+                    try:
+                        self.on_error([error] if self.batch_size else error)
+                    except Exception:  # noqa: BLE001 - user callback
+                        logger.warning("Xase on_error callback failed", exc_info=True)
+    
+    def join(self, timeout_s: Optional[float] = None) -> bool:
+        """Wait until every submitted callback has run; returns False on timeout."""
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        with self._cond:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+    
+    def close(self, timeout_s: float = 2.0) -> None:
+        """Run pending callbacks (up to ``timeout_s``) and stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout_s)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get callback dispatch statistics."""
+        return {
+            "pending": len(self._pending),
+            "dispatched": self._dispatched,
+            "dropped": self._dropped,
+            "failed": self._failed,
+            "lag_ms": self._last_lag_s * 1000.0,
+            "max_lag_ms": self._max_lag_s * 1000.0,
+        }
@@ -0,0 +1,130 @@
+"""
+XASE SDK - Circuit Breaker
+
+Client-wide breaker shared by every sender of an ``HttpClient``. After
+``failure_threshold`` consecutive transient failures (network errors, 429,
+5xx) it opens and requests fail fast with ``CIRCUIT_OPEN`` instead of burning
+their retry budgets. After ``reset_timeout_s`` a limited number of half-open
+probes decide whether to close it again; probes that never report back are
+written off after another ``reset_timeout_s``. A ``Retry-After`` from the API
+gates all senders until it has elapsed.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Literal
+
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    """Thread-safe closed/open/half-open breaker with a shared Retry-After gate."""
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 10.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        
+        self._lock = threading.Lock()
+        self._state: CircuitState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started = 0.0
+        self._gate_until = 0.0
+        self._opened = 0
+        self._rejected = 0
+    
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+    
+    def allow(self) -> bool:
+        """Whether a request may be sent now; half-open admits a limited number of probes."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._gate_until:
+                self._rejected += 1
+                return False
+            
+            if self._state == "open":
+                if now - self._opened_at < self.reset_timeout_s:
+                    self._rejected += 1
+                    return False
+                self._state = "half_open"
+                self._probes = 0
+            
+            if self._state == "half_open":
+                if self._probes >= self.half_open_max_calls:
+                    if now - self._probe_started < self.reset_timeout_s:
+                        self._rejected += 1
+                        return False
+                    # The probes ended without a verdict (e.g. an unexpected error)
+                    self._probes = 0
+                if self._probes == 0:
+                    self._probe_started = now
+                self._probes += 1
+            
+            return True
+    
+    def record_success(self) -> None:
+        """The API answered (2xx or a non-transient 4xx)."""
+        with self._lock:
+            self._failures = 0
+            self._probes = 0
+            self._state = "closed"
+    
+    def record_failure(self) -> None:
+        """A request failed transiently."""
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self._open()
+    
+    def _open(self) -> None:
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self._opened += 1
+    
+    def defer(self, seconds: float) -> None:
+        """Hold every sender back for ``seconds`` (from a Retry-After header)."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._gate_until = max(self._gate_until, time.monotonic() + seconds)
+    
+    def is_blocking(self) -> bool:
+        """Whether new requests would currently be refused."""
+        now = time.monotonic()
+        with self._lock:
+            return now < self._gate_until or (
+                self._state == "open" and now - self._opened_at < self.reset_timeout_s
+            )
+    
+    def remaining_s(self) -> float:
+        """Seconds until requests are allowed again (0 if they are)."""
+        now = time.monotonic()
+        with self._lock:
+            remaining = self._gate_until - now
+            if self._state == "open":
+                remaining = max(remaining, self._opened_at + self.reset_timeout_s - now)
+            return max(0.0, remaining)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get circuit breaker statistics."""
+        return {
+            "state": self._state,
+            "consecutive_failures": self._failures,
+            "opened": self._opened,
+            "rejected": self._rejected,
+            "retry_in_s": self.remaining_s(),
+        }
@@ -5,37 +5,199 @@ Official SDK for recording AI decisions as immutable evidence.
 """
 
 import atexit
+import logging
 import os
 import signal
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Optional, Tuple
 
+from .agent import AgentSender
+from .circuit import CircuitBreaker
 from .context import capture_context, generate_idempotency_key, is_valid_idempotency_key
+from .dedup import DedupWindow, record_fingerprint
+from .digest import PayloadDigester
 from .http import HttpClient
-from .queue import Queue
+from .metrics import Metrics
+from .queue import Queue, build_record_body, encode_record
+from .sampling import RecordGate
+from .serialization import resolve_serializer
+from .spool import Spool
 from .types import RecordPayload, RecordResult, XaseClientConfig, XaseError
 
+logger = logging.getLogger(__name__)
+
+
+def resolve_config(config: XaseClientConfig) -> Dict[str, Any]:
+    """Validate client configuration and merge it with defaults."""
+    # Validate API key
+    api_key = config.get("api_key")
+    if not api_key:
+        raise XaseError("API key is required", "MISSING_API_KEY")
+    
+    # Merge with defaults
+    return {
+        "api_key": api_key,
+        "base_url": (
+            config.get("base_url")
+            or os.getenv("XASE_BASE_URL")
+            or "http://localhost:3000/api/xase/v1"
+        ),
+        "timeout": config.get("timeout", 3.0),
+        "fire_and_forget": config.get("fire_and_forget", True),
+        "max_retries": config.get("max_retries", 3),
+        "queue_max_size": config.get("queue_max_size", 10000),
+        "queue_max_bytes": config.get("queue_max_bytes", 64 * 1024 * 1024),
+        "batch_size": config.get("batch_size", 1),
+        "batch_linger_ms": config.get("batch_linger_ms", 0.0),
+        "queue_workers": config.get("queue_workers", 1),
+        "queue_preserve_order": config.get("queue_preserve_order", False),
+        "max_connections": config.get("max_connections", 100),
+        "max_keepalive_connections": config.get("max_keepalive_connections", 20),
+        "keepalive_expiry": config.get("keepalive_expiry", 30.0),
+        "http2": config.get("http2", False),
+        "spool_dir": config.get("spool_dir"),
+        "spool_max_bytes": config.get("spool_max_bytes", 256 * 1024 * 1024),
+        "spool_segment_bytes": config.get("spool_segment_bytes", 8 * 1024 * 1024),
+        "spool_fsync": config.get("spool_fsync", "interval"),
+        "overflow_policy": config.get("overflow_policy"),
+        "overflow_block_timeout": config.get("overflow_block_timeout", 1.0),
+        "shed_threshold": config.get("shed_threshold", 0.8),
+        "priority_fn": config.get("priority_fn"),
+        "json_serializer": config.get("json_serializer", "auto"),
+        "compression": config.get("compression"),
+        "compression_threshold": config.get("compression_threshold", 1024),
+        "compression_level": config.get("compression_level"),
+        "dedup_window_s": config.get("dedup_window_s"),
+        "dedup_max_keys": config.get("dedup_max_keys", 100_000),
+        "policy_rules": config.get("policy_rules"),
+        "circuit_breaker": config.get("circuit_breaker", False),
+        "circuit_failure_threshold": config.get("circuit_failure_threshold", 5),
+        "circuit_reset_timeout": config.get("circuit_reset_timeout", 10.0),
+        "circuit_fallback": config.get("circuit_fallback", "spool"),
+        "callback_queue_size": config.get("callback_queue_size", 10000),
+        "callback_batch_size": config.get("callback_batch_size"),
+        "metrics": config.get("metrics", True),
+        "otel_meter": config.get("otel_meter"),
+        "payload_mode": config.get("payload_mode", "full"),
+        "digest_fields": config.get("digest_fields"),
+        "handle_signals": config.get("handle_signals", True),
+        "close_timeout": config.get("close_timeout", 2.0),
+        "agent_socket": config.get("agent_socket"),
+        "agent_timeout": config.get("agent_timeout", 1.0),
+        "on_error": config.get("on_error"),
+        "on_success": config.get("on_success"),
+    }
+
+
+def validate_payload(payload: RecordPayload) -> None:
+    """Validate record payload."""
+    if not payload.get("policy"):
+        raise XaseError("Policy is required", "MISSING_POLICY")
+    
+    if not payload.get("input") or not isinstance(payload.get("input"), dict):
+        raise XaseError("Input must be a dict", "INVALID_INPUT")
+    
+    if not payload.get("output") or not isinstance(payload.get("output"), dict):
+        raise XaseError("Output must be a dict", "INVALID_OUTPUT")
+    
+    confidence = payload.get("confidence")
+    if confidence is not None:
+        if not isinstance(confidence, (int, float)) or confidence < 0 or confidence > 1:
+            raise XaseError(
+                "Confidence must be a number between 0 and 1",
+                "INVALID_CONFIDENCE",
+            )
+    
+    priority = payload.get("priority")
+    if priority is not None and not isinstance(priority, (int, float)):
+        raise XaseError("Priority must be a number between 0 and 1", "INVALID_PAYLOAD")
+
+
+def prepare_record(
+    payload: RecordPayload,
+    idempotency_key: Optional[str] = None,
+    validate: bool = True,
+) -> Tuple[RecordPayload, Optional[str]]:
+    """
+    Validate a payload, enrich it with runtime context and resolve its idempotency key.
+    
+    Shared by XaseClient and AsyncXaseClient.
+    """
+    # Validate payload
+    if validate:
+        validate_payload(payload)
+    
+    # Enrich with runtime context
+    enriched_payload: RecordPayload = {
+        **payload,
+        "context": {
+            **capture_context(),
+            **(payload.get("context") or {}),
+        },
+    }
+    
+    return enriched_payload, resolve_idempotency_key(payload, idempotency_key)
+
+
+def resolve_idempotency_key(
+    payload: RecordPayload, idempotency_key: Optional[str] = None
+) -> Optional[str]:
+    """Use the given key, or derive one from ``transaction_id``; validate its format."""
+    # Generate idempotency key if needed
+    final_idempotency_key = idempotency_key
+    transaction_id = payload.get("transaction_id")
+    if not final_idempotency_key and transaction_id:
+        final_idempotency_key = generate_idempotency_key(transaction_id)
+    
+    # Validate idempotency key format if provided
+    if final_idempotency_key and not is_valid_idempotency_key(final_idempotency_key):
+        raise XaseError(
+            "Invalid idempotency key format. Use UUID v4 or alphanumeric 16-64 chars",
+            "INVALID_IDEMPOTENCY_KEY",
+        )
+    
+    return final_idempotency_key
+
+
+def resolve_digester(config: Dict[str, Any]) -> Optional[PayloadDigester]:
+    """Build the payload digester for ``payload_mode="digest"``; None in full mode."""
+    mode = config["payload_mode"]
+    if mode == "full":
+        return None
+    if mode != "digest":
+        raise XaseError(f"Invalid payload mode: {mode}", "INVALID_CONFIG")
+    return PayloadDigester(config["digest_fields"])
+
 
 class XaseClient:
     """Main client for recording AI decisions as immutable evidence."""
     
     def __init__(self, config: XaseClientConfig) -> None:
         """Initialize XaseClient with configuration."""
-        # Validate API key
-        api_key = config.get("api_key")
-        if not api_key:
-            raise XaseError("API key is required", "MISSING_API_KEY")
-        
-        # Merge with defaults
-        self.config: Dict[str, Any] = {
-            "api_key": api_key,
-            "base_url": config.get("base_url") or os.getenv("XASE_BASE_URL") or "http://localhost:3000/api/xase/v1",
-            "timeout": config.get("timeout", 3.0),
-            "fire_and_forget": config.get("fire_and_forget", True),
-            "max_retries": config.get("max_retries", 3),
-            "queue_max_size": config.get("queue_max_size", 10000),
-            "on_error": config.get("on_error"),
-            "on_success": config.get("on_success"),
-        }
+        self.config: Dict[str, Any] = resolve_config(config)
+        self._serializer = resolve_serializer(self.config["json_serializer"])
+        
+        self.metrics: Optional[Metrics] = None
+        if self.config["metrics"]:
+            self.metrics = Metrics()
+            if self.config["otel_meter"] is not None:
+                self.metrics.bind_opentelemetry(self.config["otel_meter"])
+        circuit_breaker = None
+        if self.config["circuit_breaker"]:
+            circuit_breaker = CircuitBreaker(
+                failure_threshold=self.config["circuit_failure_threshold"],
+                reset_timeout_s=self.config["circuit_reset_timeout"],
+            )
+        
+        self.gate: Optional[RecordGate] = None
+        if self.config["policy_rules"]:
+            self.gate = RecordGate(self.config["policy_rules"])
+        
+        self.dedup: Optional[DedupWindow] = None
+        if self.config["dedup_window_s"]:
+            self.dedup = DedupWindow(self.config["dedup_window_s"], self.config["dedup_max_keys"])
+        
+        self.digester = resolve_digester(self.config)
         
         # Initialize HTTP client
         self.http_client = HttpClient(
@@ -43,22 +205,78 @@ class XaseClient:
             base_url=self.config["base_url"],
             timeout=self.config["timeout"],
             max_retries=self.config["max_retries"],
+            max_connections=self.config["max_connections"],
+            max_keepalive_connections=self.config["max_keepalive_connections"],
+            keepalive_expiry=self.config["keepalive_expiry"],
+            http2=self.config["http2"],
+            serializer=self._serializer,
+            compression=self.config["compression"],
+            compression_threshold=self.config["compression_threshold"],
+            compression_level=self.config["compression_level"],
+            circuit_breaker=circuit_breaker,
+            metrics=self.metrics,
         )
         
-        # Initialize queue if fire-and-forget enabled
+        # In agent mode records go to the per-host agent; the local queue is
+        # only built if the agent cannot be reached
+        self.agent: Optional[AgentSender] = None
         self.queue: Optional[Queue] = None
+        self._queue_lock = threading.Lock()
+        self._previous_handlers: Dict[int, Any] = {}
         if self.config["fire_and_forget"]:
-            self.queue = Queue(
-                http_client=self.http_client,
-                max_size=self.config["queue_max_size"],
-                on_error=self.config["on_error"],
-                on_success=self.config["on_success"],
-            )
+            if self.config["agent_socket"]:
+                self.agent = AgentSender(
+                    self.config["agent_socket"], timeout=self.config["agent_timeout"]
+                )
+            else:
+                self.queue = self._build_queue()
             
             # Register exit handlers
             atexit.register(self._cleanup)
-            signal.signal(signal.SIGINT, self._signal_handler)
-            signal.signal(signal.SIGTERM, self._signal_handler)
+            if self.config["handle_signals"]:
+                self._install_signal_handlers()
+    
+    def _build_queue(self) -> Queue:
+        """Create the fire-and-forget queue (and its spool, if configured)."""
+        spool = None
+        if self.config["spool_dir"]:
+            spool = Spool(
+                self.config["spool_dir"],
+                max_bytes=self.config["spool_max_bytes"],
+                segment_max_bytes=self.config["spool_segment_bytes"],
+                fsync=self.config["spool_fsync"],
+            )
+        
+        return Queue(
+            http_client=self.http_client,
+            max_size=self.config["queue_max_size"],
+            max_bytes=self.config["queue_max_bytes"],
+            on_error=self.config["on_error"],
+            on_success=self.config["on_success"],
+            batch_size=self.config["batch_size"],
+            batch_linger_ms=self.config["batch_linger_ms"],
+            num_workers=self.config["queue_workers"],
+            preserve_order=self.config["queue_preserve_order"],
+            spool=spool,
+            overflow_policy=self.config["overflow_policy"],
+            block_timeout_s=self.config["overflow_block_timeout"],
+            shed_threshold=self.config["shed_threshold"],
+            priority_fn=self.config["priority_fn"],
+            serializer=self._serializer,
+            circuit_fallback=self.config["circuit_fallback"],
+            callback_queue_size=self.config["callback_queue_size"],
+            callback_batch_size=self.config["callback_batch_size"],
+            metrics=self.metrics,
+            dedup=self.dedup,
+        )
+    
+    def _local_queue(self) -> Queue:
+        """The local queue, built on first use in agent mode."""
+        if self.queue is None:
+            with self._queue_lock:
+                if self.queue is None:
+                    self.queue = self._build_queue()
+        return self.queue
     
     def record(
         self,
@@ -76,39 +294,60 @@ class XaseClient:
             skip_queue: Force synchronous mode even with fire_and_forget enabled
         
         Returns:
-            RecordResult if sync mode, None if fire-and-forget
+            RecordResult if sync mode, None if fire-and-forget, sampled out,
+            throttled or suppressed as a duplicate
         """
-        # Validate payload
-        self._validate_payload(payload)
-        
-        # Enrich with runtime context
-        enriched_payload: RecordPayload = {
-            **payload,
-            "context": {
-                **capture_context(),
-                **(payload.get("context") or {}),
-            },
-        }
-        
-        # Generate idempotency key if needed
-        final_idempotency_key = idempotency_key
-        if not final_idempotency_key and payload.get("transaction_id"):
-            final_idempotency_key = generate_idempotency_key(payload["transaction_id"])
-        
-        # Validate idempotency key format if provided
-        if final_idempotency_key and not is_valid_idempotency_key(final_idempotency_key):
-            raise XaseError(
-                "Invalid idempotency key format. Use UUID v4 or alphanumeric 16-64 chars",
-                "INVALID_IDEMPOTENCY_KEY",
-            )
+        validate_payload(payload)
+        final_idempotency_key = resolve_idempotency_key(payload, idempotency_key)
+        
+        # Duplicate suppression (payload hash excludes the runtime context),
+        # before sampling so duplicates do not spend rate-limit tokens
+        fingerprint = None
+        if self.dedup is not None:
+            fingerprint = record_fingerprint(payload, final_idempotency_key)
+            if self.dedup.check(fingerprint):
+                return None
+        
+        # Per-policy sampling and rate limits, before any enrichment work
+        if self.gate is not None and not self.gate.admit(payload):
+            self._forget_fingerprint(fingerprint)
+            return None
+        
+        enriched_payload, _ = prepare_record(payload, final_idempotency_key, validate=False)
+        
+        # Digest mode: only hashes and whitelisted fields leave the process
+        if self.digester is not None:
+            enriched_payload = self.digester.apply(enriched_payload)
         
         # Fire-and-forget mode
-        if self.config["fire_and_forget"] and not skip_queue and self.queue:
-            self.queue.enqueue(enriched_payload, final_idempotency_key)
+        if self.config["fire_and_forget"] and not skip_queue:
+            try:
+                if self.agent is not None and self.agent.send(
+                    encode_record(enriched_payload, final_idempotency_key, self._serializer)
+                ):
+                    return None
+                accepted = self._local_queue().enqueue(
+                    enriched_payload, final_idempotency_key, fingerprint
+                )
+            except Exception:
+                self._forget_fingerprint(fingerprint)
+                raise
+            if not accepted:
+                # Dropped by the overflow policy
+                self._forget_fingerprint(fingerprint)
             return None
         
         # Synchronous mode
-        return self._send_record(enriched_payload, final_idempotency_key)
+        try:
+            return self._send_record(enriched_payload, final_idempotency_key)
+        except Exception:
+            self._forget_fingerprint(fingerprint)
+            raise
+    
+    def _forget_fingerprint(self, fingerprint: Optional[bytes]) -> None:
+        """Let a retry of a record that was never sent through the duplicate window."""
+        if fingerprint is not None and self.dedup is not None:
+            self.dedup.forget(fingerprint)
     
     def _send_record(
         self,
@@ -121,39 +360,11 @@ class XaseClient:
         if idempotency_key:
             headers["Idempotency-Key"] = idempotency_key
         
-        # Map SDK payload to API schema
-        body = {
-            "input": payload["input"],
-            "output": payload["output"],
-            "context": payload.get("context"),
-            "policyId": payload["policy"],
-            "policyVersion": payload.get("policy_version"),
-            "decisionType": payload.get("decision_type"),
-            "confidence": payload.get("confidence"),
-            "processingTime": payload.get("processing_time"),
-            "storePayload": payload.get("store_payload"),
-        }
-        
-        return self.http_client.post("/records", body, headers)
+        return self.http_client.post("/records", build_record_body(payload), headers)
     
     def _validate_payload(self, payload: RecordPayload) -> None:
         """Validate record payload."""
-        if not payload.get("policy"):
-            raise XaseError("Policy is required", "MISSING_POLICY")
-        
-        if not payload.get("input") or not isinstance(payload.get("input"), dict):
-            raise XaseError("Input must be a dict", "INVALID_INPUT")
-        
-        if not payload.get("output") or not isinstance(payload.get("output"), dict):
-            raise XaseError("Output must be a dict", "INVALID_OUTPUT")
-        
-        confidence = payload.get("confidence")
-        if confidence is not None:
-            if not isinstance(confidence, (int, float)) or confidence < 0 or confidence > 1:
-                raise XaseError(
-                    "Confidence must be a number between 0 and 1",
-                    "INVALID_CONFIDENCE",
-                )
+        validate_payload(payload)
     
     def flush(self, timeout_s: float = 5.0) -> None:
         """
@@ -165,28 +376,80 @@ class XaseClient:
         if self.queue:
             self.queue.flush(timeout_s)
     
-    def close(self) -> None:
-        """Close client and flush queue."""
+    def close(self, timeout_s: Optional[float] = None) -> None:
+        """
+        Close client, drain the queue and release pooled connections.
+        
+        Args:
+            timeout_s: Maximum time to drain queued records (default: ``close_timeout``)
+        """
+        if timeout_s is None:
+            timeout_s = self.config["close_timeout"]
         try:
-            self.flush(2.0)
-        finally:
             if self.queue:
-                self.queue.close()
+                self.queue.close(timeout_s)
+        finally:
+            if self.agent is not None:
+                self.agent.close()
+            self.http_client.close()
     
     def get_stats(self) -> Optional[Dict[str, Any]]:
-        """Get queue statistics (if fire-and-forget enabled)."""
-        if self.queue:
-            return self.queue.get_stats()
-        return None
+        """Get queue, connection pool and compression statistics (None unless fire-and-forget)."""
+        if not self.config["fire_and_forget"]:
+            return None
+        stats: Dict[str, Any] = self.queue.get_stats() if self.queue else {}
+        stats["http"] = self.http_client.get_pool_stats()
+        stats["compression"] = self.http_client.get_compression_stats()
+        circuit = self.http_client.get_circuit_stats()
+        if circuit is not None:
+            stats["circuit"] = circuit
+        if self.dedup is not None:
+            stats["dedup"] = self.dedup.get_stats()
+        if self.gate is not None:
+            stats["sampling"] = self.gate.get_stats()
+        if self.digester is not None:
+            stats["digest"] = self.digester.get_stats()
+        if self.agent is not None:
+            stats["agent"] = self.agent.get_stats()
+        return stats
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get pipeline metrics (counters, gauges and p50/p99 histogram estimates)."""
+        return self.metrics.snapshot() if self.metrics is not None else {}
+    
+    def export_prometheus(self) -> str:
+        """Render pipeline metrics in the Prometheus text exposition format."""
+        return self.metrics.to_prometheus() if self.metrics is not None else ""
     
     def _cleanup(self) -> None:
         """Cleanup on exit."""
         try:
-            self.flush(2.0)
+            self.close()
         except Exception:
             pass
     
+    def _install_signal_handlers(self) -> None:
+        """Close the client on SIGINT/SIGTERM, then hand the signal to the previous handler."""
+        if threading.current_thread() is not threading.main_thread():
+            return  # signal.signal() only works in the main thread
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(signum)
+            if previous == signal.SIG_IGN:
+                continue
+            self._previous_handlers[signum] = previous
+            signal.signal(signum, self._signal_handler)
+    
     def _signal_handler(self, signum: int, frame: Any) -> None:
         """Handle signals."""
-        self.close()
-        exit(0)
+        try:
+            self.close()
+        except (XaseError, OSError) as e:
+            # Records left behind were already reported through on_error
+            logger.warning(f"Closing the Xase client on signal {signum} failed: {e}")
+        previous = self._previous_handlers.get(signum)
+        if callable(previous):
+            previous(signum, frame)
+        else:
+            # Default disposition: terminate the way the signal normally would
+            signal.signal(signum, signal.SIG_DFL)
+            signal.raise_signal(signum)
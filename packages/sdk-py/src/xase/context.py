@@ -10,11 +10,22 @@ import platform
 import re
 import socket
 import sys
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
 
-def capture_context() -> Dict[str, Any]:
-    """Capture current runtime context."""
+ContextProvider = Callable[[], Any]
+
+# Static runtime context, computed once per process (reset in forked children)
+_static_context: Optional[Dict[str, Any]] = None
+
+# Cheap dynamic providers, evaluated on every capture. Replaced atomically.
+_providers: Tuple[Tuple[str, ContextProvider], ...] = ()
+_providers_lock = threading.Lock()
+
+
+def _build_static_context() -> Dict[str, Any]:
     return {
         "runtime": f"python@{sys.version.split()[0]}",
         "platform": platform.system(),
@@ -23,10 +34,60 @@ def capture_context() -> Dict[str, Any]:
         "pid": os.getpid(),
         "lib_version": __import__("xase").__version__,
         "env": os.getenv("ENV") or os.getenv("PYTHON_ENV") or "development",
-        "timestamp": int(__import__("time").time() * 1000),
     }
 
 
+def reset_static_context() -> None:
+    """Discard the cached static context so it is re-captured on next use."""
+    global _static_context
+    _static_context = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_static_context)
+
+
+def register_context_provider(name: str, provider: ContextProvider) -> None:
+    """
+    Register a dynamic context field evaluated on every record.
+    
+    Providers run on the caller's hot path and must be cheap (e.g. reading
+    the current trace id or model version). A provider returning None or
+    raising is skipped. Registering an existing name replaces it.
+    """
+    global _providers
+    with _providers_lock:
+        _providers = tuple(p for p in _providers if p[0] != name) + ((name, provider),)
+
+
+def unregister_context_provider(name: str) -> None:
+    """Remove a dynamic context provider."""
+    global _providers
+    with _providers_lock:
+        _providers = tuple(p for p in _providers if p[0] != name)
+
+
+def capture_context() -> Dict[str, Any]:
+    """Capture current runtime context."""
+    global _static_context
+    static = _static_context
+    if static is None:
+        static = _static_context = _build_static_context()
+    
+    context = dict(static)
+    context["timestamp"] = int(time.time() * 1000)
+    
+    for name, provider in _providers:
+        try:
+            value = provider()
+        except Exception:  # noqa: BLE001 - user callback
+            continue
+        if value is not None:
+            context[name] = value
+    
+    return context
+
+
 def generate_idempotency_key(data: str) -> str:
     """Generate a stable idempotency key from data."""
     return hashlib.sha256(data.encode()).hexdigest()[:32]
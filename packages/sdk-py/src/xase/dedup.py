@@ -0,0 +1,89 @@
+"""
+XASE SDK - Duplicate Suppression
+
+Bounded window of recently recorded keys, used to short-circuit duplicate
+records from retrying callers and at-least-once pipelines before they cost a
+round trip.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .serialization import canonical_dumps
+from .types import RecordPayload, XaseError
+
+
+def record_fingerprint(payload: RecordPayload, idempotency_key: Optional[str] = None) -> bytes:
+    """
+    Compact fingerprint of a record.
+    
+    Uses the idempotency key when there is one, otherwise a hash of the
+    canonical (key-sorted) payload. Runtime context is not part of the payload
+    at this point, so identical decisions hash identically.
+    """
+    if idempotency_key:
+        data = b"k:" + idempotency_key.encode("utf-8")
+    else:
+        try:
+            data = b"p:" + canonical_dumps(payload)
+        except (TypeError, ValueError) as e:
+            raise XaseError(
+                f"Payload is not JSON serializable: {e}",
+                "INVALID_PAYLOAD",
+                None,
+                {"exception": type(e).__name__},
+            )
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class DedupWindow:
+    """LRU of 16-byte record fingerprints, each remembered for ``window_s`` seconds."""
+    
+    def __init__(self, window_s: float, max_keys: int = 100_000) -> None:
+        self.window_s = window_s
+        self.max_keys = max_keys
+        self._seen: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._suppressed = 0
+    
+    def check(self, fingerprint: bytes) -> bool:
+        """
+        Remember a fingerprint.
+        
+        Returns:
+            True if it was already seen within the window (a duplicate)
+        """
+        now = time.monotonic()
+        with self._lock:
+            expires = self._seen.get(fingerprint)
+            if expires is not None and expires > now:
+                self._suppressed += 1
+                return True
+            
+            self._seen[fingerprint] = now + self.window_s
+            self._seen.move_to_end(fingerprint)
+            
+            # Entries are ordered by insertion time: drop expired and overflow
+            while self._seen:
+                oldest, oldest_expires = next(iter(self._seen.items()))
+                if oldest_expires > now and len(self._seen) <= self.max_keys:
+                    break
+                del self._seen[oldest]
+            return False
+    
+    def forget(self, fingerprint: bytes) -> None:
+        """Drop a fingerprint, e.g. after its record failed to send."""
+        with self._lock:
+            self._seen.pop(fingerprint, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get duplicate suppression statistics."""
+        return {
+            "suppressed": self._suppressed,
+            "keys": len(self._seen),
+            "max_keys": self.max_keys,
+            "window_s": self.window_s,
+        }
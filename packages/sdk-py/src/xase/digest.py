@@ -0,0 +1,167 @@
+"""
+XASE SDK - Payload Digests
+
+In digest mode the SDK records a SHA-256 of the canonical JSON of ``input``
+and ``output`` plus a small whitelist of plain fields, instead of the raw
+data. The hash chain then proves what was seen without carrying it.
+
+The digest of a value is ``sha256(canonical_dumps(value))``: sorted keys,
+compact separators, UTF-8, as produced by
+``json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)``
+for plain JSON values. It is computed incrementally so large feature vectors
+are never encoded into a single string, and anyone holding the original
+payload can recompute it.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from .serialization import canonical_dumps
+from .types import RecordPayload, XaseError
+
+
+DIGEST_KEY = "_digest"
+DIGEST_PREFIX = "sha256:"
+
+# List items encoded per chunk when streaming
+_LIST_CHUNK = 1024
+
+
+def _canonical_chunks(value: Any) -> Iterator[bytes]:
+    """Yield ``canonical_dumps(value)`` in pieces, recursing into dicts and splitting long lists."""
+    if hasattr(value, "tolist") and hasattr(value, "dtype"):
+        value = value.tolist()  # numpy arrays and scalars
+    
+    if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+        yield b"{"
+        for i, key in enumerate(sorted(value)):
+            if i:
+                yield b","
+            yield json.dumps(key, ensure_ascii=False).encode("utf-8")
+            yield b":"
+            yield from _canonical_chunks(value[key])
+        yield b"}"
+    elif isinstance(value, (list, tuple)) and len(value) > _LIST_CHUNK:
+        yield b"["
+        for start in range(0, len(value), _LIST_CHUNK):
+            if start:
+                yield b","
+            yield canonical_dumps(list(value[start:start + _LIST_CHUNK]))[1:-1]
+        yield b"]"
+    else:
+        yield canonical_dumps(value)
+
+
+def payload_digest(value: Any) -> str:
+    """Canonical SHA-256 digest of a JSON-serializable value, as ``"sha256:<hex>"``."""
+    h = hashlib.sha256()
+    try:
+        for chunk in _canonical_chunks(value):
+            h.update(chunk)
+    except (TypeError, ValueError) as e:
+        raise XaseError(
+            f"Payload is not JSON serializable: {e}",
+            "INVALID_PAYLOAD",
+            None,
+            {"exception": type(e).__name__},
+        )
+    return DIGEST_PREFIX + h.hexdigest()
+
+
+def _parse_field(path: str) -> Tuple[str, Tuple[str, ...]]:
+    section, _, rest = path.partition(".")
+    if section not in ("input", "output") or not rest:
+        raise XaseError(
+            f"Invalid digest field '{path}': "
+            "use 'input.<key>' or 'output.<key>' (dots for nesting)",
+            "INVALID_CONFIG",
+        )
+    return section, tuple(rest.split("."))
+
+
+def _lookup(data: Any, keys: Sequence[str]) -> Tuple[bool, Any]:
+    for key in keys:
+        if not isinstance(data, dict) or key not in data:
+            return False, None
+        data = data[key]
+    return True, data
+
+
+def _assign(data: Dict[str, Any], keys: Sequence[str], value: Any) -> None:
+    for key in keys[:-1]:
+        data = data.setdefault(key, {})
+    data[keys[-1]] = value
+
+
+class PayloadDigester:
+    """
+    Replaces a payload's ``input``/``output`` with their digests.
+    
+    ``fields`` are dotted paths (``"output.decision"``, ``"input.applicant.age"``)
+    kept in clear next to the digest; missing fields are skipped.
+    """
+    
+    def __init__(self, fields: Optional[Sequence[str]] = None) -> None:
+        self.fields = list(fields or [])
+        self._paths = [_parse_field(path) for path in self.fields]
+        self._lock = threading.Lock()
+        self._records = 0
+    
+    def _section(self, payload: RecordPayload, section: str) -> Dict[str, Any]:
+        original = payload[section]  # type: ignore[literal-required]
+        digested: Dict[str, Any] = {DIGEST_KEY: payload_digest(original)}
+        for field_section, keys in self._paths:
+            if field_section != section:
+                continue
+            found, value = _lookup(original, keys)
+            if found:
+                _assign(digested, keys, value)
+        return digested
+    
+    def apply(self, payload: RecordPayload) -> RecordPayload:
+        """Return a copy of ``payload`` with digested ``input`` and ``output``."""
+        digested: RecordPayload = {
+            **payload,
+            "input": self._section(payload, "input"),
+            "output": self._section(payload, "output"),
+        }
+        with self._lock:
+            self._records += 1
+        return digested
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get digest mode statistics."""
+        return {"records": self._records, "fields": list(self.fields)}
+
+
+def verify_digest(payload: RecordPayload, recorded: Dict[str, Any]) -> bool:
+    """
+    Check a recorded digest-mode ``input``/``output`` against the original payload.
+    
+    ``recorded`` holds the stored ``input`` and ``output`` (e.g. from the
+    evidence bundle). Every clear field must match the original too.
+    """
+    for section in ("input", "output"):
+        stored = recorded.get(section)
+        if not isinstance(stored, dict) or DIGEST_KEY not in stored:
+            return False
+        original = payload.get(section)
+        if stored[DIGEST_KEY] != payload_digest(original):
+            return False
+        if not _fields_match(original, {k: v for k, v in stored.items() if k != DIGEST_KEY}):
+            return False
+    return True
+
+
+def _fields_match(original: Any, kept: Dict[str, Any]) -> bool:
+    for key, value in kept.items():
+        if not isinstance(original, dict) or key not in original:
+            return False
+        if isinstance(value, dict) and isinstance(original[key], dict):
+            if not _fields_match(original[key], value):
+                return False
+        elif canonical_dumps(value) != canonical_dumps(original[key]):
+            return False
+    return True
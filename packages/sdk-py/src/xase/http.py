@@ -2,17 +2,73 @@
 XASE SDK - HTTP Client with Retry Logic
 """
 
+import gzip
+import os
 import random
+import threading
 import time
-from typing import Any, Dict, Optional
-
-import httpx
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, Dict, Literal, Optional, Union
 
+from .circuit import CircuitBreaker
+from .metrics import Metrics
+from .serialization import Serializer, dumps
 from .types import RecordResult, XaseError
 
+if TYPE_CHECKING:
+    import httpx
+
+
+def _httpx() -> Any:
+    """Import httpx on first use; it dominates ``import xase`` time otherwise."""
+    import httpx
+    return httpx
+
+
+_live_clients: "weakref.WeakSet[HttpClient]" = weakref.WeakSet()
+
+
+def _reset_after_fork() -> None:
+    """Drop pooled connections inherited from the parent process."""
+    for client in list(_live_clients):
+        client._reset_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 
-class HttpClient:
-    """HTTP client with retry logic and exponential backoff."""
+Compression = Literal["gzip", "zstd"]
+
+
+def _zstd_compressor(level: int) -> Callable[[bytes], bytes]:
+    try:
+        import zstandard  # type: ignore
+    except ImportError as e:
+        raise XaseError(
+            "zstd compression requires the 'zstandard' package (pip install zstandard)",
+            "MISSING_DEPENDENCY",
+            None,
+            {"exception": type(e).__name__},
+        )
+    # ZstdCompressor instances are not thread-safe; they are cheap to create
+    return lambda data: zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def make_compressor(
+    compression: Compression, level: Optional[int] = None
+) -> Callable[[bytes], bytes]:
+    """Return a function compressing request bodies with the given encoding."""
+    if compression == "gzip":
+        gzip_level = 6 if level is None else level
+        return lambda data: gzip.compress(data, compresslevel=gzip_level)
+    if compression == "zstd":
+        return _zstd_compressor(3 if level is None else level)
+    raise XaseError(f"Unsupported compression: {compression}", "INVALID_CONFIG")
+
+
+class _BaseHttpClient:
+    """Retry policy and response handling shared by the sync and async clients."""
     
     def __init__(
         self,
@@ -22,6 +78,16 @@ class HttpClient:
         max_retries: int,
         base_delay: float = 0.1,
         max_delay: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: Optional[float] = 30.0,
+        http2: bool = False,
+        serializer: Optional[Serializer] = None,
+        compression: Optional[Compression] = None,
+        compression_threshold: int = 1024,
+        compression_level: Optional[int] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        metrics: Optional[Metrics] = None,
     ) -> None:
         self.api_key = api_key
         self.base_url = base_url
@@ -29,82 +95,466 @@ class HttpClient:
         self.max_retries = max_retries
         self.base_delay = base_delay
         self.max_delay = max_delay
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.serializer = serializer or dumps
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self._compress = make_compressor(compression, compression_level) if compression else None
+        self.circuit_breaker = circuit_breaker
+        self.metrics = metrics
+        # Counters are bumped by every sender thread, like Metrics
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._compressed_requests = 0
+        self._uncompressed_bytes = 0
+        self._compressed_bytes = 0
+        self._compression_time_s = 0.0
     
-    def post(
-        self,
-        endpoint: str,
-        body: Dict[str, Any],
-        headers: Optional[Dict[str, str]] = None,
-    ) -> RecordResult:
-        """Send POST request with retry logic."""
-        url = f"{self.base_url}{endpoint}"
-        
+    def _client_kwargs(self) -> Dict[str, Any]:
+        httpx = _httpx()
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            "timeout": self.timeout,
+            "http2": self.http2,
+        }
+    
+    def _build_headers(self, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
         request_headers = {
             "Content-Type": "application/json",
             "X-API-Key": self.api_key,
         }
         if headers:
             request_headers.update(headers)
+        return request_headers
+    
+    def _body_kwargs(
+        self,
+        body: Union[Dict[str, Any], bytes],
+        headers: Dict[str, str],
+    ) -> Dict[str, Any]:
+        """Encode the body once per request, compressing it above the threshold."""
+        if isinstance(body, (bytes, bytearray)):
+            content = bytes(body)
+        else:
+            try:
+                content = self.serializer(body)
+            except (TypeError, ValueError) as e:
+                raise XaseError(
+                    f"Payload is not JSON serializable: {e}",
+                    "INVALID_PAYLOAD",
+                    None,
+                    {"exception": type(e).__name__},
+                )
+        
+        compress, encoding = self._compress, self.compression
+        if (
+            compress is not None
+            and encoding is not None
+            and len(content) >= self.compression_threshold
+        ):
+            start = time.perf_counter()
+            compressed = compress(content)
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._compression_time_s += elapsed
+                self._compressed_requests += 1
+                self._uncompressed_bytes += len(content)
+                self._compressed_bytes += len(compressed)
+            headers["Content-Encoding"] = encoding
+            content = compressed
+        
+        return {"content": content}
+    
+    def get_circuit_stats(self) -> Optional[Dict[str, Any]]:
+        """Get circuit breaker statistics (None if no breaker is configured)."""
+        return self.circuit_breaker.get_stats() if self.circuit_breaker is not None else None
+    
+    def get_compression_stats(self) -> Dict[str, Any]:
+        """Get request body compression statistics."""
+        with self._stats_lock:
+            compressed_requests = self._compressed_requests
+            uncompressed_bytes = self._uncompressed_bytes
+            compressed_bytes = self._compressed_bytes
+            compression_time_s = self._compression_time_s
+        return {
+            "algorithm": self.compression,
+            "threshold": self.compression_threshold,
+            "compressed_requests": compressed_requests,
+            "uncompressed_bytes": uncompressed_bytes,
+            "compressed_bytes": compressed_bytes,
+            "ratio": compressed_bytes / uncompressed_bytes if uncompressed_bytes else None,
+            "time_ms": compression_time_s * 1000.0,
+        }
+    
+    def _retry_delay(self, response: "httpx.Response", attempt: int) -> Optional[float]:
+        """Return the delay before retrying a failed response, or None to give up."""
+        if attempt >= self.max_retries:
+            return None
+        
+        # Rate limit (429) - retry with Retry-After
+        if response.status_code == 429:
+            retry_after = self._retry_after(response)
+            return retry_after if retry_after is not None else self._get_backoff_delay(attempt)
+        
+        # Server errors (5xx) - retry with backoff, or Retry-After on 503
+        if response.status_code >= 500:
+            retry_after = self._retry_after(response) if response.status_code == 503 else None
+            return retry_after if retry_after is not None else self._get_backoff_delay(attempt)
+        
+        # Client errors (4xx) - don't retry
+        return None
+    
+    @staticmethod
+    def _retry_after(response: "httpx.Response") -> Optional[float]:
+        retry_after = response.headers.get("Retry-After")
+        try:
+            return float(retry_after) if retry_after else None
+        except ValueError:
+            return None
+    
+    def _observe_request(self, started: float) -> None:
+        if self.metrics is not None:
+            self.metrics.inc("http_requests_total")
+            self.metrics.observe("http_request_duration_seconds", time.perf_counter() - started)
+    
+    def _count_request(self) -> None:
+        with self._stats_lock:
+            self._requests += 1
+    
+    def _count_retry(self) -> None:
+        if self.metrics is not None:
+            self.metrics.inc("http_retries_total")
+    
+    def _check_circuit(self) -> None:
+        """Fail fast while the circuit breaker or the Retry-After gate is closed to us."""
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow():
+            raise XaseError(
+                "Circuit breaker open",
+                "CIRCUIT_OPEN",
+                None,
+                {"retry_in_s": breaker.remaining_s()},
+            )
+    
+    def _failed_response_delay(
+        self,
+        response: "httpx.Response",
+        attempt: int,
+        deferrable: bool,
+    ) -> Optional[float]:
+        """Update the breaker for a non-2xx response; return the retry delay, or None to give up."""
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            if response.status_code != 429 and response.status_code < 500:
+                # The API is healthy, the request was rejected
+                breaker.record_success()
+                return None
+            breaker.record_failure()
+            if response.status_code in (429, 503):
+                breaker.defer(self._retry_after(response) or 0.0)
+            if breaker.state == "open" or (deferrable and breaker.is_blocking()):
+                # Leave the retry to the caller (spool/replay) instead of sleeping here;
+                # without one, only the Retry-After gate is waited out in place
+                return None
+        return self._retry_delay(response, attempt)
+    
+    def _transport_failed(self) -> bool:
+        """Record a network failure; returns True if retrying is pointless now."""
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return False
+        breaker.record_failure()
+        return breaker.is_blocking()
+    
+    def _response_error(self, response: "httpx.Response") -> XaseError:
+        try:
+            error_data = response.json() if response.text else {}
+        except ValueError:
+            # e.g. an HTML error page from a proxy; keep the status so 5xx stay retryable
+            error_data = {}
+        if not isinstance(error_data, dict):
+            error_data = {}
+        return XaseError(
+            error_data.get("error", "Request failed"),
+            error_data.get("code", "REQUEST_FAILED"),
+            response.status_code,
+            error_data.get("details"),
+        )
+    
+    def _max_retries_error(self, last_error: Optional[Exception]) -> XaseError:
+        if last_error:
+            return XaseError(
+                f"Max retries exceeded: {last_error}",
+                "MAX_RETRIES",
+                None,
+                {"last_error": str(last_error)},
+            )
+        return XaseError("Max retries exceeded", "MAX_RETRIES")
+    
+    def _get_backoff_delay(self, attempt: int) -> float:
+        """Calculate exponential backoff delay with jitter."""
+        delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+        # Jitter: ±25%
+        jitter = delay * 0.25 * (random.random() * 2 - 1)
+        return max(0, delay + jitter)
+
+
+class HttpClient(_BaseHttpClient):
+    """HTTP client with connection pooling, retry logic and exponential backoff."""
+    
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._client: Optional["httpx.Client"] = None
+        self._client_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._clients_created = 0
+        
+        _live_clients.add(self)
+    
+    def _get_client(self) -> "httpx.Client":
+        """Return the pooled client, rebuilding it in forked children."""
+        client = self._client
+        if client is not None and self._client_pid == os.getpid():
+            return client
+        
+        with self._lock:
+            if self._client is None or self._client_pid != os.getpid():
+                try:
+                    self._client = _httpx().Client(**self._client_kwargs())
+                except ImportError as e:
+                    raise XaseError(
+                        "HTTP/2 requires the 'h2' package (pip install httpx[http2])",
+                        "MISSING_DEPENDENCY",
+                        None,
+                        {"exception": type(e).__name__},
+                    )
+                self._client_pid = os.getpid()
+                self._clients_created += 1
+            return self._client
+    
+    def _reset_in_child(self) -> None:
+        """Forget the parent's client without closing sockets shared with it."""
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._client = None
+        self._client_pid = None
+    
+    def close(self) -> None:
+        """Close pooled connections."""
+        with self._lock:
+            if self._client is not None and self._client_pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._client_pid = None
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        connections = []
+        client = self._client
+        if client is not None and self._client_pid == os.getpid():
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+        
+        idle = sum(1 for c in connections if c.is_idle())
+        return {
+            "requests": self._requests,
+            "clients_created": self._clients_created,
+            "connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "http2": self.http2,
+        }
+    
+    def post(
+        self,
+        endpoint: str,
+        body: Union[Dict[str, Any], bytes],
+        headers: Optional[Dict[str, str]] = None,
+        deferrable: bool = False,
+    ) -> RecordResult:
+        """
+        Send POST request with retry logic. ``body`` may be pre-serialized JSON bytes.
         
+        ``deferrable`` callers retry later themselves (e.g. from a spool), so a
+        Retry-After from the API ends the request instead of being slept out.
+        """
+        url = f"{self.base_url}{endpoint}"
+        request_headers = self._build_headers(headers)
+        body_kwargs = self._body_kwargs(body, request_headers)
+        
+        client = self._get_client()
+        httpx = _httpx()
         last_error: Optional[Exception] = None
         
         for attempt in range(self.max_retries + 1):
             try:
-                response = httpx.post(
+                self._check_circuit()
+                self._count_request()
+                started = time.perf_counter()
+                response = client.post(
                     url,
-                    json=body,
                     headers=request_headers,
                     timeout=self.timeout,
+                    **body_kwargs,
                 )
+                self._observe_request(started)
                 
                 # Success (2xx)
                 if response.is_success:
-                    return response.json()
-                
-                # Rate limit (429) - retry with Retry-After
-                if response.status_code == 429:
-                    retry_after = response.headers.get("Retry-After")
-                    delay = (
-                        float(retry_after)
-                        if retry_after
-                        else self._get_backoff_delay(attempt)
-                    )
-                    
-                    if attempt < self.max_retries:
-                        time.sleep(delay)
-                        continue
+                    if self.circuit_breaker is not None:
+                        self.circuit_breaker.record_success()
+                    result: RecordResult = response.json()
+                    return result
                 
-                # Server errors (5xx) - retry with backoff
-                if response.status_code >= 500:
-                    if attempt < self.max_retries:
-                        time.sleep(self._get_backoff_delay(attempt))
-                        continue
+                delay = self._failed_response_delay(response, attempt, deferrable)
+                if delay is not None:
+                    self._count_retry()
+                    time.sleep(delay)
+                    continue
                 
-                # Client errors (4xx) - don't retry, throw immediately
-                error_data = response.json() if response.text else {}
-                raise XaseError(
-                    error_data.get("error", "Request failed"),
-                    error_data.get("code", "REQUEST_FAILED"),
-                    response.status_code,
-                    error_data.get("details"),
-                )
+                raise self._response_error(response)
             
-            except httpx.TimeoutException as e:
+            # NetworkError and RemoteProtocolError cover pooled connections the server closed
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
                 last_error = e
+                if self._transport_failed():
+                    break
                 if attempt < self.max_retries:
+                    self._count_retry()
                     time.sleep(self._get_backoff_delay(attempt))
                     continue
             
-            except httpx.ConnectError as e:
+            except XaseError:
+                raise
+            
+            except Exception as e:  # noqa: BLE001 - callers only handle XaseError
+                if isinstance(e, httpx.TransportError):
+                    self._transport_failed()
+                raise XaseError(
+                    str(e),
+                    "UNKNOWN_ERROR",
+                    None,
+                    {"exception": type(e).__name__},
+                )
+        
+        # Max retries exceeded
+        raise self._max_retries_error(last_error)
+
+
+async def _asyncio_sleep(delay: float) -> None:
+    # asyncio is imported here so sync-only users do not pay for it at import time
+    import asyncio
+    await asyncio.sleep(delay)
+
+
+class AsyncHttpClient(_BaseHttpClient):
+    """Asyncio HTTP client with connection pooling and the same retry policy as HttpClient."""
+    
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._client: Optional["httpx.AsyncClient"] = None
+    
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            try:
+                self._client = _httpx().AsyncClient(**self._client_kwargs())
+            except ImportError as e:
+                raise XaseError(
+                    "HTTP/2 requires the 'h2' package (pip install httpx[http2])",
+                    "MISSING_DEPENDENCY",
+                    None,
+                    {"exception": type(e).__name__},
+                )
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        return {
+            "requests": self._requests,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "http2": self.http2,
+        }
+    
+    async def post(
+        self,
+        endpoint: str,
+        body: Union[Dict[str, Any], bytes],
+        headers: Optional[Dict[str, str]] = None,
+        deferrable: bool = False,
+    ) -> RecordResult:
+        """
+        Send POST request with retry logic. ``body`` may be pre-serialized JSON bytes.
+        
+        ``deferrable`` callers retry later themselves (e.g. from a spool), so a
+        Retry-After from the API ends the request instead of being slept out.
+        """
+        url = f"{self.base_url}{endpoint}"
+        request_headers = self._build_headers(headers)
+        body_kwargs = self._body_kwargs(body, request_headers)
+        
+        client = self._get_client()
+        httpx = _httpx()
+        last_error: Optional[Exception] = None
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._check_circuit()
+                self._count_request()
+                started = time.perf_counter()
+                response = await client.post(
+                    url,
+                    headers=request_headers,
+                    timeout=self.timeout,
+                    **body_kwargs,
+                )
+                self._observe_request(started)
+                
+                if response.is_success:
+                    if self.circuit_breaker is not None:
+                        self.circuit_breaker.record_success()
+                    result: RecordResult = response.json()
+                    return result
+                
+                delay = self._failed_response_delay(response, attempt, deferrable)
+                if delay is not None:
+                    self._count_retry()
+                    await _asyncio_sleep(delay)
+                    continue
+                
+                raise self._response_error(response)
+            
+            # NetworkError and RemoteProtocolError cover pooled connections the server closed
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
                 last_error = e
+                if self._transport_failed():
+                    break
                 if attempt < self.max_retries:
-                    time.sleep(self._get_backoff_delay(attempt))
+                    self._count_retry()
+                    await _asyncio_sleep(self._get_backoff_delay(attempt))
                     continue
             
             except XaseError:
                 raise
             
-            except Exception as e:
+            except Exception as e:  # noqa: BLE001 - callers only handle XaseError
+                if isinstance(e, httpx.TransportError):
+                    self._transport_failed()
                 raise XaseError(
                     str(e),
                     "UNKNOWN_ERROR",
@@ -112,20 +562,4 @@ class HttpClient:
                     {"exception": type(e).__name__},
                 )
         
-        # Max retries exceeded
-        if last_error:
-            raise XaseError(
-                f"Max retries exceeded: {last_error}",
-                "MAX_RETRIES",
-                None,
-                {"last_error": str(last_error)},
-            )
-        
-        raise XaseError("Max retries exceeded", "MAX_RETRIES")
-    
-    def _get_backoff_delay(self, attempt: int) -> float:
-        """Calculate exponential backoff delay with jitter."""
-        delay = min(self.base_delay * (2 ** attempt), self.max_delay)
-        # Jitter: ±25%
-        jitter = delay * 0.25 * (random.random() * 2 - 1)
-        return max(0, delay + jitter)
+        raise self._max_retries_error(last_error)
@@ -0,0 +1,262 @@
+"""
+XASE SDK - Pipeline Metrics
+
+Counters, gauges and histograms for the evidence pipeline (enqueue rate,
+record-to-ack latency, HTTP latency, batch sizes, retries, drops by reason,
+queue high-water mark). Exported as a dict snapshot, in the Prometheus text
+format, or forwarded to an OpenTelemetry meter.
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .types import XaseError
+
+
+LATENCY_BUCKETS_S = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# name -> (type, help, histogram buckets)
+_DEFINITIONS: Dict[str, Tuple[str, str, Optional[Sequence[float]]]] = {
+    "records_enqueued_total": ("counter", "Records accepted by the queue", None),
+    "records_acked_total": ("counter", "Records acknowledged by the API", None),
+    "records_dropped_total": ("counter", "Records dropped, by reason", None),
+    "http_requests_total": (
+        "counter",
+        "HTTP responses received (including retried attempts)",
+        None,
+    ),
+    "http_retries_total": ("counter", "HTTP requests retried after a transient failure", None),
+    "queue_size": ("gauge", "Records waiting in the queue", None),
+    "queue_high_water_mark": ("gauge", "Largest queue size observed", None),
+    "record_ack_latency_seconds": (
+        "histogram",
+        "Time from record() to API acknowledgement",
+        LATENCY_BUCKETS_S,
+    ),
+    "http_request_duration_seconds": (
+        "histogram",
+        "Duration of single HTTP requests",
+        LATENCY_BUCKETS_S,
+    ),
+    "batch_size": ("histogram", "Records per send", BATCH_SIZE_BUCKETS),
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram with interpolated quantile estimates."""
+    
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            if n and cumulative + n >= rank:
+                if i == len(self.buckets):
+                    return self.max
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = min(self.buckets[i], self.max)
+                return lower + (upper - lower) * max(0.0, rank - cumulative) / n
+            cumulative += n
+        return self.max
+
+
+class _RateWindow:
+    """Events per second over a sliding window of one-second slots."""
+    
+    def __init__(self, window_s: int = 10) -> None:
+        self.window_s = window_s
+        self._slots = [0] * window_s
+        self._stamps = [-1] * window_s
+    
+    def add(self, n: int = 1) -> None:
+        second = int(time.monotonic())
+        i = second % self.window_s
+        if self._stamps[i] != second:
+            self._stamps[i] = second
+            self._slots[i] = 0
+        self._slots[i] += n
+    
+    def rate(self) -> float:
+        now = int(time.monotonic())
+        total = sum(
+            n for n, stamp in zip(self._slots, self._stamps)
+            if 0 <= now - stamp < self.window_s
+        )
+        return total / self.window_s
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metrics:
+    """Thread-safe registry shared by a client's HTTP client and queue."""
+    
+    def __init__(self, namespace: str = "xase") -> None:
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._enqueue_rate = _RateWindow()
+        self._otel: Optional[Dict[str, Any]] = None
+        
+        for name, (kind, _, buckets) in _DEFINITIONS.items():
+            if kind == "counter":
+                self._counters[name] = {}
+            elif kind == "gauge":
+                self._gauges[name] = 0.0
+            else:
+                self._histograms[name] = Histogram(buckets or LATENCY_BUCKETS_S)
+    
+    def _reset_in_child(self) -> None:
+        # The lock may have been held by a thread that does not exist after fork
+        self._lock = threading.Lock()
+    
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key: Labels = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + amount
+            if name == "records_enqueued_total":
+                self._enqueue_rate.add(int(amount))
+        if self._otel is not None:
+            self._otel[name].add(amount, labels)
+    
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self._histograms[name].observe(value)
+        if self._otel is not None:
+            self._otel[name].record(value)
+    
+    def track_queue_size(self, size: int) -> None:
+        """Update the queue size gauge and its high-water mark."""
+        self._gauges["queue_size"] = size
+        if size > self._gauges["queue_high_water_mark"]:
+            with self._lock:
+                if size > self._gauges["queue_high_water_mark"]:
+                    self._gauges["queue_high_water_mark"] = size
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values, with p50/p99 estimates for histograms."""
+        with self._lock:
+            counters: Dict[str, Any] = {}
+            for name, series in self._counters.items():
+                if name == "records_dropped_total":
+                    counters[name] = {dict(k).get("reason", ""): v for k, v in series.items()}
+                else:
+                    counters[name] = sum(series.values())
+            
+            histograms = {
+                name: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "p50": h.quantile(0.5),
+                    "p99": h.quantile(0.99),
+                    "max": h.max if h.count else None,
+                }
+                for name, h in self._histograms.items()
+            }
+            rate = self._enqueue_rate.rate()
+        
+        return {
+            **counters,
+            **dict(self._gauges),
+            **histograms,
+            "enqueue_rate_per_s": rate,
+        }
+    
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help_text, _) in _DEFINITIONS.items():
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} {kind}")
+                
+                if kind == "counter":
+                    series = self._counters[name] or {(): 0.0}
+                    for labels, value in sorted(series.items()):
+                        lines.append(f"{full}{_format_labels(labels)} {_format_value(value)}")
+                elif kind == "gauge":
+                    lines.append(f"{full} {_format_value(self._gauges[name])}")
+                else:
+                    h = self._histograms[name]
+                    cumulative = 0
+                    for bound, n in zip(h.buckets, h.counts):
+                        cumulative += n
+                        lines.append(f'{full}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+                    lines.append(f'{full}_bucket{{le="+Inf"}} {h.count}')
+                    lines.append(f"{full}_sum {_format_value(h.sum)}")
+                    lines.append(f"{full}_count {h.count}")
+        return "\n".join(lines) + "\n"
+    
+    def bind_opentelemetry(self, meter: Any) -> None:
+        """
+        Forward metrics to an OpenTelemetry meter.
+        
+        Counters and histograms are recorded as they happen; gauges are
+        reported through observable gauge callbacks.
+        """
+        try:
+            from opentelemetry.metrics import Observation  # type: ignore
+        except ImportError as e:
+            raise XaseError(
+                "OpenTelemetry export requires the 'opentelemetry-api' package",
+                "MISSING_DEPENDENCY",
+                None,
+                {"exception": type(e).__name__},
+            )
+        
+        instruments: Dict[str, Any] = {}
+        for name, (kind, help_text, _) in _DEFINITIONS.items():
+            full = f"{self.namespace}.{name}"
+            if kind == "counter":
+                instruments[name] = meter.create_counter(full, description=help_text)
+            elif kind == "histogram":
+                unit = "s" if name.endswith("_seconds") else "1"
+                instruments[name] = meter.create_histogram(full, unit=unit, description=help_text)
+            else:
+                instruments[name] = meter.create_observable_gauge(
+                    full,
+                    callbacks=[self._gauge_callback(name, Observation)],
+                    description=help_text,
+                )
+        self._otel = instruments
+    
+    def _gauge_callback(
+        self, name: str, observation: Callable[[float], Any]
+    ) -> Callable[[Any], List[Any]]:
+        return lambda options: [observation(self._gauges[name])]
@@ -4,17 +4,381 @@ XASE SDK - Fire-and-Forget Queue
 In-memory queue with background worker for zero-latency evidence recording.
 """
 
-import queue
+import itertools
+import json
+import logging
+import os
+import random
+import struct
 import threading
 import time
-from typing import Any, Callable, Dict, Optional
+import weakref
+import zlib
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Literal, Mapping, Optional, Tuple, Union
 
+from .callbacks import CallbackDispatcher
+from .dedup import DedupWindow
 from .http import HttpClient
+from .metrics import Metrics
+from .serialization import Serializer, dumps
+from .spool import Spool
 from .types import RecordPayload, RecordResult, XaseError
 
+logger = logging.getLogger(__name__)
+
+
+def build_record_body(payload: RecordPayload) -> Dict[str, Any]:
+    """Map SDK payload to API schema."""
+    return {
+        "input": payload["input"],
+        "output": payload["output"],
+        "context": payload.get("context"),
+        "policyId": payload["policy"],
+        "policyVersion": payload.get("policy_version"),
+        "decisionType": payload.get("decision_type"),
+        "confidence": payload.get("confidence"),
+        "processingTime": payload.get("processing_time"),
+        "storePayload": payload.get("store_payload"),
+    }
+
+
+OverflowPolicy = Literal["block", "drop_newest", "drop_oldest", "shed", "spill"]
+
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest", "shed", "spill")
+
+# Overflow counters that mean a record was lost, and their metrics drop reason
+DROP_REASONS = {
+    "dropped_newest": "queue_full",
+    "dropped_oldest": "evicted_oldest",
+    "block_timeouts": "block_timeout",
+    "shed": "shed",
+}
+
+_live_queues: "weakref.WeakSet[Queue]" = weakref.WeakSet()
+
+
+def _restart_after_fork() -> None:
+    """Give queues inherited through fork fresh locks and their own worker threads."""
+    for queue in list(_live_queues):
+        queue._reset_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+# Where records go while the HTTP client's circuit breaker is open
+CircuitFallback = Literal["spool", "drop"]
+
+
+def default_priority(payload: RecordPayload) -> float:
+    """Priority used for load shedding: the payload's ``priority`` (0..1), default 0.5."""
+    priority = payload.get("priority")
+    return 0.5 if priority is None else float(priority)
+
+
+def shed_probability(fill_ratio: float, priority: float, threshold: float) -> float:
+    """
+    Probability of shedding a record under load.
+    
+    Zero below ``threshold``; above it, grows linearly with queue fill and is
+    scaled by ``1 - priority``, so records with priority 1.0 are never shed.
+    """
+    if priority >= 1.0 or fill_ratio < threshold:
+        return 0.0
+    pressure = 1.0 if threshold >= 1.0 else min(1.0, (fill_ratio - threshold) / (1.0 - threshold))
+    return pressure * (1.0 - max(0.0, priority))
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Whether a send failure is transient (network, 429, 5xx) rather than a rejected record."""
+    if not isinstance(error, XaseError):
+        return False
+    if error.code in ("MAX_RETRIES", "CIRCUIT_OPEN"):
+        return True
+    return error.status_code is not None and (error.status_code == 429 or error.status_code >= 500)
+
+
+class QueuedRecord:
+    """A record mapped to the API body and serialized once, at enqueue time."""
+    
+    __slots__ = ("body", "idempotency_key", "enqueued_at", "fingerprint")
+    
+    _KEY_LENGTH = struct.Struct(">H")
+    
+    def __init__(self, body: bytes, idempotency_key: Optional[str] = None) -> None:
+        self.body = body
+        self.idempotency_key = idempotency_key
+        # Monotonic enqueue time for latency metrics; 0.0 when unknown (e.g. replayed)
+        self.enqueued_at = 0.0
+        # Duplicate-window fingerprint, forgotten if the record is lost (not spooled)
+        self.fingerprint: Optional[bytes] = None
+    
+    @property
+    def size(self) -> int:
+        """Bytes accounted against the queue's byte budget."""
+        return len(self.body) + (len(self.idempotency_key) if self.idempotency_key else 0)
+    
+    def to_bytes(self) -> bytes:
+        """Serialize for the disk spool."""
+        key = (self.idempotency_key or "").encode("utf-8")
+        return self._KEY_LENGTH.pack(len(key)) + key + self.body
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "QueuedRecord":
+        (key_length,) = cls._KEY_LENGTH.unpack_from(data)
+        start = cls._KEY_LENGTH.size
+        key = data[start:start + key_length].decode("utf-8") or None
+        return cls(data[start + key_length:], key)
+
+
+def encode_record(
+    payload: RecordPayload,
+    idempotency_key: Optional[str] = None,
+    serializer: Optional[Serializer] = None,
+) -> QueuedRecord:
+    """Map a payload to the API body and serialize it."""
+    try:
+        body = (serializer or dumps)(build_record_body(payload))
+    except (TypeError, ValueError) as e:
+        raise XaseError(
+            f"Payload is not JSON serializable: {e}",
+            "INVALID_PAYLOAD",
+            None,
+            {"exception": type(e).__name__},
+        )
+    # Custom serializers may add a trailing newline; batches splice keys before the "}"
+    body = body.rstrip()
+    if not body.endswith(b"}"):
+        raise XaseError("JSON serializer did not produce an object", "INVALID_PAYLOAD")
+    return QueuedRecord(body, idempotency_key)
+
+
+def build_batch_content(records: List[QueuedRecord]) -> bytes:
+    """Build a POST /records/batch body by splicing pre-serialized records."""
+    parts = []
+    for record in records:
+        if record.idempotency_key:
+            # Bodies are JSON objects: insert the key before the closing brace
+            key = json.dumps(record.idempotency_key).encode("utf-8")
+            parts.append(record.body[:-1] + b',"idempotencyKey":' + key + b"}")
+        else:
+            parts.append(record.body)
+    return b'{"records":[' + b",".join(parts) + b"]}"
+
+
+def batch_outcomes(
+    response: Mapping[str, Any],
+    count: int,
+) -> List[Union[RecordResult, XaseError]]:
+    """Split a batch response into one result or error per submitted record."""
+    results = response.get("results") or []
+    outcomes: List[Union[RecordResult, XaseError]] = []
+    
+    for index in range(count):
+        if index >= len(results):
+            outcomes.append(
+                XaseError(
+                    "Missing result for batched record", "BATCH_INCOMPLETE", None, {"index": index}
+                )
+            )
+            continue
+        
+        result = results[index]
+        if result.get("error"):
+            outcomes.append(
+                XaseError(
+                    result["error"],
+                    result.get("code", "REQUEST_FAILED"),
+                    result.get("status"),
+                    result.get("details"),
+                )
+            )
+        else:
+            outcomes.append(result)
+    
+    return outcomes
+
+
+class _RecordBuffer:
+    """
+    FIFO of queued records bounded by both item count and total bytes.
+    
+    Once closed, ``get`` returns the remaining records and then None instead
+    of blocking, so consumers drain it and stop.
+    """
+    
+    def __init__(self, max_items: int, max_bytes: int) -> None:
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._items: Deque[QueuedRecord] = deque()
+        self._bytes = 0
+        self._unfinished = 0
+        self._closed = False
+        self._init_locks()
+    
+    def _init_locks(self) -> None:
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._all_done = threading.Condition(self._lock)
+    
+    def _reset_in_child(self) -> None:
+        """Fresh locks after fork; queued records belong to the parent, which sends them."""
+        self._init_locks()
+        self._items.clear()
+        self._bytes = 0
+        self._unfinished = 0
+    
+    def _fits(self, record: QueuedRecord) -> bool:
+        if self.max_items > 0 and len(self._items) >= self.max_items:
+            return False
+        # An oversized record is still accepted into an empty buffer
+        return self.max_bytes <= 0 or not self._items or self._bytes + record.size <= self.max_bytes
+    
+    def _append(self, record: QueuedRecord) -> None:
+        self._items.append(record)
+        self._bytes += record.size
+        self._unfinished += 1
+        self._not_empty.notify()
+    
+    def _popleft(self) -> QueuedRecord:
+        record = self._items.popleft()
+        self._bytes -= record.size
+        self._not_full.notify()
+        return record
+    
+    def put_nowait(self, record: QueuedRecord) -> bool:
+        with self._lock:
+            if self._closed or not self._fits(record):
+                return False
+            self._append(record)
+            return True
+    
+    def put(self, record: QueuedRecord, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._not_full:
+            while not self._fits(record):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    return False
+                self._not_full.wait(remaining)
+            self._append(record)
+            return True
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[QueuedRecord]:
+        """Wait for the next record; None on timeout or once closed and empty."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._not_empty:
+            while not self._items:
+                if self._closed:
+                    return None
+                if deadline is None:
+                    self._not_empty.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._not_empty.wait(remaining)
+            return self._popleft()
+    
+    def get_nowait(self) -> Optional[QueuedRecord]:
+        with self._lock:
+            return self._popleft() if self._items else None
+    
+    def evict_oldest(self) -> Optional[QueuedRecord]:
+        """Remove the oldest record without sending it."""
+        with self._lock:
+            if not self._items:
+                return None
+            record = self._popleft()
+            self._task_done(1)
+            return record
+    
+    def task_done(self, count: int = 1) -> None:
+        with self._lock:
+            self._task_done(count)
+    
+    def _task_done(self, count: int) -> None:
+        self._unfinished -= count
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._all_done.notify_all()
+    
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every record has been taken and marked done; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._all_done:
+            while self._unfinished:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._all_done.wait(remaining)
+            return True
+    
+    def close(self) -> None:
+        """Stop accepting records and wake every waiting consumer and producer."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+    
+    def abort(self) -> List[QueuedRecord]:
+        """Close and remove every queued record, returning them unsent."""
+        with self._lock:
+            self._closed = True
+            records = list(self._items)
+            self._items.clear()
+            self._bytes = 0
+            self._task_done(len(records))
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+            return records
+    
+    def qsize(self) -> int:
+        return len(self._items)
+    
+    def empty(self) -> bool:
+        return not self._items
+    
+    def nbytes(self) -> int:
+        return self._bytes
+    
+    def fill_ratio(self) -> float:
+        count_ratio = len(self._items) / self.max_items if self.max_items > 0 else 0.0
+        bytes_ratio = self._bytes / self.max_bytes if self.max_bytes > 0 else 0.0
+        return max(count_ratio, bytes_ratio)
+
 
 class Queue:
-    """Fire-and-forget queue with background worker."""
+    """Fire-and-forget queue with a pool of background sender workers.
+    
+    Records are mapped to the API body and serialized at enqueue time, so
+    workers only concatenate bytes, and the queue is bounded by both
+    ``max_size`` records and ``max_bytes`` of serialized bodies.
+    
+    With ``preserve_order`` enabled, records are partitioned by
+    ``transaction_id`` so that each transaction is always handled by the
+    same worker and its records are sent in enqueue order.
+    
+    With a ``spool``, records that overflow the queue or fail with a
+    transient error are written to disk instead of being dropped, and a
+    replay thread sends them once the API accepts records again.
+    
+    ``overflow_policy`` selects what happens when the queue is full:
+    
+    - ``block``: wait up to ``block_timeout_s`` for space, then drop the record
+    - ``drop_newest``: reject the incoming record
+    - ``drop_oldest``: evict the oldest queued record (default without a spool)
+    - ``shed``: above ``shed_threshold`` fill, drop records with a probability
+      that grows with load and shrinks with ``priority_fn(payload)``
+    - ``spill``: write the record to the spool (default with a spool)
+    
+    Workers sleep on condition variables rather than polling: ``flush``
+    returns as soon as the last record is acknowledged, and ``close`` drains
+    the queue until its deadline. In a forked child the queue starts empty
+    with new worker threads (the parent still sends what it had queued).
+    """
     
     def __init__(
         self,
@@ -22,138 +386,551 @@ class Queue:
         max_size: int,
         on_error: Optional[Callable[[XaseError], None]] = None,
         on_success: Optional[Callable[[RecordResult], None]] = None,
+        batch_size: int = 1,
+        batch_linger_ms: float = 0.0,
+        batch_endpoint: str = "/records/batch",
+        num_workers: int = 1,
+        preserve_order: bool = False,
+        spool: Optional[Spool] = None,
+        replay_interval_s: float = 1.0,
+        replay_max_backoff_s: float = 60.0,
+        overflow_policy: Optional[OverflowPolicy] = None,
+        block_timeout_s: float = 1.0,
+        shed_threshold: float = 0.8,
+        priority_fn: Optional[Callable[[RecordPayload], float]] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        serializer: Optional[Serializer] = None,
+        circuit_fallback: CircuitFallback = "spool",
+        callback_queue_size: int = 10000,
+        callback_batch_size: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+        dedup: Optional[DedupWindow] = None,
     ) -> None:
+        if batch_size < 1:
+            raise XaseError("batch_size must be >= 1", "INVALID_CONFIG")
+        if num_workers < 1:
+            raise XaseError("num_workers must be >= 1", "INVALID_CONFIG")
+        if overflow_policy is None:
+            overflow_policy = "spill" if spool else "drop_oldest"
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise XaseError(f"Invalid overflow policy: {overflow_policy}", "INVALID_CONFIG")
+        if overflow_policy == "spill" and spool is None:
+            raise XaseError("overflow_policy 'spill' requires a spool", "INVALID_CONFIG")
+        if circuit_fallback not in ("spool", "drop"):
+            raise XaseError(f"Invalid circuit fallback: {circuit_fallback}", "INVALID_CONFIG")
+        
         self.http_client = http_client
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.on_error = on_error
         self.on_success = on_success
+        self.batch_size = batch_size
+        self.batch_linger_s = max(0.0, batch_linger_ms) / 1000.0
+        self.batch_endpoint = batch_endpoint
+        self.num_workers = num_workers
+        self.preserve_order = preserve_order
+        self.spool = spool
+        self.replay_interval_s = replay_interval_s
+        self.replay_max_backoff_s = replay_max_backoff_s
+        self.overflow_policy = overflow_policy
+        self.block_timeout_s = block_timeout_s
+        self.shed_threshold = shed_threshold
+        self.priority_fn = priority_fn or default_priority
+        self.serializer = serializer
+        self.circuit_fallback = circuit_fallback
+        self.metrics = metrics
+        self.dedup = dedup
         
-        self._queue: queue.Queue[Dict[str, Any]] = queue.Queue(maxsize=max_size)
+        # Callbacks run off the sender threads unless callback_queue_size is 0
+        self._callbacks: Optional[CallbackDispatcher] = None
+        if callback_queue_size > 0 and (on_success or on_error):
+            self._callbacks = CallbackDispatcher(
+                on_success=on_success,
+                on_error=on_error,
+                max_pending=callback_queue_size,
+                batch_size=callback_batch_size,
+            )
+        
+        # One shared queue, or one partition per worker when ordering by key
+        partition_count = num_workers if preserve_order else 1
+        partition_size = -(-max_size // partition_count)
+        partition_bytes = -(-max_bytes // partition_count)
+        self._partitions: List[_RecordBuffer] = [
+            _RecordBuffer(partition_size, partition_bytes) for _ in range(partition_count)
+        ]
+        self._round_robin = itertools.count()
+        self._in_flight = [0] * num_workers
+        self._sent = [0] * num_workers
         self._closed = False
-        self._worker_thread: Optional[threading.Thread] = None
+        self._worker_threads: List[threading.Thread] = []
+        self._replay_thread: Optional[threading.Thread] = None
+        self._replay_wakeup = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._overflow_counts = {
+            "blocked": 0,
+            "block_timeouts": 0,
+            "dropped_newest": 0,
+            "dropped_oldest": 0,
+            "shed": 0,
+            "spilled": 0,
+        }
+        self._circuit_counts = {"spooled": 0, "dropped": 0}
         
-        self._start_worker()
+        self._start_workers()
+        _live_queues.add(self)
     
     def enqueue(
         self,
         payload: RecordPayload,
         idempotency_key: Optional[str] = None,
-    ) -> None:
-        """Enqueue a record for async processing."""
+        fingerprint: Optional[bytes] = None,
+    ) -> bool:
+        """
+        Enqueue a record for async processing.
+        
+        ``fingerprint`` is removed from ``dedup`` if the record is later
+        dropped or rejected, so a retry by the caller is not suppressed.
+        
+        Returns:
+            False if the overflow policy dropped the record
+        """
         if self._closed:
             raise XaseError("Queue is closed", "QUEUE_CLOSED")
         
-        item = {
-            "payload": payload,
-            "idempotency_key": idempotency_key,
-        }
+        partition = self._partition_for(payload.get("transaction_id"))
         
-        try:
-            self._queue.put_nowait(item)
-        except queue.Full:
-            # Drop oldest item
-            try:
-                dropped = self._queue.get_nowait()
-                if self.on_error:
-                    self.on_error(
-                        XaseError("Queue full, item dropped", "QUEUE_FULL")
-                    )
-            except queue.Empty:
-                pass
+        priority = 0.5
+        if self.overflow_policy == "shed":
+            priority = self.priority_fn(payload)
+            fill_ratio = partition.fill_ratio()
+            if random.random() < shed_probability(fill_ratio, priority, self.shed_threshold):
+                self._count("shed")
+                self._report_error(XaseError("Record shed under load", "QUEUE_SHED"))
+                return False
+        
+        record = encode_record(payload, idempotency_key, self.serializer)
+        record.fingerprint = fingerprint
+        return self._put(partition, record, priority)
+    
+    def enqueue_encoded(self, record: QueuedRecord, partition_key: Optional[str] = None) -> bool:
+        """Enqueue a record that was already mapped and serialized (e.g. by an agent client)."""
+        if self._closed:
+            raise XaseError("Queue is closed", "QUEUE_CLOSED")
+        return self._put(self._partition_for(partition_key), record, 0.5)
+    
+    def _put(self, partition: _RecordBuffer, record: QueuedRecord, priority: float) -> bool:
+        record.enqueued_at = time.monotonic()
+        if not (partition.put_nowait(record) or self._handle_overflow(partition, record, priority)):
+            return False
+        if self.metrics is not None:
+            self.metrics.inc("records_enqueued_total")
+            self.metrics.track_queue_size(self._size())
+        return True
+    
+    def _handle_overflow(
+        self,
+        partition: _RecordBuffer,
+        record: QueuedRecord,
+        priority: float,
+    ) -> bool:
+        """
+        Apply the overflow policy to a record that did not fit in the queue.
+        
+        Returns:
+            True if the record was accepted (queued or spilled to the spool)
+        """
+        policy = self.overflow_policy
+        
+        if policy == "block":
+            self._count("blocked")
+            if not partition.put(record, timeout=self.block_timeout_s):
+                self._count("block_timeouts")
+                self._report_error(
+                    XaseError("Queue full, record dropped after blocking", "QUEUE_FULL")
+                )
+                return False
+            return True
+        
+        if policy == "spill" and self.spool and self.spool.append(record.to_bytes()):
+            self._count("spilled")
+            return True
+        
+        if policy == "drop_newest" or (policy == "shed" and priority < 1.0):
+            self._count("dropped_newest")
+            self._report_error(XaseError("Queue full, record dropped", "QUEUE_FULL"))
+            return False
+        
+        # Drop oldest items until the record fits (also the fallback when the spool is full)
+        while not partition.put_nowait(record):
+            evicted = partition.evict_oldest()
+            if evicted is None:
+                raise XaseError("Queue full", "QUEUE_FULL")
+            self._forget(evicted)
+            self._count("dropped_oldest")
+            self._report_error(XaseError("Queue full, item dropped", "QUEUE_FULL"))
+        return True
+    
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._overflow_counts[name] += 1
+        if name in DROP_REASONS:
+            self._dropped(DROP_REASONS[name])
+    
+    def _dropped(self, reason: str, n: int = 1) -> None:
+        if self.metrics is not None:
+            self.metrics.inc("records_dropped_total", n, reason=reason)
+    
+    def _forget(self, record: QueuedRecord) -> None:
+        """Let the caller retry a lost record through the duplicate window."""
+        if self.dedup is not None and record.fingerprint is not None:
+            self.dedup.forget(record.fingerprint)
+    
+    def _acked(self, record: QueuedRecord) -> None:
+        if self.metrics is not None:
+            self.metrics.inc("records_acked_total")
+            if record.enqueued_at:
+                self.metrics.observe(
+                    "record_ack_latency_seconds", time.monotonic() - record.enqueued_at
+                )
+    
+    def _partition_for(self, key: Optional[str]) -> _RecordBuffer:
+        """Pick the partition for a record; stable per transaction_id."""
+        if len(self._partitions) == 1:
+            return self._partitions[0]
+        if key:
+            index = zlib.crc32(str(key).encode()) % len(self._partitions)
+        else:
+            index = next(self._round_robin) % len(self._partitions)
+        return self._partitions[index]
+    
+    def _start_workers(self) -> None:
+        """Start background worker threads."""
+        for worker_index in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._process_queue,
+                args=(worker_index,),
+                name=f"xase-queue-{worker_index}",
+                daemon=True,
+            )
+            thread.start()
+            self._worker_threads.append(thread)
+        
+        if self.spool:
+            self._replay_thread = threading.Thread(
+                target=self._replay_spool,
+                name="xase-spool-replay",
+                daemon=True,
+            )
+            self._replay_thread.start()
+    
+    def _process_queue(self, worker_index: int = 0) -> None:
+        """Process queue items in background until the partition is closed and drained."""
+        source = self._partitions[worker_index % len(self._partitions)]
+        
+        while True:
+            first = source.get()
+            if first is None:
+                return
             
-            # Try again
+            batch = self._drain_batch(source, first)
+            if self.metrics is not None:
+                self.metrics.observe("batch_size", len(batch))
+                self.metrics.track_queue_size(self._size())
+            self._in_flight[worker_index] = len(batch)
             try:
-                self._queue.put_nowait(item)
-            except queue.Full:
-                raise XaseError("Queue full", "QUEUE_FULL")
+                # Only acknowledged records count as sent; the rest were spooled or dropped
+                self._sent[worker_index] += self._send_batch(batch)
+            finally:
+                self._in_flight[worker_index] = 0
+                source.task_done(len(batch))
     
-    def _start_worker(self) -> None:
-        """Start background worker thread."""
-        self._worker_thread = threading.Thread(
-            target=self._process_queue,
-            daemon=True,
-        )
-        self._worker_thread.start()
+    def _drain_batch(
+        self,
+        source: _RecordBuffer,
+        first: QueuedRecord,
+    ) -> List[QueuedRecord]:
+        """Collect up to batch_size items, waiting at most batch_linger_ms."""
+        batch = [first]
+        deadline = time.monotonic() + self.batch_linger_s
+        
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            record = source.get(timeout=remaining) if remaining > 0 else source.get_nowait()
+            if record is None:
+                break
+            batch.append(record)
+        
+        return batch
+    
+    def _send_batch(self, batch: List[QueuedRecord]) -> int:
+        """
+        Send a batch; transient failures are spooled when a spool is configured.
+        
+        Returns:
+            Number of records the API acknowledged
+        """
+        acked, failed = self._try_send(batch)
+        for record, error in failed:
+            circuit_open = isinstance(error, XaseError) and error.code == "CIRCUIT_OPEN"
+            if circuit_open and self.circuit_fallback == "drop":
+                self._forget(record)
+                self._count_circuit("dropped")
+                self._report_error(error)
+                continue
+            if self.spool and self.spool.append(record.to_bytes()):
+                if circuit_open:
+                    self._count_circuit("spooled")
+                continue
+            self._forget(record)
+            if circuit_open:
+                self._count_circuit("dropped")
+            else:
+                self._dropped("send_failed")
+            self._report_error(error)
+        return acked
+    
+    def _count_circuit(self, name: str) -> None:
+        with self._stats_lock:
+            self._circuit_counts[name] += 1
+        if name == "dropped":
+            self._dropped("circuit_open")
     
-    def _process_queue(self) -> None:
-        """Process queue items in background."""
+    def _try_send(
+        self, batch: List[QueuedRecord]
+    ) -> Tuple[int, List[Tuple[QueuedRecord, Exception]]]:
+        """
+        Send a batch and report successes and permanent failures.
+        
+        Returns:
+            The number of acknowledged records, and the items that failed with
+            a transient error, left to the caller
+        """
+        acked = 0
+        retryable: List[Tuple[QueuedRecord, Exception]] = []
+        
+        if len(batch) == 1:
+            record = batch[0]
+            try:
+                result = self._send_record(record)
+            except XaseError as e:
+                if is_retryable_error(e):
+                    retryable.append((record, e))
+                else:
+                    self._forget(record)
+                    self._dropped("rejected")
+                    self._report_error(e)
+            else:
+                self._acked(record)
+                self._report_success(result)
+                acked += 1
+            return acked, retryable
+        
+        try:
+            response = self.http_client.post(
+                self.batch_endpoint,
+                build_batch_content(batch),
+                deferrable=self.spool is not None,
+            )
+        except XaseError as e:
+            if is_retryable_error(e):
+                return acked, [(record, e) for record in batch]
+            self._dropped("rejected", len(batch))
+            for record in batch:
+                self._forget(record)
+                self._report_error(e)
+            return acked, retryable
+        
+        for record, outcome in zip(batch, batch_outcomes(response, len(batch))):
+            if isinstance(outcome, XaseError):
+                if is_retryable_error(outcome):
+                    retryable.append((record, outcome))
+                else:
+                    self._forget(record)
+                    self._dropped("rejected")
+                    self._report_error(outcome)
+            else:
+                self._acked(record)
+                self._report_success(outcome)
+                acked += 1
+        return acked, retryable
+    
+    def _replay_spool(self) -> None:
+        """Replay spooled records, one segment at a time, backing off while the API fails."""
+        assert self.spool is not None
+        backoff = self.replay_interval_s
+        
         while not self._closed:
+            segment = self.spool.claim()
+            if segment is None:
+                self._replay_wakeup.wait(self.replay_interval_s)
+                self._replay_wakeup.clear()
+                continue
+            
             try:
-                item = self._queue.get(timeout=0.1)
-                
-                try:
-                    result = self._send_record(
-                        item["payload"],
-                        item.get("idempotency_key"),
-                    )
-                    if self.on_success:
-                        self.on_success(result)
+                records = [QueuedRecord.from_bytes(data) for data in self.spool.read(segment)]
+            except (OSError, ValueError, struct.error) as e:
+                self._report_error(XaseError(f"Unreadable spool segment: {e}", "SPOOL_CORRUPT"))
+                self.spool.release(segment)
+                continue
+            
+            offset = 0
+            while offset < len(records) and not self._closed:
+                batch = records[offset:offset + self.batch_size]
+                _, failed = self._try_send(batch)
                 
-                except Exception as e:
-                    if self.on_error:
-                        xase_error = (
-                            e if isinstance(e, XaseError)
-                            else XaseError(str(e), "QUEUE_ERROR", None, {"exception": type(e).__name__})
-                        )
-                        self.on_error(xase_error)
+                if len(failed) == len(batch):
+                    # API still unavailable: retry the same records later
+                    self._replay_wakeup.wait(backoff)
+                    self._replay_wakeup.clear()
+                    backoff = min(backoff * 2, self.replay_max_backoff_s)
+                    continue
                 
-                finally:
-                    self._queue.task_done()
+                backoff = self.replay_interval_s
+                for record, error in failed:
+                    if not self.spool.append(record.to_bytes()):
+                        self._dropped("send_failed")
+                        self._report_error(error)
+                offset += len(batch)
             
-            except queue.Empty:
-                continue
+            if offset >= len(records):
+                self.spool.release(segment, replayed=len(records))
+            else:
+                # Closed mid-segment: keep only the records not sent yet
+                self.spool.unclaim(segment, replayed=offset)
     
-    def _send_record(
-        self,
-        payload: RecordPayload,
-        idempotency_key: Optional[str] = None,
-    ) -> RecordResult:
+    def _report_success(self, result: RecordResult) -> None:
+        """Invoke on_success; a failing callback is reported via on_error."""
+        if self._callbacks is not None:
+            self._callbacks.submit_success(result)
+        elif self.on_success:
+            try:
+                self.on_success(result)
+            except Exception as e:  # noqa: BLE001 - user callback
+                self._report_error(e)
+    
+    def _report_error(self, error: Exception) -> None:
+        """Invoke on_error without letting it kill the worker."""
+        if self.on_error:
+            xase_error = (
+                error if isinstance(error, XaseError)
+                else XaseError(str(error), "QUEUE_ERROR", None, {"exception": type(error).__name__})
+            )
+            if self._callbacks is not None:
+                self._callbacks.submit_error(xase_error)
+                return
+            try:
+                self.on_error(xase_error)
+            except Exception:  # noqa: BLE001 - user callback
+                logger.warning("Xase on_error callback failed", exc_info=True)
+    
+    def _send_record(self, record: QueuedRecord) -> RecordResult:
         """Send record to API."""
         headers: Dict[str, str] = {}
         
-        if idempotency_key:
-            headers["Idempotency-Key"] = idempotency_key
-        
-        # Map SDK payload to API schema
-        body = {
-            "input": payload["input"],
-            "output": payload["output"],
-            "context": payload.get("context"),
-            "policyId": payload["policy"],
-            "policyVersion": payload.get("policy_version"),
-            "decisionType": payload.get("decision_type"),
-            "confidence": payload.get("confidence"),
-            "processingTime": payload.get("processing_time"),
-            "storePayload": payload.get("store_payload"),
-        }
+        if record.idempotency_key:
+            headers["Idempotency-Key"] = record.idempotency_key
         
-        return self.http_client.post("/records", body, headers)
+        return self.http_client.post(
+            "/records", record.body, headers, deferrable=self.spool is not None
+        )
     
     def flush(self, timeout_s: float = 5.0) -> None:
-        """Flush all pending items."""
-        start = time.time()
+        """Wait until every queued record has been sent (or failed) and its callbacks ran."""
+        deadline = time.monotonic() + timeout_s
         
-        while not self._queue.empty():
-            if time.time() - start > timeout_s:
-                remaining = self._queue.qsize()
+        for partition in self._partitions:
+            if not partition.join(deadline - time.monotonic()):
                 raise XaseError(
-                    f"Flush timeout: {remaining} items remaining",
+                    f"Flush timeout: {self._size() + sum(self._in_flight)} items remaining",
                     "FLUSH_TIMEOUT",
                 )
-            time.sleep(0.05)
         
-        # Wait for worker to finish processing
-        self._queue.join()
+        # Wait for callbacks of the flushed records
+        if self._callbacks is not None:
+            if not self._callbacks.join(max(0.0, deadline - time.monotonic())):
+                raise XaseError(
+                    f"Flush timeout: {self._callbacks.get_stats()['pending']} callbacks pending",
+                    "FLUSH_TIMEOUT",
+                )
     
-    def close(self) -> None:
-        """Close queue and stop worker."""
+    def close(self, timeout_s: float = 2.0) -> None:
+        """
+        Stop accepting records and drain the queue for at most ``timeout_s``.
+        
+        Records still queued at the deadline are written to the spool, or
+        dropped and reported with ``QUEUE_CLOSED``. Requests already in flight
+        are left to finish on their (daemon) worker threads.
+        """
+        if self._closed:
+            return
+        deadline = time.monotonic() + timeout_s
         self._closed = True
-        if self._worker_thread:
-            self._worker_thread.join(timeout=2.0)
+        for partition in self._partitions:
+            partition.close()
+        self._replay_wakeup.set()
+        
+        for thread in self._worker_threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        
+        for partition in self._partitions:
+            self._abandon(partition.abort())
+        
+        if self._replay_thread:
+            self._replay_thread.join(max(0.0, deadline - time.monotonic()))
+        if self.spool:
+            self.spool.close()
+        if self._callbacks is not None:
+            self._callbacks.close(max(0.0, deadline - time.monotonic()))
+    
+    def _abandon(self, records: List[QueuedRecord]) -> None:
+        """Handle records left unsent when the close deadline passed."""
+        for record in records:
+            if self.spool and self.spool.append(record.to_bytes()):
+                continue
+            self._forget(record)
+            self._dropped("close_timeout")
+            self._report_error(XaseError("Queue closed before the record was sent", "QUEUE_CLOSED"))
+    
+    def _reset_in_child(self) -> None:
+        """Re-create locks and threads after fork; the child starts with an empty queue."""
+        for partition in self._partitions:
+            partition._reset_in_child()
+        self._stats_lock = threading.Lock()
+        self._replay_wakeup = threading.Event()
+        self._in_flight = [0] * self.num_workers
+        if self.spool:
+            self.spool._reset_in_child()
+        if self._callbacks is not None:
+            self._callbacks._reset_in_child()
+        if self.metrics is not None:
+            self.metrics._reset_in_child()
+        
+        self._worker_threads = []
+        self._replay_thread = None
+        if not self._closed:
+            self._start_workers()
+    
+    def _size(self) -> int:
+        return sum(p.qsize() for p in self._partitions)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics."""
-        return {
-            "size": self._queue.qsize(),
+        stats: Dict[str, Any] = {
+            "size": self._size(),
+            "bytes": sum(p.nbytes() for p in self._partitions),
+            "max_bytes": self.max_bytes,
             "closed": self._closed,
+            "partitions": [p.qsize() for p in self._partitions],
+            "workers": [
+                {"in_flight": self._in_flight[i], "sent": self._sent[i]}
+                for i in range(self.num_workers)
+            ],
         }
+        with self._stats_lock:
+            stats["overflow"] = {"policy": self.overflow_policy, **self._overflow_counts}
+            stats["circuit_fallback"] = {"mode": self.circuit_fallback, **self._circuit_counts}
+        if self.spool:
+            stats["spool"] = self.spool.get_stats()
+        if self._callbacks is not None:
+            stats["callbacks"] = self._callbacks.get_stats()
+        return stats
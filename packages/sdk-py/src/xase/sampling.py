@@ -0,0 +1,109 @@
+"""
+XASE SDK - Per-Policy Sampling and Rate Limiting
+
+Declarative rules deciding, before a record is enriched or queued, whether it
+is recorded at all. Policies without a rule (and without a ``"*"`` rule) are
+always recorded in full.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from .types import PolicyRule, RecordPayload, XaseError
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+    
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def try_acquire(self) -> bool:
+        """Take one token if available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+class _CompiledRule:
+    __slots__ = ("sample_rate", "bucket", "always_record", "counts")
+    
+    def __init__(self, policy: str, rule: PolicyRule) -> None:
+        sample_rate = rule.get("sample_rate", 1.0)
+        if not 0.0 <= sample_rate <= 1.0:
+            raise XaseError(
+                f"sample_rate for policy '{policy}' must be between 0 and 1",
+                "INVALID_CONFIG",
+            )
+        
+        self.bucket: Optional[TokenBucket] = None
+        rate_limit = rule.get("rate_limit")
+        if rate_limit is not None:
+            if rate_limit <= 0:
+                raise XaseError(
+                    f"rate_limit for policy '{policy}' must be > 0",
+                    "INVALID_CONFIG",
+                )
+            self.bucket = TokenBucket(rate_limit, rule.get("burst", max(1.0, rate_limit)))
+        
+        self.sample_rate = sample_rate
+        self.always_record = rule.get("always_record")
+        self.counts = {"admitted": 0, "always_recorded": 0, "sampled_out": 0, "throttled": 0}
+
+
+class RecordGate:
+    """Applies per-policy rules; ``"*"`` matches policies without their own rule."""
+    
+    def __init__(self, rules: Mapping[str, PolicyRule]) -> None:
+        self._rules: Dict[str, _CompiledRule] = {
+            policy: _CompiledRule(policy, rule) for policy, rule in rules.items()
+        }
+        self._default = self._rules.get("*")
+        self._lock = threading.Lock()
+    
+    def admit(self, payload: RecordPayload) -> bool:
+        """Whether a record should be recorded."""
+        rule = self._rules.get(payload.get("policy", ""), self._default)
+        if rule is None:
+            return True
+        
+        if rule.always_record is not None:
+            try:
+                forced = bool(rule.always_record(payload.get("output") or {}))
+            except Exception:  # noqa: BLE001 - user callback
+                # A broken predicate must not lose critical evidence
+                forced = True
+            if forced:
+                self._count(rule, "always_recorded")
+                return True
+        
+        if rule.sample_rate < 1.0 and random.random() >= rule.sample_rate:
+            self._count(rule, "sampled_out")
+            return False
+        
+        if rule.bucket is not None and not rule.bucket.try_acquire():
+            self._count(rule, "throttled")
+            return False
+        
+        self._count(rule, "admitted")
+        return True
+    
+    def _count(self, rule: _CompiledRule, name: str) -> None:
+        with self._lock:
+            rule.counts[name] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-policy counters."""
+        with self._lock:
+            return {policy: dict(rule.counts) for policy, rule in self._rules.items()}
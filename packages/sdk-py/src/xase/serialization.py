@@ -0,0 +1,159 @@
+"""
+XASE SDK - JSON Serialization
+
+Pluggable JSON encoder for request bodies. Uses orjson or msgspec when
+installed and falls back to the standard library. All backends accept the
+types commonly found in model inputs and outputs: numpy scalars and arrays,
+datetimes, Decimals, UUIDs, enums, sets and dataclasses. NaN and infinities,
+which JSON cannot represent, are encoded as ``null`` by every backend.
+"""
+
+import base64
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import math
+import uuid
+from typing import Any, Callable, Optional, Union
+
+from .types import XaseError
+
+
+Serializer = Callable[[Any], bytes]
+
+
+def _default(obj: Any) -> Any:
+    """Convert values the JSON backends do not handle natively."""
+    # numpy scalars and arrays, without importing numpy
+    if hasattr(obj, "tolist") and type(obj).__module__ == "numpy":
+        return obj.tolist()
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        # Keep the exact value; a float could silently change recorded evidence
+        return str(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(obj)).decode("ascii")
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj: Any) -> Any:
+    """Replace NaN and infinities with None, as orjson and msgspec encode them."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _stdlib_serializer() -> Serializer:
+    encoder = json.JSONEncoder(separators=(",", ":"), allow_nan=False, default=_default)
+    # Only used for the rare payload holding a non-finite float
+    finite_encoder = json.JSONEncoder(
+        separators=(",", ":"),
+        allow_nan=False,
+        default=lambda obj: _finite(_default(obj)),
+    )
+    
+    def dumps(obj: Any) -> bytes:
+        try:
+            return encoder.encode(obj).encode("utf-8")
+        except ValueError:
+            return finite_encoder.encode(_finite(obj)).encode("utf-8")
+    
+    return dumps
+
+
+def _orjson_serializer() -> Serializer:
+    import orjson
+    
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=options)
+    
+    return dumps
+
+
+def _msgspec_serializer() -> Serializer:
+    import msgspec  # type: ignore
+    
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    dumps: Serializer = encoder.encode
+    return dumps
+
+
+_BACKENDS = {
+    "orjson": _orjson_serializer,
+    "msgspec": _msgspec_serializer,
+    "json": _stdlib_serializer,
+}
+
+
+def resolve_serializer(spec: Union[str, Serializer, None] = "auto") -> Serializer:
+    """
+    Resolve a serializer.
+    
+    Args:
+        spec: ``"auto"`` (orjson, then msgspec, then stdlib), a backend name
+            (``"orjson"``, ``"msgspec"``, ``"json"``) or a callable returning bytes
+    """
+    if callable(spec):
+        return spec
+    
+    if spec in (None, "auto"):
+        for name in ("orjson", "msgspec"):
+            try:
+                return _BACKENDS[name]()
+            except ImportError:
+                continue
+        return _stdlib_serializer()
+    
+    factory = _BACKENDS.get(spec)
+    if factory is None:
+        raise XaseError(f"Unknown JSON serializer: {spec}", "INVALID_CONFIG")
+    try:
+        return factory()
+    except ImportError as e:
+        raise XaseError(
+            f"JSON serializer '{spec}' is not installed",
+            "MISSING_DEPENDENCY",
+            None,
+            {"exception": type(e).__name__},
+        )
+
+
+_canonical_encoder = json.JSONEncoder(
+    separators=(",", ":"),
+    sort_keys=True,
+    ensure_ascii=False,
+    default=_default,
+)
+
+
+def canonical_dumps(obj: Any) -> bytes:
+    """Deterministic encoding (sorted keys, compact) for hashing; independent of the backend."""
+    return _canonical_encoder.encode(obj).encode("utf-8")
+
+
+_default_serializer: Optional[Serializer] = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize with the default (auto-detected) backend."""
+    global _default_serializer
+    if _default_serializer is None:
+        _default_serializer = resolve_serializer("auto")
+    return _default_serializer(obj)
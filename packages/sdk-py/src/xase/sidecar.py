@@ -2,10 +2,32 @@
 XASE Sidecar Integration for Python SDK
 
 Provides Unix socket communication with Sidecar for high-performance data access.
+
+Two wire protocols are supported:
+
+- ``v1`` (default): the request is a 4-byte big-endian length and the UTF-8
+  segment id; the reply is a 4-byte length and the segment data. Strict
+  lock-step, one request per round trip.
+- ``v2``: every frame starts with ``V2_HEADER`` (magic ``b"XS"``, version,
+  kind/status, request id, payload length), so many requests can be in
+  flight on one connection and replies may arrive in any order. A sidecar
+  tells the two apart from the first bytes: a v1 length starting with
+  ``b"XS"`` would exceed 1 GiB.
+
+With ``transport="shm"`` (v2 only) segment bytes do not cross the socket:
+the sidecar writes them into a ring buffer file under ``/dev/shm`` that the
+client maps read-only, and replies with the slot, offset and length. The
+slot stays reserved until the client releases it.
 """
+import heapq
+import itertools
+import mmap
+import queue
+import select
 import socket
 import struct
-from typing import Optional, Iterator, List, Dict, Any, Callable, TypeVar, Union
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Iterable, Iterator, List, Dict, Any, Callable, Tuple, TypeVar, Union
 import os
 import time
 import threading
@@ -14,6 +36,9 @@ import logging
 from datetime import datetime
 from enum import Enum
 
+from .serialization import dumps
+from .types import XaseError
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +51,355 @@ class DataType(str, Enum):
     TABULAR = "TABULAR"
 
 
+PROTOCOL_V1 = "v1"
+PROTOCOL_V2 = "v2"
+
+V2_MAGIC = b"XS"
+V2_VERSION = 2
+# magic, version, kind (requests) or status (responses), request id, payload length
+V2_HEADER = struct.Struct(">2sBBII")
+V2_GET_SEGMENT = 1
+V2_STATUS_OK = 0
+V2_STATUS_ERROR = 1
+
+TRANSPORT_SOCKET = "socket"
+TRANSPORT_SHM = "shm"
+
+# Shared-memory transport: attach returns the region path; get returns a
+# V2_SHM_SLOT (slot, offset, length); release carries the slot and gets no reply.
+V2_SHM_ATTACH = 2
+V2_SHM_GET_SEGMENT = 3
+V2_SHM_RELEASE = 4
+V2_SHM_SLOT = struct.Struct(">IQI")
+V2_SHM_RELEASE_BODY = struct.Struct(">I")
+
+
+# Segment payloads are received in place: a new bytearray, or a view of the caller's buffer
+SegmentData = Union[bytearray, memoryview]
+
+
+def encode_v2_frame(kind: int, request_id: int, payload: bytes) -> bytes:
+    """Build a v2 frame; ``kind`` is the request kind or the response status."""
+    return V2_HEADER.pack(V2_MAGIC, V2_VERSION, kind, request_id, len(payload)) + payload
+
+
+def _recv_into(sock: socket.socket, view: memoryview) -> None:
+    """Fill ``view`` from ``sock`` without intermediate chunks."""
+    received = 0
+    while received < len(view):
+        n = sock.recv_into(view[received:])
+        if not n:
+            raise ConnectionError("Socket connection closed")
+        received += n
+
+
+def _writable_view(out: Any) -> memoryview:
+    """Flat writable byte view of ``out`` (bytearray, memoryview, numpy array, ...)."""
+    try:
+        view = memoryview(out).cast("B")
+    except (TypeError, ValueError) as e:
+        raise XaseError(f"out must be a contiguous buffer: {e}", "INVALID_BUFFER")
+    if view.readonly:
+        raise XaseError("out must be a writable buffer", "INVALID_BUFFER")
+    return view
+
+
+def _buffer_too_small(needed: int, available: int) -> XaseError:
+    return XaseError(
+        f"Segment of {needed} bytes does not fit in a {available}-byte buffer",
+        "BUFFER_TOO_SMALL",
+        None,
+        {"needed": needed, "available": available},
+    )
+
+
+class _SharedRegion:
+    """Read-only mapping of the sidecar's ring buffer."""
+    
+    def __init__(self, path: str) -> None:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            self._mmap = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        self.path = path
+        self.view = memoryview(self._mmap)
+    
+    def __len__(self) -> int:
+        return len(self.view)
+    
+    def close(self) -> None:
+        self.view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Segments still hold views; the mapping goes away with the last one
+            pass
+
+
+class SharedSegment:
+    """
+    A segment in the sidecar's shared-memory ring.
+    
+    ``data`` is a read-only view of the mapped slot. Call ``release()`` (or use
+    the segment as a context manager) once done: the sidecar reuses the slot
+    only after that, and ``data`` is unusable afterwards. Copy what must
+    outlive the release, and drop objects exporting ``data`` (such as
+    ``np.frombuffer(segment.data)``) first; while they are alive ``release()``
+    raises ``BufferError`` and keeps the slot, so it can be called again.
+    """
+    
+    def __init__(
+        self,
+        segment_id: str,
+        data: memoryview,
+        slot: int,
+        release: Callable[[int], None],
+    ) -> None:
+        self.segment_id = segment_id
+        self.data = data
+        self.slot = slot
+        self._release = release
+        self._released = False
+    
+    @property
+    def released(self) -> bool:
+        return self._released
+    
+    def release(self) -> None:
+        if self._released:
+            return
+        # Raises BufferError while exports exist; the slot is only handed back
+        # once no view into it can be read any more
+        self.data.release()
+        self._released = True
+        self._release(self.slot)
+    
+    def __len__(self) -> int:
+        return self.data.nbytes
+    
+    def __enter__(self) -> "SharedSegment":
+        return self
+    
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.release()
+
+
+class _PipelinedConnection:
+    """
+    One v2 connection shared by any number of callers.
+    
+    Requests are written under a lock; a reader thread resolves the matching
+    future when a response arrives, in whatever order the sidecar answers.
+    """
+    
+    def __init__(self, sock: socket.socket, max_in_flight: int) -> None:
+        self.sock = sock
+        self._send_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: Dict[int, "Future[SegmentData]"] = {}
+        # Caller-supplied buffers, filled directly by the reader
+        self._buffers: Dict[int, memoryview] = {}
+        # Request kind per id on the wire, kept after forget() until the reply
+        # arrives: the id and its in-flight slot stay reserved so a late reply
+        # can neither match a reused id nor push the sidecar past max_in_flight
+        self._kinds: Dict[int, int] = {}
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._ids = itertools.count(1)
+        self._closed = False
+        self.region: Optional[_SharedRegion] = None
+        self._reader = threading.Thread(
+            target=self._read_loop, name="xase-sidecar-reader", daemon=True
+        )
+        self._reader.start()
+    
+    @property
+    def alive(self) -> bool:
+        return not self._closed
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+    
+    def submit(
+        self,
+        segment_id: str,
+        timeout: float,
+        out: Optional[memoryview] = None,
+        kind: int = V2_GET_SEGMENT,
+    ) -> Tuple[int, "Future[SegmentData]"]:
+        """Send a request; blocks while ``max_in_flight`` requests are outstanding."""
+        if not self._slots.acquire(timeout=timeout):
+            with self._pending_lock:
+                abandoned = len(self._kinds) > len(self._pending)
+            if abandoned:
+                # Slots held by forgotten requests the sidecar never answered
+                self._fail(ConnectionError("Sidecar stopped answering; connection reset"))
+                raise ConnectionError("Sidecar stopped answering; connection reset")
+            raise TimeoutError(f"No free request slot within {timeout}s")
+        future: "Future[SegmentData]" = Future()
+        with self._pending_lock:
+            if self._closed:
+                self._slots.release()
+                future.set_exception(ConnectionError("Sidecar connection closed"))
+                return 0, future
+            request_id = next(self._ids) & 0xFFFFFFFF
+            while request_id == 0 or request_id in self._kinds:
+                request_id = next(self._ids) & 0xFFFFFFFF
+            self._pending[request_id] = future
+            self._kinds[request_id] = kind
+            if out is not None:
+                self._buffers[request_id] = out
+        
+        self._send(encode_v2_frame(kind, request_id, segment_id.encode("utf-8")))
+        return request_id, future
+    
+    def release_slot(self, slot: int) -> None:
+        """Hand a shared-memory slot back to the sidecar (no reply)."""
+        if not self._closed:
+            self._send(encode_v2_frame(V2_SHM_RELEASE, 0, V2_SHM_RELEASE_BODY.pack(slot)))
+    
+    def release_reply(self, reply: SegmentData) -> None:
+        """Release the slot named by a shared-memory reply nobody will consume."""
+        if len(reply) == V2_SHM_SLOT.size:
+            slot, _, _ = V2_SHM_SLOT.unpack(reply)
+            self.release_slot(slot)
+    
+    def _send(self, frame: bytes) -> None:
+        try:
+            with self._send_lock:
+                self.sock.sendall(frame)
+        except OSError as e:
+            # A partial frame leaves the stream unusable
+            self._fail(ConnectionError(f"Sidecar connection lost: {e}"))
+    
+    def forget(self, request_id: int) -> None:
+        """Give up on a request; a late response for it is discarded.
+        
+        Once this returns the reader no longer writes into the request's
+        ``out`` buffer; the rest of a reply already being received goes to
+        a scratch buffer. The request keeps its id and in-flight slot until
+        that reply arrives or the connection is reset.
+        """
+        with self._pending_lock:
+            future = self._pending.pop(request_id, None)
+            self._buffers.pop(request_id, None)
+        if future is not None:
+            future.cancel()
+    
+    def _read_into(self, view: memoryview) -> None:
+        received = 0
+        while received < len(view):
+            try:
+                n = self.sock.recv_into(view[received:])
+            except socket.timeout:
+                # Idle connection; per-request deadlines are enforced by the callers
+                if self._closed:
+                    raise ConnectionError("Sidecar connection closed")
+                continue
+            if not n:
+                raise ConnectionError("Socket connection closed")
+            received += n
+    
+    def _read_into_buffer(self, request_id: int, view: memoryview) -> None:
+        """
+        Fill a caller's buffer, diverting to scratch once the request is forgotten.
+        
+        The reader waits for data without holding a lock, then copies what
+        has arrived while holding ``_pending_lock``, so ``forget()`` never waits
+        on the socket and no byte lands in the buffer after it returns.
+        """
+        received = 0
+        while received < len(view):
+            readable, _, _ = select.select([self.sock], [], [], self.sock.gettimeout())
+            if not readable:
+                if self._closed:
+                    raise ConnectionError("Sidecar connection closed")
+                continue
+            with self._pending_lock:
+                if request_id in self._pending:
+                    n = self.sock.recv_into(view[received:])
+                    if not n:
+                        raise ConnectionError("Socket connection closed")
+                    received += n
+                    continue
+            self._read_into(memoryview(bytearray(len(view) - received)))
+            return
+    
+    def _read_loop(self) -> None:
+        header = bytearray(V2_HEADER.size)
+        header_view = memoryview(header)
+        try:
+            while True:
+                self._read_into(header_view)
+                magic, version, status, request_id, length = V2_HEADER.unpack(header)
+                if magic != V2_MAGIC or version != V2_VERSION:
+                    raise ConnectionError(
+                        f"Unexpected Sidecar frame (magic={magic!r}, version={version})"
+                    )
+                with self._pending_lock:
+                    out = self._buffers.pop(request_id, None)
+                
+                payload: SegmentData
+                if status == V2_STATUS_OK and out is not None and len(out) >= length:
+                    payload = out[:length]
+                    self._read_into_buffer(request_id, payload)
+                else:
+                    payload = bytearray(length)
+                    self._read_into(memoryview(payload))
+                
+                with self._pending_lock:
+                    future = self._pending.pop(request_id, None)
+                    kind = self._kinds.pop(request_id, None)
+                    if kind is not None:
+                        self._slots.release()
+                if future is None:
+                    if kind == V2_SHM_GET_SEGMENT and status == V2_STATUS_OK:
+                        # The caller gave up; the slot would otherwise stay reserved
+                        self.release_reply(payload)
+                    continue
+                if status == V2_STATUS_OK and out is not None and len(out) < length:
+                    future.set_exception(_buffer_too_small(length, len(out)))
+                elif status == V2_STATUS_OK:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(XaseError(
+                        bytes(payload).decode("utf-8", "replace") or "Sidecar request failed",
+                        "SIDECAR_ERROR",
+                        None,
+                        {"status": status, "request_id": request_id},
+                    ))
+        except (ConnectionError, OSError) as e:
+            if not isinstance(e, ConnectionError):
+                e = ConnectionError(f"Sidecar connection lost: {e}")
+            self._fail(e)
+    
+    def _fail(self, error: ConnectionError) -> None:
+        """Mark the connection dead and fail every outstanding request."""
+        with self._pending_lock:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._buffers.clear()
+            for _ in self._kinds:
+                self._slots.release()
+            self._kinds.clear()
+        for future in pending:
+            future.set_exception(error)
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    
+    def close(self) -> None:
+        self._fail(ConnectionError("Sidecar connection closed"))
+        if self._reader is not threading.current_thread():
+            self._reader.join(timeout=1.0)
+        self.sock.close()
+        if self.region is not None:
+            self.region.close()
+
+
 class SidecarClient:
     """Client for communicating with Xase Sidecar via Unix socket with auto-recovery."""
     
@@ -34,7 +408,10 @@ class SidecarClient:
         socket_path: str = "/var/run/xase/sidecar.sock",
         max_retries: int = 3,
         backoff_base: float = 2.0,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        protocol: str = PROTOCOL_V1,
+        max_in_flight: int = 64,
+        transport: str = TRANSPORT_SOCKET,
     ):
         """
         Initialize Sidecar client with auto-recovery.
@@ -44,13 +421,34 @@ class SidecarClient:
             max_retries: Maximum number of retry attempts (default: 3)
             backoff_base: Base for exponential backoff in seconds (default: 2.0)
             timeout: Socket timeout in seconds (default: 30.0)
+            protocol: "v1" (lock-step) or "v2" (pipelined, thread-safe) (default: "v1")
+            max_in_flight: Outstanding v2 requests per connection (default: 64)
+            transport: "socket" or "shm" (shared-memory ring, requires v2) (default: "socket")
         """
+        if protocol not in (PROTOCOL_V1, PROTOCOL_V2):
+            raise XaseError(
+                f"Unknown Sidecar protocol '{protocol}': use 'v1' or 'v2'", "INVALID_CONFIG"
+            )
+        if transport not in (TRANSPORT_SOCKET, TRANSPORT_SHM):
+            raise XaseError(
+                f"Unknown Sidecar transport '{transport}': use 'socket' or 'shm'", "INVALID_CONFIG"
+            )
+        if transport == TRANSPORT_SHM and protocol != PROTOCOL_V2:
+            raise XaseError("The shm transport requires protocol='v2'", "INVALID_CONFIG")
+        if max_in_flight < 1:
+            raise XaseError("max_in_flight must be at least 1", "INVALID_CONFIG")
         self.socket_path = socket_path
         self.max_retries = max_retries
         self.backoff_base = backoff_base
         self.timeout = timeout
+        self.protocol = protocol
+        self.max_in_flight = max_in_flight
+        self.transport = transport
         self.sock: Optional[socket.socket] = None
         self._connection_attempts = 0
+        self._pipeline: Optional[_PipelinedConnection] = None
+        self._pipeline_lock = threading.Lock()
+        self._pid = os.getpid()
     
     def connect(self) -> None:
         """Connect to Sidecar Unix socket with retry logic."""
@@ -71,7 +469,7 @@ class SidecarClient:
                 self._connection_attempts = 0
                 logger.info(f"Connected to Sidecar at {self.socket_path}")
                 return
-                
+            
             except (ConnectionError, FileNotFoundError, socket.error) as e:
                 self._connection_attempts += 1
                 if self.sock:
@@ -89,36 +487,51 @@ class SidecarClient:
                     logger.error(f"Failed to connect after {self.max_retries} attempts")
                     raise
     
-    def get_segment(self, segment_id: str) -> bytes:
+    def get_segment(self, segment_id: str, out: Optional[Any] = None) -> SegmentData:
         """
         Get audio segment from Sidecar with auto-recovery.
         
         Args:
             segment_id: Segment identifier (e.g., "seg_00123")
+            out: Optional writable buffer (bytearray, numpy array, ...) to
+                receive the data into, avoiding any allocation
         
         Returns:
-            Audio data (watermarked)
+            Audio data (watermarked) as a new bytearray, or a memoryview of
+            the first bytes of ``out``. Earlier releases returned ``bytes``; call
+            ``bytes(data)`` where an immutable or hashable copy is needed
         
         Raises:
             ConnectionError: If unable to fetch segment after retries
+            XaseError: If the sidecar answered a v2 request with an error, or
+                the segment does not fit in ``out`` (code BUFFER_TOO_SMALL)
         """
+        view = _writable_view(out) if out is not None else None
+        if self.transport == TRANSPORT_SHM:
+            conn, reply = self._request(segment_id, kind=V2_SHM_GET_SEGMENT)
+            return self._copy_shared(conn, segment_id, reply, view)
+        if self.protocol == PROTOCOL_V2:
+            return self._request(segment_id, out=view)[1]
+        
         for attempt in range(self.max_retries):
             try:
                 if self.sock is None:
                     self.connect()
+                sock = self.sock
+                assert sock is not None
                 
                 # Send request (length-prefixed)
                 segment_bytes = segment_id.encode('utf-8')
                 length = struct.pack('>I', len(segment_bytes))
-                self.sock.sendall(length + segment_bytes)
+                sock.sendall(length + segment_bytes)
                 
                 # Receive response (length-prefixed)
                 length_bytes = self._recv_exact(4)
                 data_length = struct.unpack('>I', length_bytes)[0]
-                data = self._recv_exact(data_length)
+                data = self._recv_exact(data_length, view)
                 
                 return data
-                
+            
             except (ConnectionError, socket.error, BrokenPipeError, TimeoutError) as e:
                 logger.warning(
                     f"Failed to get segment {segment_id} (attempt {attempt + 1}/{self.max_retries}): {e}"
@@ -139,19 +552,328 @@ class SidecarClient:
                     raise ConnectionError(
                         f"Unable to fetch segment {segment_id} after {self.max_retries} retries"
                     )
+        raise ConnectionError(
+            f"Unable to fetch segment {segment_id}: max_retries is {self.max_retries}"
+        )
     
-    def _recv_exact(self, n: int) -> bytes:
-        """Receive exactly n bytes from socket."""
-        data = b''
-        while len(data) < n:
-            chunk = self.sock.recv(n - len(data))
-            if not chunk:
-                raise ConnectionError("Socket connection closed")
-            data += chunk
-        return data
+    def _connection(self) -> _PipelinedConnection:
+        """The shared v2 connection, (re)connecting if needed."""
+        with self._pipeline_lock:
+            if self._pid != os.getpid():
+                # Forked child: the reader thread did not survive and the socket
+                # is shared with the parent. Leave both to the parent.
+                self._pid = os.getpid()
+                self._pipeline = None
+                self.sock = None
+            if self._pipeline is None or not self._pipeline.alive:
+                if self._pipeline is not None:
+                    self._pipeline.close()
+                    self._pipeline = None
+                    self.sock = None
+                self.connect()
+                assert self.sock is not None
+                conn = _PipelinedConnection(self.sock, self.max_in_flight)
+                if self.transport == TRANSPORT_SHM:
+                    self._attach(conn)
+                self._pipeline = conn
+            return self._pipeline
+    
+    def _attach(self, conn: _PipelinedConnection) -> None:
+        """Map the sidecar's ring buffer for this connection."""
+        try:
+            _, future = conn.submit("", self.timeout, kind=V2_SHM_ATTACH)
+            path = bytes(future.result(timeout=self.timeout)).decode("utf-8")
+            conn.region = _SharedRegion(path)
+            logger.info(f"Mapped Sidecar ring buffer {path} ({len(conn.region)} bytes)")
+        except (FutureTimeoutError, ConnectionError, OSError, XaseError) as e:
+            conn.close()
+            self.sock = None
+            raise ConnectionError(f"Unable to map the Sidecar ring buffer: {e}")
+    
+    def acquire_segment(self, segment_id: str) -> SharedSegment:
+        """
+        Get a segment as a read-only view of the shared-memory ring (transport="shm").
+        
+        Nothing is copied; the slot stays reserved until the returned
+        segment is released.
+        
+        Raises:
+            ConnectionError: If unable to fetch segment after retries
+            XaseError: If the sidecar answered with an error
+        """
+        if self.transport != TRANSPORT_SHM:
+            raise XaseError("acquire_segment requires transport='shm'", "INVALID_CONFIG")
+        conn, reply = self._request(segment_id, kind=V2_SHM_GET_SEGMENT)
+        return self._shared_segment(conn, segment_id, reply)
+    
+    def _shared_segment(
+        self, conn: _PipelinedConnection, segment_id: str, reply: SegmentData
+    ) -> SharedSegment:
+        region = conn.region
+        if len(reply) != V2_SHM_SLOT.size:
+            raise XaseError(f"Malformed Sidecar slot reply of {len(reply)} bytes", "SIDECAR_ERROR")
+        slot, offset, length = V2_SHM_SLOT.unpack(reply)
+        if region is None or offset + length > len(region):
+            conn.release_slot(slot)
+            raise XaseError(
+                "Sidecar returned a slot outside the ring buffer "
+                f"(offset={offset}, length={length})",
+                "SIDECAR_ERROR",
+                None,
+                {"slot": slot, "offset": offset, "length": length},
+            )
+        return SharedSegment(
+            segment_id, region.view[offset:offset + length], slot, conn.release_slot
+        )
+    
+    def _copy_shared(
+        self,
+        conn: _PipelinedConnection,
+        segment_id: str,
+        reply: SegmentData,
+        out: Optional[memoryview] = None,
+    ) -> SegmentData:
+        """Copy a shared segment out of the ring and release its slot."""
+        with self._shared_segment(conn, segment_id, reply) as segment:
+            n = len(segment)
+            if out is None:
+                return bytearray(segment.data)
+            if len(out) < n:
+                raise _buffer_too_small(n, len(out))
+            out[:n] = segment.data
+            return out[:n]
+    
+    def _request(
+        self,
+        segment_id: str,
+        out: Optional[memoryview] = None,
+        kind: int = V2_GET_SEGMENT,
+    ) -> Tuple[_PipelinedConnection, SegmentData]:
+        """One v2 request with retries; returns the connection that answered and the reply."""
+        for attempt in range(self.max_retries):
+            try:
+                conn = self._connection()
+                request_id, future = conn.submit(segment_id, self.timeout, out, kind)
+                try:
+                    return conn, future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    # Responses carry ids, so the connection stays usable
+                    conn.forget(request_id)
+                    raise TimeoutError(f"No response within {self.timeout}s")
+            
+            except (ConnectionError, socket.error, TimeoutError) as e:
+                logger.warning(
+                    f"Failed to get segment {segment_id} "
+                    f"(attempt {attempt + 1}/{self.max_retries}): {e}"
+                )
+                if attempt < self.max_retries - 1:
+                    wait_time = self.backoff_base ** attempt
+                    logger.info(f"Retrying in {wait_time:.1f}s...")
+                    time.sleep(wait_time)
+                else:
+                    logger.error(
+                        f"Failed to get segment {segment_id} after {self.max_retries} attempts"
+                    )
+                    raise ConnectionError(
+                        f"Unable to fetch segment {segment_id} after {self.max_retries} retries"
+                    )
+        raise ConnectionError(
+            f"Unable to fetch segment {segment_id}: max_retries is {self.max_retries}"
+        )
+    
+    def get_segments(
+        self,
+        segment_ids: Iterable[str],
+        max_in_flight: Optional[int] = None,
+        ordered: bool = False,
+    ) -> Iterator[Tuple[str, Union[SegmentData, Exception]]]:
+        """
+        Fetch many segments, yielding ``(segment_id, data)`` pairs.
+        
+        A segment that cannot be fetched is yielded with the exception in place
+        of its data instead of aborting the batch; only failed ids are retried.
+        With the v2 protocol up to ``max_in_flight`` requests (default and cap:
+        the client's ``max_in_flight``) are pipelined on one connection and
+        pairs come in completion order unless ``ordered`` is set. With v1
+        segments are fetched one at a time, in order.
+        
+        Args:
+            segment_ids: Segment identifiers, consumed lazily
+            max_in_flight: Outstanding requests for this call (v2 only)
+            ordered: Yield in request order instead of completion order (v2 only)
+        """
+        if self.protocol == PROTOCOL_V2:
+            window = min(max_in_flight or self.max_in_flight, self.max_in_flight)
+            if window < 1:
+                raise XaseError("max_in_flight must be at least 1", "INVALID_CONFIG")
+            yield from self._get_segments_pipelined(segment_ids, window, ordered)
+            return
+        
+        for segment_id in segment_ids:
+            try:
+                yield segment_id, self.get_segment(segment_id)
+            except (ConnectionError, OSError, XaseError) as e:
+                yield segment_id, e
+    
+    def _get_segments_pipelined(
+        self,
+        segment_ids: Iterable[str],
+        window: int,
+        ordered: bool,
+    ) -> Iterator[Tuple[str, Union[SegmentData, Exception]]]:
+        source = enumerate(segment_ids)
+        exhausted = False
+        # Completed futures, pushed by done callbacks: (index, segment id, attempt, future)
+        done: "queue.Queue[Tuple[int, str, int, Future[SegmentData]]]" = queue.Queue()
+        # index -> (deadline, connection, request id) for requests awaiting a response
+        outstanding: Dict[int, Tuple[float, Optional[_PipelinedConnection], int]] = {}
+        # Failed ids waiting for their backoff: (ready at, index, segment id, attempt)
+        retries: List[Tuple[float, int, str, int]] = []
+        buffered: Dict[int, Tuple[str, Union[SegmentData, Exception]]] = {}
+        next_index = 0
+        kind = V2_SHM_GET_SEGMENT if self.transport == TRANSPORT_SHM else V2_GET_SEGMENT
+        
+        futures: Dict[int, "Future[SegmentData]"] = {}
+        
+        def submit(index: int, segment_id: str, attempt: int) -> None:
+            conn: Optional[_PipelinedConnection] = None
+            request_id = 0
+            try:
+                conn = self._connection()
+                request_id, future = conn.submit(segment_id, self.timeout, kind=kind)
+            except (ConnectionError, OSError) as e:
+                future = Future()
+                future.set_exception(e)
+            outstanding[index] = (time.monotonic() + self.timeout, conn, request_id)
+            futures[index] = future
+            future.add_done_callback(lambda f: done.put((index, segment_id, attempt, f)))
+        
+        try:
+            while True:
+                now = time.monotonic()
+                while len(outstanding) < window:
+                    if retries and retries[0][0] <= now:
+                        _, index, segment_id, attempt = heapq.heappop(retries)
+                        submit(index, segment_id, attempt)
+                    elif not exhausted:
+                        try:
+                            index, segment_id = next(source)
+                        except StopIteration:
+                            exhausted = True
+                            continue
+                        submit(index, segment_id, 0)
+                    else:
+                        break
+                
+                if not outstanding and not retries and exhausted:
+                    return
+                
+                wake_at = min(
+                    [deadline for deadline, _, _ in outstanding.values()]
+                    + ([retries[0][0]] if retries else [])
+                )
+                try:
+                    index, segment_id, attempt, future = done.get(timeout=max(0.0, wake_at - now))
+                except queue.Empty:
+                    now = time.monotonic()
+                    for deadline, conn, request_id in list(outstanding.values()):
+                        if deadline <= now and conn is not None:
+                            # Cancels the future; its callback reports the timeout
+                            conn.forget(request_id)
+                    continue
+                
+                _, conn, _ = outstanding.pop(index)
+                futures.pop(index, None)
+                if future.cancelled():
+                    error: Optional[BaseException] = TimeoutError(
+                        f"No response within {self.timeout}s"
+                    )
+                else:
+                    error = future.exception()
+                
+                result: Union[SegmentData, Exception]
+                if error is None and kind == V2_SHM_GET_SEGMENT and conn is not None:
+                    try:
+                        result = self._copy_shared(conn, segment_id, future.result())
+                    except XaseError as e:
+                        result = e
+                elif error is None:
+                    result = future.result()
+                elif (
+                    isinstance(error, (ConnectionError, OSError)) and attempt < self.max_retries - 1
+                ):
+                    logger.warning(
+                        f"Failed to get segment {segment_id} "
+                        f"(attempt {attempt + 1}/{self.max_retries}): {error}"
+                    )
+                    ready_at = time.monotonic() + self.backoff_base ** attempt
+                    heapq.heappush(retries, (ready_at, index, segment_id, attempt + 1))
+                    continue
+                elif isinstance(error, (ConnectionError, OSError)):
+                    logger.error(
+                        f"Failed to get segment {segment_id} after {self.max_retries} attempts"
+                    )
+                    result = ConnectionError(
+                        f"Unable to fetch segment {segment_id} after {self.max_retries} retries"
+                    )
+                elif isinstance(error, Exception):
+                    result = error
+                else:
+                    raise error
+                
+                if not ordered:
+                    yield segment_id, result
+                    continue
+                buffered[index] = (segment_id, result)
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            # Abandoned early: release the connection's request slots
+            for index, (_, conn, request_id) in outstanding.items():
+                if conn is None:
+                    continue
+                conn.forget(request_id)
+                if kind != V2_SHM_GET_SEGMENT:
+                    continue
+                # Replies that already arrived hold ring slots nobody will copy out;
+                # forgotten requests are cleaned up by the reader instead
+                try:
+                    reply = futures[index].result(timeout=self.timeout)
+                except (CancelledError, FutureTimeoutError, ConnectionError, OSError, XaseError):
+                    continue
+                conn.release_reply(reply)
+    
+    def _recv_exact(self, n: int, out: Optional[memoryview] = None) -> SegmentData:
+        """
+        Receive exactly n bytes from socket.
+        
+        The buffer is allocated once from the length prefix and filled with
+        ``recv_into``; with ``out`` the bytes land in the caller's buffer and a
+        view of them is returned.
+        """
+        sock = self.sock
+        if sock is None:
+            raise ConnectionError("Not connected to Sidecar")
+        if out is None:
+            data = bytearray(n)
+            _recv_into(sock, memoryview(data))
+            return data
+        if len(out) < n:
+            # Consume the payload so the connection stays in sync
+            _recv_into(sock, memoryview(bytearray(n)))
+            raise _buffer_too_small(n, len(out))
+        view = out[:n]
+        _recv_into(sock, view)
+        return view
     
     def close(self) -> None:
         """Close socket connection."""
+        with self._pipeline_lock:
+            if self._pipeline is not None:
+                self._pipeline.close()
+                self._pipeline = None
+                self.sock = None
         if self.sock is not None:
             self.sock.close()
             self.sock = None
@@ -230,8 +952,8 @@ class TelemetrySender:
             with httpx.Client() as client:
                 response = client.post(
                     f"{self.base_url}/api/v1/sidecar/telemetry",
-                    json={"sessionId": self.session_id, "logs": batch},
-                    headers={"X-API-Key": self.api_key},
+                    content=dumps({"sessionId": self.session_id, "logs": batch}),
+                    headers={"Content-Type": "application/json", "X-API-Key": self.api_key},
                     timeout=5.0
                 )
                 response.raise_for_status()
@@ -326,7 +1048,8 @@ class SidecarDataset:
         max_retries: int = 3,
         backoff_base: float = 2.0,
         data_type: Optional[Union[str, DataType]] = None,
-        transform: Optional[Callable[[bytes], T]] = None,
+        transform: Optional[Callable[[SegmentData], T]] = None,
+        protocol: str = PROTOCOL_V1,
     ):
         """
         Initialize Sidecar dataset with multi-worker support.
@@ -337,12 +1060,14 @@ class SidecarDataset:
             num_connections: Number of socket connections in pool (default: 1)
             max_retries: Maximum retry attempts per request (default: 3)
             backoff_base: Exponential backoff base in seconds (default: 2.0)
+            protocol: Sidecar wire protocol, "v1" or "v2" (default: "v1")
         """
         self.segment_ids = segment_ids
         self.socket_path = socket_path
         self.num_connections = num_connections
         self.max_retries = max_retries
         self.backoff_base = backoff_base
+        self.protocol = protocol
         self._pool: List[SidecarClient] = []
         self._pool_lock = threading.Lock()
         # Normalize data type to enum string (uppercased)
@@ -362,7 +1087,8 @@ class SidecarDataset:
                 client = SidecarClient(
                     socket_path=self.socket_path,
                     max_retries=self.max_retries,
-                    backoff_base=self.backoff_base
+                    backoff_base=self.backoff_base,
+                    protocol=self.protocol,
                 )
                 self._pool.append(client)
                 return client
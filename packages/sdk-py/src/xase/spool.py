@@ -0,0 +1,352 @@
+"""
+XASE SDK - Disk Spool
+
+Bounded, append-only write-ahead spool for fire-and-forget records that could
+not be kept in memory or sent to the API. Records are written to segment files
+and replayed in the background, including after a process restart.
+
+Segment lifecycle (``<name>`` is ``<pid>-<created_ms>-<seq>``)::
+
+    <name>.open                 active segment, being appended to
+    <name>.seg                  sealed segment, ready for replay
+    <name>.seg.<pid>.replay     segment claimed by a replaying process
+    <name>.seg.<pid>.replay.tmp rest of a partly replayed segment, being
+                                written before it replaces the claimed one
+"""
+
+import itertools
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, List, Literal, Optional, Set
+
+from .types import XaseError
+
+
+FsyncPolicy = Literal["always", "interval", "never"]
+
+_HEADER = struct.Struct(">II")  # payload length, crc32
+
+# Segment files inherited through fork; kept referenced so they are never
+# closed (closing would flush the parent's buffered bytes a second time)
+_inherited_segments: List[BinaryIO] = []
+
+# Active and claimed segment files of every Spool in this process; segment
+# names are numbered process-wide so spools sharing a directory never collide
+_owned_paths: Set[str] = set()
+_owned_lock = threading.Lock()
+_segment_seq = itertools.count(1)
+
+
+def _own(path: str) -> None:
+    with _owned_lock:
+        _owned_paths.add(os.path.abspath(path))
+
+
+def _disown(path: str) -> None:
+    with _owned_lock:
+        _owned_paths.discard(os.path.abspath(path))
+
+
+def _abandoned(pid: int, path: str) -> bool:
+    """Whether the process that wrote or claimed a segment file is gone."""
+    if pid == os.getpid():
+        # Ours unless no spool here uses it: an earlier process with the same
+        # pid left it behind (e.g. before a container restart)
+        with _owned_lock:
+            return os.path.abspath(path) not in _owned_paths
+    return not _pid_alive(pid)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Best-effort check whether a process is still running."""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class Spool:
+    """Append-only segment files bounded by total size on disk."""
+    
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        segment_max_bytes: int = 8 * 1024 * 1024,
+        fsync: FsyncPolicy = "interval",
+        fsync_interval_s: float = 1.0,
+    ) -> None:
+        if fsync not in ("always", "interval", "never"):
+            raise XaseError(f"Invalid spool fsync policy: {fsync}", "INVALID_CONFIG")
+        if segment_max_bytes <= 0 or max_bytes < segment_max_bytes:
+            raise XaseError(
+                "spool max_bytes must be >= segment_max_bytes > 0",
+                "INVALID_CONFIG",
+            )
+        
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+        self.fsync_interval_s = fsync_interval_s
+        
+        self._lock = threading.Lock()
+        self._active: Optional[BinaryIO] = None
+        self._active_path: Optional[str] = None
+        self._active_bytes = 0
+        self._last_fsync = time.monotonic()
+        self._bytes = 0
+        self._appended = 0
+        self._replayed = 0
+        self._rejected = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+    
+    def _recover(self) -> None:
+        """Make segments left behind by dead processes replayable again."""
+        for name in os.listdir(self.directory):
+            if name.endswith(".replay.tmp"):
+                self._recover_rewrite(os.path.join(self.directory, name))
+        
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith(".open"):
+                    if _abandoned(int(name.split("-", 1)[0]), path):
+                        os.replace(path, path[: -len(".open")] + ".seg")
+                elif name.endswith(".replay"):
+                    base, owner, _ = name.rsplit(".", 2)
+                    if _abandoned(int(owner), path):
+                        os.replace(path, os.path.join(self.directory, base))
+            except (ValueError, OSError):
+                continue
+        
+        self._bytes = sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory)
+            if name.endswith((".open", ".seg", ".replay"))
+        )
+    
+    def _recover_rewrite(self, tmp: str) -> None:
+        """
+        Finish or discard the rewrite of a segment interrupted by a crash.
+        
+        A complete temporary file replaces the claimed segment, as ``unclaim``
+        would have done; a partly written one is deleted and the claimed
+        segment is replayed in full.
+        """
+        claimed = tmp[: -len(".tmp")]
+        try:
+            if not _abandoned(int(claimed.rsplit(".", 2)[1]), claimed):
+                return
+            if os.path.exists(claimed) and self._is_complete_rewrite(tmp, claimed):
+                os.replace(tmp, claimed)
+            else:
+                os.remove(tmp)
+        except (ValueError, OSError):
+            pass
+    
+    def _is_complete_rewrite(self, tmp: str, claimed: str) -> bool:
+        """Whether ``tmp`` holds, without a torn tail, the records ending ``claimed``."""
+        kept = self.read(tmp)
+        if not kept or sum(_HEADER.size + len(data) for data in kept) != os.path.getsize(tmp):
+            return False
+        original = self.read(claimed)
+        return len(kept) < len(original) and original[-len(kept):] == kept
+    
+    def _reset_in_child(self) -> None:
+        """Stop writing to the parent's active segment; the child opens its own."""
+        self._lock = threading.Lock()
+        if self._active is not None:
+            _inherited_segments.append(self._active)
+        self._active = None
+        self._active_path = None
+        self._active_bytes = 0
+    
+    def append(self, data: bytes) -> bool:
+        """
+        Append a serialized record to the active segment.
+        
+        Returns:
+            False if the spool is full
+        """
+        frame = _HEADER.pack(len(data), zlib.crc32(data)) + data
+        
+        with self._lock:
+            if self._bytes + len(frame) > self.max_bytes:
+                self._rejected += 1
+                return False
+            
+            active = self._active
+            if active is None or self._active_bytes + len(frame) > self.segment_max_bytes:
+                active = self._rotate()
+            
+            active.write(frame)
+            self._active_bytes += len(frame)
+            self._bytes += len(frame)
+            self._appended += 1
+            
+            if self.fsync == "always":
+                self._sync(active)
+            elif self.fsync == "interval":
+                active.flush()
+                if time.monotonic() - self._last_fsync >= self.fsync_interval_s:
+                    self._sync(active)
+            else:
+                active.flush()
+        
+        return True
+    
+    def _sync(self, active: BinaryIO) -> None:
+        active.flush()
+        os.fsync(active.fileno())
+        self._last_fsync = time.monotonic()
+    
+    def _rotate(self) -> BinaryIO:
+        """Seal the active segment (lock held) and open a new one."""
+        self._seal()
+        name = f"{os.getpid()}-{int(time.time() * 1000):013d}-{next(_segment_seq):06d}.open"
+        path = os.path.join(self.directory, name)
+        _own(path)
+        active = open(path, "ab")
+        self._active = active
+        self._active_path = path
+        self._active_bytes = 0
+        return active
+    
+    def _seal(self) -> None:
+        """Close the active segment (lock held) and mark it replayable."""
+        active, path = self._active, self._active_path
+        if active is None or path is None:
+            return
+        if self.fsync != "never":
+            self._sync(active)
+        active.close()
+        os.replace(path, path[: -len(".open")] + ".seg")
+        _disown(path)
+        self._active = None
+        self._active_path = None
+        self._active_bytes = 0
+    
+    def claim(self) -> Optional[str]:
+        """
+        Claim the oldest sealed segment for replay.
+        
+        The active segment is sealed first when nothing else is pending, so
+        records become replayable without waiting for the segment to fill.
+        """
+        with self._lock:
+            sealed = self._sealed_segments()
+            if not sealed and self._active is not None and self._active_bytes > 0:
+                self._seal()
+                sealed = self._sealed_segments()
+            
+            for name in sealed:
+                path = os.path.join(self.directory, name)
+                claimed = f"{path}.{os.getpid()}.replay"
+                _own(claimed)
+                try:
+                    os.replace(path, claimed)
+                except OSError:
+                    # Claimed by another process or spool sharing the directory
+                    _disown(claimed)
+                    continue
+                return claimed
+        return None
+    
+    def _sealed_segments(self) -> List[str]:
+        return sorted(
+            (name for name in os.listdir(self.directory) if name.endswith(".seg")),
+            key=lambda name: name.split("-", 1)[1],
+        )
+    
+    def read(self, segment: str) -> List[bytes]:
+        """Read all intact records of a claimed segment; a torn tail is ignored."""
+        items: List[bytes] = []
+        with open(segment, "rb") as f:
+            data = f.read()
+        
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, offset)
+            start = offset + _HEADER.size
+            chunk = data[start:start + length]
+            if len(chunk) < length or zlib.crc32(chunk) != crc:
+                break
+            items.append(chunk)
+            offset = start + length
+        
+        return items
+    
+    def release(self, segment: str, replayed: int = 0) -> None:
+        """Delete a fully replayed segment."""
+        with self._lock:
+            _disown(segment)
+            try:
+                size = os.path.getsize(segment)
+                os.remove(segment)
+            except OSError:
+                return
+            self._bytes = max(0, self._bytes - size)
+            self._replayed += replayed
+    
+    def unclaim(self, segment: str, replayed: int = 0) -> None:
+        """
+        Return a partially replayed segment to the pending set.
+        
+        The first ``replayed`` records are dropped from it so they are not
+        sent twice. The rest is written to a temporary file that replaces the
+        claimed one before it is renamed back, so a crash at any point leaves
+        a single copy of the remaining records.
+        """
+        with self._lock:
+            try:
+                if replayed > 0:
+                    size = os.path.getsize(segment)
+                    remaining = self.read(segment)[replayed:]
+                    tmp = segment + ".tmp"
+                    with open(tmp, "wb") as f:
+                        for data in remaining:
+                            f.write(_HEADER.pack(len(data), zlib.crc32(data)) + data)
+                        if self.fsync != "never":
+                            f.flush()
+                            os.fsync(f.fileno())
+                    os.replace(tmp, segment)
+                    self._bytes = max(0, self._bytes - size + os.path.getsize(segment))
+                    self._replayed += replayed
+                os.replace(segment, segment.rsplit(".", 2)[0])
+            except OSError:
+                pass
+            finally:
+                _disown(segment)
+    
+    def has_pending(self) -> bool:
+        """Whether any records are waiting on disk."""
+        with self._lock:
+            return bool(self._sealed_segments()) or self._active_bytes > 0
+    
+    def close(self) -> None:
+        """Seal the active segment so it is replayed on the next start."""
+        with self._lock:
+            self._seal()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get spool statistics."""
+        return {
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "appended": self._appended,
+            "replayed": self._replayed,
+            "rejected": self._rejected,
+        }
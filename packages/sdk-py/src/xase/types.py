@@ -2,7 +2,7 @@
 XASE SDK - Type Definitions
 """
 
-from typing import Any, Callable, Dict, Literal, Optional, TypedDict
+from typing import Any, Callable, Dict, List, Literal, Optional, TypedDict, Union
 
 
 class RecordPayload(TypedDict, total=False):
@@ -18,6 +18,7 @@ class RecordPayload(TypedDict, total=False):
     decision_type: Optional[str]
     processing_time: Optional[float]
     store_payload: Optional[bool]
+    priority: Optional[float]  # 0..1, used for load shedding only (not sent)
 
 
 class RecordResult(TypedDict):
@@ -31,6 +32,15 @@ class RecordResult(TypedDict):
     chain_position: Literal["chained", "genesis"]
 
 
+class PolicyRule(TypedDict, total=False):
+    """Sampling and rate limiting rule for one policy (or ``"*"`` for all others)."""
+    
+    sample_rate: float  # Fraction of records kept, 0..1 (default 1.0)
+    rate_limit: float  # Max records per second (token bucket)
+    burst: float  # Token bucket capacity (default: max(1, rate_limit))
+    always_record: Callable[[Dict[str, Any]], bool]  # Predicate on output bypassing the rule
+
+
 class XaseClientConfig(TypedDict, total=False):
     """Configuration for XaseClient."""
     
@@ -40,6 +50,47 @@ class XaseClientConfig(TypedDict, total=False):
     fire_and_forget: Optional[bool]
     max_retries: Optional[int]
     queue_max_size: Optional[int]
+    queue_max_bytes: Optional[int]  # Bound on serialized bytes held in the queue
+    batch_size: Optional[int]  # Max records per request (fire-and-forget mode)
+    batch_linger_ms: Optional[float]  # Max wait to fill a batch
+    queue_workers: Optional[int]  # Number of sender threads
+    queue_preserve_order: Optional[bool]  # Keep per-transaction_id ordering
+    max_connections: Optional[int]
+    max_keepalive_connections: Optional[int]
+    keepalive_expiry: Optional[float]  # Seconds an idle connection is kept open
+    http2: Optional[bool]  # Requires httpx[http2]
+    spool_dir: Optional[str]  # Enables the disk spool (fire-and-forget mode)
+    spool_max_bytes: Optional[int]
+    spool_segment_bytes: Optional[int]
+    spool_fsync: Optional[Literal["always", "interval", "never"]]
+    overflow_policy: Optional[Literal["block", "drop_newest", "drop_oldest", "shed", "spill"]]
+    overflow_block_timeout: Optional[float]  # Seconds record() may block ("block" policy)
+    shed_threshold: Optional[float]  # Queue fill ratio where shedding starts ("shed" policy)
+    priority_fn: Optional[Callable[[RecordPayload], float]]  # Record priority 0..1
+    json_serializer: Optional[
+        Union[Literal["auto", "orjson", "msgspec", "json"], Callable[[Any], bytes]]
+    ]
+    compression: Optional[Literal["gzip", "zstd"]]  # Request body Content-Encoding
+    compression_threshold: Optional[int]  # Minimum body size in bytes to compress
+    compression_level: Optional[int]
+    dedup_window_s: Optional[float]  # Suppress duplicate records seen within this many seconds
+    dedup_max_keys: Optional[int]  # Max fingerprints remembered by the duplicate window
+    policy_rules: Optional[Dict[str, PolicyRule]]  # Per-policy sampling / rate limits
+    circuit_breaker: Optional[bool]  # Client-wide breaker and Retry-After gate
+    circuit_failure_threshold: Optional[int]  # Consecutive transient failures before opening
+    circuit_reset_timeout: Optional[float]  # Seconds open before a half-open probe
+    circuit_fallback: Optional[Literal["spool", "drop"]]  # Queued records while open
+    # Pending callbacks kept for the callback thread (0 = inline)
+    callback_queue_size: Optional[int]
+    callback_batch_size: Optional[int]  # Deliver callbacks as lists of up to N items
+    metrics: Optional[bool]  # Collect pipeline metrics (get_metrics / export_prometheus)
+    otel_meter: Optional[Any]  # OpenTelemetry Meter to forward metrics to
+    payload_mode: Optional[Literal["full", "digest"]]  # "digest" sends hashes of input/output
+    digest_fields: Optional[List[str]]  # Dotted paths kept in clear in digest mode
+    handle_signals: Optional[bool]  # Close on SIGINT/SIGTERM, then call the previous handler
+    close_timeout: Optional[float]  # Seconds close() spends draining the queue
+    agent_socket: Optional[str]  # Send fire-and-forget records to a local `python -m xase.agent`
+    agent_timeout: Optional[float]  # Socket send timeout before falling back to the local queue
     on_error: Optional[Callable[["XaseError"], None]]
     on_success: Optional[Callable[[RecordResult], None]]
 
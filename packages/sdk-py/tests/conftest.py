@@ -2,7 +2,28 @@
 import os
 import sys
 
+import pytest
+
 ROOT = os.path.dirname(os.path.dirname(__file__))
 SRC = os.path.join(ROOT, 'src')
 if SRC not in sys.path:
     sys.path.insert(0, SRC)
+
+from stand_in_sidecar import StandInSidecar  # noqa: E402
+
+
+@pytest.fixture
+def sidecar(tmp_path):
+    """Start ``StandInSidecar``s in tmp_path; ``shm=True`` also serves a shared-memory ring."""
+    shm_dir = "/dev/shm" if os.access("/dev/shm", os.W_OK) else str(tmp_path)
+    servers = []
+
+    def start(segments, shm=False, **kwargs):
+        path = str(tmp_path / f"sidecar-{len(servers)}.sock")
+        server = StandInSidecar(path, segments, shm_dir=shm_dir if shm else None, **kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
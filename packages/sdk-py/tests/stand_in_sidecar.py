@@ -0,0 +1,218 @@
+"""Threaded Unix-socket stand-in for the Sidecar, shared by the sidecar tests and benchmarks."""
+
+import mmap
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+import uuid
+from collections import Counter
+
+from xase.sidecar import (
+    V2_GET_SEGMENT,
+    V2_HEADER,
+    V2_MAGIC,
+    V2_SHM_ATTACH,
+    V2_SHM_GET_SEGMENT,
+    V2_SHM_RELEASE,
+    V2_SHM_RELEASE_BODY,
+    V2_SHM_SLOT,
+    V2_STATUS_ERROR,
+    V2_STATUS_OK,
+    V2_VERSION,
+)
+
+
+def recv_exact(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        first = recv_exact(self.request, 4)
+        if first is None:
+            return
+        if first[:2] == V2_MAGIC:
+            self._serve_v2(first)
+        else:
+            self._serve_v1(first)
+
+    def _serve_v1(self, header):
+        while header is not None:
+            (length,) = struct.unpack(">I", header)
+            segment_id = recv_exact(self.request, length).decode("utf-8")
+            data = self.server.answer(segment_id) or b""
+            self.request.sendall(struct.pack(">I", len(data)))
+            self.request.sendall(data)
+            header = recv_exact(self.request, 4)
+
+    def _serve_v2(self, head):
+        server = self.server
+        write_lock = threading.Lock()
+        workers = []
+        rest = recv_exact(self.request, V2_HEADER.size - len(head))
+        while rest is not None:
+            _, _, kind, request_id, length = V2_HEADER.unpack(head + rest)
+            body = recv_exact(self.request, length) if length else b""
+            if kind == V2_SHM_ATTACH:
+                self._reply(write_lock, V2_STATUS_OK, request_id, server.ring_path.encode())
+            elif kind == V2_SHM_RELEASE:
+                (slot,) = V2_SHM_RELEASE_BODY.unpack(body)
+                server.free(slot)
+            else:
+                assert kind in (V2_GET_SEGMENT, V2_SHM_GET_SEGMENT)
+                segment_id = body.decode("utf-8")
+                if segment_id in server.drop_once:
+                    with server.lock:
+                        server.requests[segment_id] += 1
+                    server.drop_once.discard(segment_id)
+                    self.request.shutdown(socket.SHUT_RDWR)
+                    return
+                target = self._answer_shm if kind == V2_SHM_GET_SEGMENT else self._answer
+                if kind == V2_GET_SEGMENT and not server.delay(segment_id):
+                    target(write_lock, request_id, segment_id)
+                else:
+                    # Delays and ring slots are awaited concurrently: replies go out of order
+                    worker = threading.Thread(
+                        target=target, args=(write_lock, request_id, segment_id), daemon=True
+                    )
+                    worker.start()
+                    workers.append(worker)
+            head = recv_exact(self.request, V2_HEADER.size)
+            rest = b"" if head is not None else None
+        for worker in workers:
+            worker.join()
+
+    def _answer(self, write_lock, request_id, segment_id):
+        data = self.server.answer(segment_id)
+        if data is None:
+            error = f"unknown segment {segment_id}".encode()
+            self._reply(write_lock, V2_STATUS_ERROR, request_id, error)
+        else:
+            self._reply(write_lock, V2_STATUS_OK, request_id, data)
+
+    def _answer_shm(self, write_lock, request_id, segment_id):
+        server = self.server
+        data = server.answer(segment_id)
+        if data is None or len(data) > server.slot_size:
+            error = f"cannot serve {segment_id}".encode()
+            self._reply(write_lock, V2_STATUS_ERROR, request_id, error)
+            return
+        slot = server.take()
+        offset = slot * server.slot_size
+        server.mapping[offset:offset + len(data)] = data
+        self._reply(write_lock, V2_STATUS_OK, request_id, V2_SHM_SLOT.pack(slot, offset, len(data)))
+
+    def _reply(self, write_lock, status, request_id, payload):
+        with write_lock:
+            try:
+                # Header and payload separately, so large segments are not copied into a frame
+                header = V2_HEADER.pack(V2_MAGIC, V2_VERSION, status, request_id, len(payload))
+                self.request.sendall(header)
+                self.request.sendall(payload)
+            except OSError:
+                pass
+
+
+class StandInSidecar(socketserver.ThreadingUnixStreamServer):
+    """
+    Serves ``segments`` over v1 (in order) and v2 (delayed requests concurrently,
+    out of order).
+
+    With ``shm_dir`` the v2 shared-memory transport is served too: segments are
+    written into a ring of ``slots`` slots under ``shm_dir`` and handed out by slot.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, path, segments, delays=None, default_delay=0.0, shm_dir=None, slots=4, slot_size=4096
+    ):
+        super().__init__(path, _Handler)
+        self.segments = segments
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self.drop_once = set()
+        self.requests = Counter()
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+
+        self.ring_path = None
+        self.mapping = None
+        self.slot_size = slot_size
+        self.released = []
+        self._free = list(range(slots))
+        self._slots = threading.Condition()
+        if shm_dir is not None:
+            self.ring_path = os.path.join(shm_dir, f"xase-ring-{uuid.uuid4().hex}")
+            with open(self.ring_path, "wb") as f:
+                f.truncate(slots * slot_size)
+            with open(self.ring_path, "r+b") as f:
+                self.mapping = mmap.mmap(f.fileno(), 0)
+
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def delay(self, segment_id):
+        return self.delays.get(segment_id, self.default_delay)
+
+    def answer(self, segment_id):
+        """Count the request, wait its delay and return the segment (None if unknown)."""
+        with self.lock:
+            self.requests[segment_id] += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            delay = self.delay(segment_id)
+            if delay:
+                time.sleep(delay)
+        finally:
+            with self.lock:
+                self.active -= 1
+        return self.segments.get(segment_id)
+
+    def take(self):
+        with self._slots:
+            while not self._free:
+                self._slots.wait()
+            return self._free.pop(0)
+
+    def free(self, slot):
+        with self._slots:
+            self.released.append(slot)
+            self._free.append(slot)
+            self._slots.notify()
+
+    @property
+    def free_slots(self):
+        with self._slots:
+            return len(self._free)
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+        if self.mapping is not None:
+            self.mapping.close()
+            os.unlink(self.ring_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
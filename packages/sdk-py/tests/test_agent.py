@@ -0,0 +1,111 @@
+import os
+import socket
+import struct
+import threading
+
+import pytest
+
+from xase.agent import Agent, AgentSender, encode_frame
+from xase.client import XaseClient
+from xase.queue import encode_record
+from xase.types import XaseError
+
+from test_queue import BatchHttp, _payload
+
+
+@pytest.fixture
+def agent(tmp_path):
+    http = BatchHttp()
+    client = XaseClient(
+        {"api_key": "k", "fire_and_forget": True, "batch_size": 50, "batch_linger_ms": 50}
+    )
+    client.http_client.post = http.post
+    agent = Agent(client, str(tmp_path / "agent.sock"))
+    thread = threading.Thread(target=agent.serve_forever, daemon=True)
+    thread.start()
+    yield agent, http
+    agent.shutdown()
+    agent.close(drain_timeout_s=2.0)
+
+
+def test_worker_clients_share_the_agent_batches(agent):
+    agent, http = agent
+    workers = [XaseClient({"api_key": "k", "agent_socket": agent.socket_path}) for _ in range(3)]
+    for n, worker in enumerate(workers):
+        for i in range(20):
+            worker.record(_payload(n * 100 + i))
+        assert worker.queue is None  # no local queue or connections in the worker
+        assert worker.get_stats()["agent"]["sent"] == 20
+        worker.close()
+
+    deadline = threading.Event()
+    while agent.get_stats()["received"] < 60 and not deadline.wait(0.01):
+        pass
+    agent.client.flush(2.0)
+
+    sent = [rec["input"]["i"] for endpoint, body, _ in http.calls for rec in body["records"]]
+    assert sorted(sent) == sorted(n * 100 + i for n in range(3) for i in range(20))
+    assert all(endpoint == "/records/batch" for endpoint, _, _ in http.calls)
+    assert len(http.calls) < 60
+
+
+def test_worker_falls_back_to_local_queue_without_agent(tmp_path):
+    client = XaseClient({"api_key": "k", "agent_socket": str(tmp_path / "missing.sock")})
+    http = BatchHttp()
+    client.http_client.post = http.post
+
+    assert client.record(_payload(1)) is None
+    assert client.queue is not None
+    client.flush(2.0)
+    assert client.get_stats()["agent"]["failed"] == 1
+    client.close()
+
+
+def test_agent_rejects_oversized_frames_and_keeps_serving(agent):
+    agent, http = agent
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(agent.socket_path)
+        sock.sendall(struct.pack(">I", 1 << 30))
+        sock.recv(1)  # agent closes the connection
+    sender = AgentSender(agent.socket_path)
+    assert sender.send(encode_record(_payload(7)))
+    sender.close()
+
+    deadline = threading.Event()
+    while agent.get_stats()["received"] < 1 and not deadline.wait(0.01):
+        pass
+    assert agent.get_stats()["rejected"] == 1
+    assert os.stat(agent.socket_path)
+
+
+def test_agent_refuses_a_live_socket_and_replaces_a_stale_one(agent, tmp_path):
+    agent, _ = agent
+    client = XaseClient({"api_key": "k", "fire_and_forget": True})
+    with pytest.raises(XaseError) as ei:
+        Agent(client, agent.socket_path)
+    assert ei.value.code == "AGENT_RUNNING"
+    assert os.path.exists(agent.socket_path)
+
+    stale_path = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(stale_path)
+    stale.close()
+    replacement = Agent(client, stale_path)
+    replacement.close(drain_timeout_s=1.0)
+
+
+def test_agent_leaves_a_regular_file_at_the_socket_path(tmp_path):
+    path = tmp_path / "agent.sock"
+    path.write_text("not a socket")
+    client = XaseClient({"api_key": "k", "fire_and_forget": True})
+    with pytest.raises(XaseError) as ei:
+        Agent(client, str(path))
+    assert ei.value.code == "INVALID_CONFIG"
+    assert path.read_text() == "not a socket"
+    client.close()
+
+
+def test_frame_round_trips_key_and_body():
+    record = encode_record(_payload(3), "key_0000000000000003")
+    frame = encode_frame(record)
+    assert int.from_bytes(frame[:4], "big") == len(frame) - 4
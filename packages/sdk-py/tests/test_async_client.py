@@ -0,0 +1,309 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from xase.async_client import AsyncXaseClient
+from xase.http import AsyncHttpClient
+from xase.types import XaseError
+
+
+def _decode(body):
+    return json.loads(body) if isinstance(body, bytes) else body
+
+
+class DummyAsyncHttp:
+    def __init__(self):
+        self.calls = []
+
+    async def post(self, endpoint, body, headers=None):
+        body = _decode(body)
+        self.calls.append((endpoint, body, headers or {}))
+        await asyncio.sleep(0)
+        if endpoint == "/records/batch":
+            return {
+                "results": [
+                    {"success": True, "transaction_id": r["input"]["i"]} for r in body["records"]
+                ]
+            }
+        return {"success": True, "transaction_id": body["input"]["i"]}
+
+    def get_pool_stats(self):
+        return {}
+
+    def get_compression_stats(self):
+        return {}
+
+    def get_circuit_stats(self):
+        return None
+
+    async def aclose(self):
+        pass
+
+
+def _payload(i):
+    return {"policy": "p", "input": {"i": i}, "output": {"y": 1}}
+
+
+def _client(**config):
+    client = AsyncXaseClient({"api_key": "k", **config})
+    d = DummyAsyncHttp()
+    client.http_client = d
+    if client.queue:
+        client.queue.http_client = d
+    return client, d
+
+
+def test_async_record_fire_and_forget_batches():
+    successes = []
+
+    async def main():
+        client, d = _client(batch_size=10, batch_linger_ms=50, on_success=successes.append)
+        for i in range(25):
+            assert await client.record(_payload(i)) is None
+        await client.flush(2.0)
+        stats = client.get_stats()
+        await client.aclose()
+        return d, stats
+
+    d, stats = asyncio.run(main())
+    assert sorted(r["transaction_id"] for r in successes) == list(range(25))
+    assert all(c[0] == "/records/batch" for c in d.calls)
+    assert len(d.calls) == 3
+    assert stats["size"] == 0
+
+
+def test_async_record_sync_mode_and_validation():
+    async def main():
+        client, d = _client(fire_and_forget=False)
+        res = await client.record({**_payload(7), "context": {"model": "m1"}})
+        with pytest.raises(XaseError):
+            await client.record({"policy": "p", "input": {}, "output": {}})
+        await client.aclose()
+        return res, d
+
+    res, d = asyncio.run(main())
+    assert res["transaction_id"] == 7
+    endpoint, body, _ = d.calls[0]
+    assert endpoint == "/records"
+    assert body["context"]["model"] == "m1"
+    assert "runtime" in body["context"]
+
+
+def test_async_records_refused_by_the_queue_are_not_remembered_as_duplicates():
+    async def main():
+        client, d = _client(dedup_window_s=60, queue_max_size=1, overflow_policy="drop_newest")
+        await client.record(_payload(1))
+        await client.record(_payload(2))  # the worker has not run yet: dropped
+        await client.flush(2.0)
+        await client.record(_payload(2))
+        await client.flush(2.0)
+        await client.queue.close()
+        with pytest.raises(XaseError):
+            await client.record(_payload(3))
+        with pytest.raises(XaseError) as exc_info:
+            await client.record(_payload(3))
+        await client.aclose()
+        return d, exc_info.value
+
+    d, error = asyncio.run(main())
+    assert [body["input"]["i"] for _, body, _ in d.calls] == [1, 2]
+    assert error.code == "QUEUE_CLOSED"
+
+
+def test_async_records_lost_by_a_background_send_are_not_remembered_as_duplicates():
+    class FailingHttp(DummyAsyncHttp):
+        async def post(self, endpoint, body, headers=None):
+            if not self.calls:
+                self.calls.append(None)
+                raise XaseError("down", "MAX_RETRIES")
+            return await super().post(endpoint, body, headers)
+
+    async def main():
+        client, _ = _client(dedup_window_s=60)
+        d = client.http_client = client.queue.http_client = FailingHttp()
+        for _ in range(2):
+            await client.record(_payload(1))
+            await client.flush(2.0)
+        stats = client.get_stats()
+        await client.aclose()
+        return d, stats
+
+    d, stats = asyncio.run(main())
+    assert len(d.calls) == 2 and d.calls[-1][1]["input"]["i"] == 1
+    # The lost record is not counted as sent
+    assert stats["workers"] == [{"in_flight": 0, "sent": 1}]
+
+
+@pytest.mark.parametrize("option", [
+    {"spool_dir": "/tmp/xase-spool"},
+    {"circuit_fallback": "spool"},
+    {"callback_queue_size": 10000},
+    {"callback_batch_size": 10},
+])
+def test_async_client_rejects_sync_only_options(option):
+    with pytest.raises(XaseError) as exc_info:
+        AsyncXaseClient({"api_key": "k", **option})
+    assert exc_info.value.code == "INVALID_CONFIG"
+
+
+def test_async_client_accepts_the_behavior_it_has():
+    client = AsyncXaseClient({"api_key": "k", "circuit_fallback": "drop", "callback_queue_size": 0})
+    assert client.config["circuit_fallback"] == "drop"
+    assert client.config["callback_queue_size"] == 0
+    assert AsyncXaseClient({"api_key": "k"}).config["circuit_fallback"] == "drop"
+
+
+def test_async_queue_close_reports_records_left_behind():
+    from xase.async_queue import AsyncQueue
+    from xase.metrics import Metrics
+
+    class StalledHttp(DummyAsyncHttp):
+        async def post(self, endpoint, body, headers=None):
+            await asyncio.sleep(10)
+
+    errors = []
+    metrics = Metrics()
+
+    async def main():
+        q = AsyncQueue(StalledHttp(), max_size=10, on_error=errors.append, metrics=metrics)
+        for i in range(4):
+            await q.enqueue(_payload(i))
+        await asyncio.sleep(0.01)  # the worker takes the first record
+        await q.close()
+        return q.get_stats()
+
+    stats = asyncio.run(main())
+    assert [e.code for e in errors] == ["QUEUE_CLOSED"] * 4
+    assert metrics.snapshot()["records_dropped_total"]["close_timeout"] == 4
+    assert stats["size"] == 0 and stats["bytes"] == 0
+    assert stats["workers"] == [{"in_flight": 0, "sent": 0}]
+
+
+def test_async_queue_close_reports_the_batch_a_worker_is_lingering_on():
+    from xase.async_queue import AsyncQueue
+
+    errors = []
+
+    async def main():
+        http = DummyAsyncHttp()
+        q = AsyncQueue(
+            http, max_size=10, on_error=errors.append, batch_size=10, batch_linger_ms=10_000
+        )
+        for i in range(3):
+            await q.enqueue(_payload(i))
+        await asyncio.sleep(0.01)  # the worker holds all three while it lingers
+        await q.close()
+        return http
+
+    http = asyncio.run(main())
+    assert http.calls == []
+    assert [e.code for e in errors] == ["QUEUE_CLOSED"] * 3
+
+
+def test_async_with_keeps_the_body_exception_over_a_flush_timeout():
+    errors = []
+
+    class StalledHttp(DummyAsyncHttp):
+        async def post(self, endpoint, body, headers=None):
+            await asyncio.sleep(10)
+
+    async def main():
+        async with AsyncXaseClient({"api_key": "k", "on_error": errors.append}) as client:
+            client.http_client = client.queue.http_client = StalledHttp()
+            await client.record(_payload(1))
+            raise ValueError("body failed")
+
+    with pytest.raises(ValueError, match="body failed"):
+        asyncio.run(main())
+    assert [e.code for e in errors] == ["QUEUE_CLOSED"]
+
+
+def test_async_get_stats_is_none_outside_fire_and_forget():
+    client = AsyncXaseClient({"api_key": "k", "fire_and_forget": False})
+    assert client.get_stats() is None
+
+
+def test_async_block_policy_waits_for_the_worker_to_drain():
+    from xase.async_queue import AsyncQueue
+
+    class SlowHttp(DummyAsyncHttp):
+        def __init__(self, delay):
+            super().__init__()
+            self.delay = delay
+
+        async def post(self, endpoint, body, headers=None):
+            await asyncio.sleep(self.delay)
+            return await super().post(endpoint, body, headers)
+
+    async def run(delay, block_timeout_s):
+        http = SlowHttp(delay)
+        q = AsyncQueue(http, max_size=1, overflow_policy="block", block_timeout_s=block_timeout_s)
+        accepted = await asyncio.gather(*(q.enqueue(_payload(i)) for i in range(4)))
+        await q.flush(2.0)
+        await q.close()
+        return accepted, q.get_stats()["overflow"]
+
+    accepted, overflow = asyncio.run(run(0.02, 1.0))
+    assert accepted == [True] * 4
+    assert overflow["blocked"] >= 2 and overflow["block_timeouts"] == 0
+
+    accepted, overflow = asyncio.run(run(0.5, 0.05))
+    assert accepted.count(False) == overflow["block_timeouts"] >= 1
+
+
+def test_async_http_client_retries_5xx(monkeypatch):
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            return httpx.Response(503, json={"error": "busy"})
+        return httpx.Response(200, json={"ok": True})
+
+    real_async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx, "AsyncClient",
+        lambda **kw: real_async_client(transport=httpx.MockTransport(handler), **kw),
+    )
+
+    async def main():
+        client = AsyncHttpClient(
+            api_key="k", base_url="https://api", timeout=1.0, max_retries=2, base_delay=0.0
+        )
+        try:
+            return await client.post("/records", {"a": 1})
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(main()) == {"ok": True}
+    assert calls["n"] == 2
+
+
+def test_async_http_client_retries_a_closed_pooled_connection(monkeypatch):
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise httpx.RemoteProtocolError("Server disconnected without sending a response.")
+        return httpx.Response(200, json={"ok": True})
+
+    real_async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx, "AsyncClient",
+        lambda **kw: real_async_client(transport=httpx.MockTransport(handler), **kw),
+    )
+
+    async def main():
+        client = AsyncHttpClient(
+            api_key="k", base_url="https://api", timeout=1.0, max_retries=2, base_delay=0.0
+        )
+        try:
+            return await client.post("/records", {"a": 1})
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(main()) == {"ok": True}
+    assert calls["n"] == 2
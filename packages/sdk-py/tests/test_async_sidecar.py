@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pytest
+
+from xase.async_sidecar import AsyncSidecarClient
+from xase.types import XaseError
+
+
+def _run(sidecar, scenario, segments, **server_kwargs):
+    server = sidecar(segments, **server_kwargs)
+    return asyncio.run(scenario(server, server.server_address))
+
+
+def test_v2_requests_run_concurrently_over_the_pool(sidecar):
+    segments = {f"seg_{i:02d}": bytes([i]) * 64 for i in range(32)}
+
+    async def scenario(server, path):
+        async with AsyncSidecarClient(path, protocol="v2", pool_size=2, timeout=5.0) as client:
+            start = time.monotonic()
+            results = await asyncio.gather(*(client.get_segment(s) for s in segments))
+            elapsed = time.monotonic() - start
+            stats = client.get_stats()
+        return results, elapsed, stats
+
+    results, elapsed, stats = _run(sidecar, scenario, segments, default_delay=0.1)
+    assert results == list(segments.values())
+    # 32 sequential round trips would take 3.2 s
+    assert elapsed < 1.0
+    assert stats["connections"] <= 2
+
+
+def test_v1_pool_bounds_connections_and_concurrency(sidecar):
+    segments = {f"seg_{i}": b"x" for i in range(8)}
+
+    async def scenario(server, path):
+        async with AsyncSidecarClient(path, pool_size=4, timeout=5.0) as client:
+            results = await asyncio.gather(*(client.get_segment(s) for s in segments))
+        return results, server
+
+    results, server = _run(sidecar, scenario, segments, default_delay=0.05)
+    assert results == [b"x"] * 8
+    assert server.connections <= 4
+    assert 1 < server.max_active <= 4
+
+
+def test_max_concurrency_limits_requests_in_flight(sidecar):
+    segments = {f"seg_{i}": b"x" for i in range(12)}
+
+    async def scenario(server, path):
+        async with AsyncSidecarClient(
+            path, protocol="v2", max_concurrency=3, timeout=5.0
+        ) as client:
+            await asyncio.gather(*(client.get_segment(s) for s in segments))
+        return server
+
+    server = _run(sidecar, scenario, segments, default_delay=0.03)
+    assert server.max_active <= 3
+
+
+@pytest.mark.parametrize("protocol", ["v1", "v2"])
+def test_cancelled_request_leaves_client_usable(sidecar, protocol):
+    segments = {"slow": b"S", "fast": b"F"}
+
+    async def scenario(server, path):
+        async with AsyncSidecarClient(path, protocol=protocol, pool_size=1, timeout=5.0) as client:
+            task = asyncio.ensure_future(client.get_segment("slow"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            data = await client.get_segment("fast")
+            in_flight = client.get_stats()["in_flight"]
+        return data, in_flight
+
+    data, in_flight = _run(sidecar, scenario, segments, delays={"slow": 0.5})
+    assert data == b"F"
+    assert in_flight == 0
+
+
+def test_get_segments_reports_errors_and_retries_only_failed_ids(sidecar):
+    segments = {f"seg_{i}": bytes([i]) for i in range(4)}
+
+    async def scenario(server, path):
+        server.drop_once.add("seg_2")
+        async with AsyncSidecarClient(
+            path, protocol="v2", backoff_base=0.01, timeout=5.0
+        ) as client:
+            results = [
+                pair async for pair in client.get_segments([*segments, "missing"], ordered=True)
+            ]
+        return results, server
+
+    results, server = _run(sidecar, scenario, segments)
+    assert [segment_id for segment_id, _ in results] == [*segments, "missing"]
+    assert dict(results[:4]) == segments
+    assert isinstance(results[4][1], XaseError)
+    assert results[4][1].code == "SIDECAR_ERROR"
+    assert server.requests["seg_2"] == 2
+    assert server.requests["seg_0"] == 1
+
+
+def test_get_segments_completion_order(sidecar):
+    segments = {"seg_0": b"0", "seg_1": b"1", "seg_2": b"2"}
+
+    async def scenario(server, path):
+        async with AsyncSidecarClient(path, protocol="v2", timeout=5.0) as client:
+            return [segment_id async for segment_id, _ in client.get_segments(segments)]
+
+    order = _run(sidecar, scenario, segments, delays={"seg_0": 0.2})
+    assert order[-1] == "seg_0"
+
+
+def test_timeout_and_unreachable_sidecar_raise_connection_error(sidecar, tmp_path):
+    async def scenario(server, path):
+        async with AsyncSidecarClient(path, protocol="v2", timeout=0.1, max_retries=1) as client:
+            with pytest.raises(ConnectionError):
+                await client.get_segment("slow")
+        async with AsyncSidecarClient(str(tmp_path / "none.sock"), max_retries=1) as client:
+            with pytest.raises(ConnectionError):
+                await client.get_segment("seg_1")
+
+    _run(sidecar, scenario, {"slow": b"S"}, delays={"slow": 1.0})
+
+
+def test_invalid_config_rejected():
+    with pytest.raises(XaseError) as exc_info:
+        AsyncSidecarClient(protocol="v3")
+    assert exc_info.value.code == "INVALID_CONFIG"
+    with pytest.raises(XaseError):
+        AsyncSidecarClient(pool_size=0)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from bench_record import compare  # noqa: E402
+from bench_sidecar import run as run_sidecar  # noqa: E402
+from server import StandInServer  # noqa: E402
+
+
+def test_stand_in_server_answers_records_and_injects_errors():
+    with StandInServer() as server:
+        resp = httpx.post(f"{server.base_url}/records", json={"policyId": "p"})
+        assert resp.status_code == 200
+        assert resp.json()["success"] is True
+        batch = httpx.post(f"{server.base_url}/records/batch", json={"records": [{}, {}]})
+        assert len(batch.json()["results"]) == 2
+        assert server.records == 3
+
+    with StandInServer(error_rate=1.0) as server:
+        assert httpx.post(f"{server.base_url}/records", json={}).status_code == 503
+
+
+def test_compare_flags_only_gated_regressions_beyond_threshold():
+    baseline = {
+        "scenarios": {"s": {"records_per_s": 1000, "record_overhead_us_p50": 10, "flush_s": 1}}
+    }
+    ok = {"scenarios": {"s": {"records_per_s": 800, "record_overhead_us_p50": 12, "flush_s": 5}}}
+    bad = {"scenarios": {"s": {"records_per_s": 500, "record_overhead_us_p50": 20, "flush_s": 1}}}
+    assert compare(ok, baseline, 0.3) == []
+    assert len(compare(bad, baseline, 0.3)) == 2
+
+
+def test_sidecar_benchmark_reports_throughput_and_allocations():
+    results = run_sidecar([65536], total_mb=1)
+    scenarios = results["scenarios"]
+    assert set(scenarios) == {
+        f"{name}@65536" for name in ("v1-concat", "v1", "v1-out", "v2", "v2-out")
+    }
+    assert all(metrics["mb_per_s"] > 0 for metrics in scenarios.values())
+    # A caller-provided buffer avoids allocating the segment at all
+    assert scenarios["v1-out@65536"]["peak_alloc_per_segment"] < 0.5
@@ -0,0 +1,171 @@
+import pytest
+
+from xase import circuit
+from xase.circuit import CircuitBreaker
+from xase.http import HttpClient
+from xase.queue import Queue
+from xase.types import XaseError
+
+from test_http import _Resp, _patch_client
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_threshold_and_probes_half_open(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=5.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock[0] += 5.0
+    assert breaker.allow()  # single half-open probe
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock[0] += 5.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.get_stats()["opened"] == 2
+
+
+def test_half_open_probe_without_verdict_is_written_off(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=5.0)
+    breaker.record_failure()
+    clock[0] += 5.0
+    assert breaker.allow()  # the probe never reports back
+    assert not breaker.allow()
+
+    clock[0] += 5.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_retry_after_gates_all_senders(clock):
+    breaker = CircuitBreaker()
+    breaker.defer(3.0)
+    assert not breaker.allow()
+    assert breaker.remaining_s() == 3.0
+    clock[0] += 3.0
+    assert breaker.allow()
+
+
+def test_http_client_fails_fast_while_open(monkeypatch):
+    calls = {"n": 0}
+
+    def fake_post(url, body, headers, timeout):
+        calls["n"] += 1
+        return _Resp(503, {"error": "down"}, text="{}")
+
+    _patch_client(monkeypatch, fake_post)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=60.0)
+    client = HttpClient(
+        api_key="k", base_url="https://api", timeout=1.0, max_retries=5,
+        base_delay=0.0, circuit_breaker=breaker,
+    )
+
+    with pytest.raises(XaseError) as ei:
+        client.post("/records", {"a": 1})
+    assert ei.value.status_code == 503
+    assert calls["n"] == 2  # retry budget abandoned once the breaker opened
+
+    with pytest.raises(XaseError) as ei:
+        client.post("/records", {"a": 1})
+    assert ei.value.code == "CIRCUIT_OPEN"
+    assert calls["n"] == 2
+
+
+def test_http_client_honors_retry_after_globally(monkeypatch):
+    def fake_post(url, body, headers, timeout):
+        return _Resp(429, {"error": "rate"}, headers={"Retry-After": "30"}, text="{}")
+
+    _patch_client(monkeypatch, fake_post)
+    client = HttpClient(
+        api_key="k", base_url="https://api", timeout=1.0, max_retries=3,
+        circuit_breaker=CircuitBreaker(failure_threshold=10),
+    )
+    with pytest.raises(XaseError) as ei:
+        client.post("/records", {"a": 1}, deferrable=True)
+    assert ei.value.status_code == 429
+    with pytest.raises(XaseError) as ei:
+        client.post("/records", {"a": 1})
+    assert ei.value.code == "CIRCUIT_OPEN"
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_http_client_waits_out_retry_after_without_a_fallback(monkeypatch, status):
+    responses = [
+        _Resp(status, {"error": "busy"}, headers={"Retry-After": "0.05"}, text="{}"),
+        _Resp(200, {"id": "r1"}, text="{}"),
+    ]
+    _patch_client(monkeypatch, lambda url, body, headers, timeout: responses.pop(0))
+    breaker = CircuitBreaker(failure_threshold=10)
+    client = HttpClient(
+        api_key="k", base_url="https://api", timeout=1.0, max_retries=3,
+        circuit_breaker=breaker,
+    )
+    assert client.post("/records", {"a": 1}) == {"id": "r1"}
+    assert not responses
+
+
+def test_http_client_leaves_503_retry_after_to_a_deferrable_caller(monkeypatch):
+    calls = {"n": 0}
+
+    def fake_post(url, body, headers, timeout):
+        calls["n"] += 1
+        return _Resp(503, {"error": "busy"}, headers={"Retry-After": "30"}, text="{}")
+
+    _patch_client(monkeypatch, fake_post)
+    client = HttpClient(
+        api_key="k", base_url="https://api", timeout=1.0, max_retries=3,
+        circuit_breaker=CircuitBreaker(failure_threshold=10),
+    )
+    with pytest.raises(XaseError) as ei:
+        client.post("/records", {"a": 1}, deferrable=True)
+    assert ei.value.status_code == 503
+    assert calls["n"] == 1
+    assert client.get_circuit_stats()["retry_in_s"] > 0
+
+
+class _OpenHttp:
+    def post(self, endpoint, body, headers=None, deferrable=False):
+        raise XaseError("Circuit breaker open", "CIRCUIT_OPEN")
+
+
+@pytest.mark.parametrize("fallback", ["spool", "drop"])
+def test_queue_routes_records_to_fallback_while_open(tmp_path, fallback):
+    from xase.spool import Spool
+
+    spool = Spool(str(tmp_path), max_bytes=1 << 20, segment_max_bytes=1 << 16)
+    errors = []
+    q = Queue(
+        http_client=_OpenHttp(),
+        max_size=10,
+        on_error=errors.append,
+        spool=spool,
+        replay_interval_s=60.0,
+        circuit_fallback=fallback,
+    )
+    for i in range(3):
+        q.enqueue({"policy": "p", "input": {"i": i}, "output": {"y": 1}})
+    q.flush(2.0)
+    stats = q.get_stats()
+    q.close()
+
+    if fallback == "spool":
+        assert stats["circuit_fallback"]["spooled"] == 3
+        assert stats["spool"]["appended"] == 3
+        assert errors == []
+    else:
+        assert stats["circuit_fallback"]["dropped"] == 3
+        assert stats["spool"]["appended"] == 0
+        assert [e.code for e in errors] == ["CIRCUIT_OPEN"] * 3
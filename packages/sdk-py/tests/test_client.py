@@ -1,3 +1,6 @@
+import json
+import signal
+import time
 import types
 import pytest
 
@@ -9,7 +12,9 @@ class DummyHttp:
     def __init__(self):
         self.calls = []
 
-    def post(self, endpoint, body, headers=None):
+    def post(self, endpoint, body, headers=None, deferrable=False):
+        if isinstance(body, bytes):
+            body = json.loads(body)
         self.calls.append((endpoint, body, headers or {}))
         return {"success": True, "transaction_id": body.get("input", {}).get("tx", "t1"), "receipt_url": "u", "timestamp": "now", "record_hash": "h", "chain_position": "chained"}
 
@@ -57,6 +62,14 @@ def test_record_sync(monkeypatch):
     assert "Idempotency-Key" not in headers
 
 
+def test_get_stats_is_none_without_fire_and_forget():
+    client = XaseClient({"api_key": "k", "fire_and_forget": False})
+    assert client.get_stats() is None
+    client = XaseClient({"api_key": "k", "fire_and_forget": True})
+    assert client.get_stats()["http"]["requests"] == 0
+    client.close()
+
+
 def test_invalid_payload_raises():
     client = XaseClient({"api_key": "k", "fire_and_forget": False})
     with pytest.raises(XaseError):
@@ -71,3 +84,165 @@ def test_invalid_idempotency_key_raises():
     client = XaseClient({"api_key": "k", "fire_and_forget": False})
     with pytest.raises(XaseError):
         client.record(_minimal_payload(), idempotency_key="bad key with spaces")
+
+
+@pytest.mark.parametrize("priority", ["high", {"level": 1}, [0.5]])
+def test_non_numeric_priority_is_rejected(priority):
+    client = XaseClient({"api_key": "k", "fire_and_forget": True, "overflow_policy": "shed"})
+    client.http_client = client.queue.http_client = DummyHttp()
+
+    with pytest.raises(XaseError) as ei:
+        client.record({**_minimal_payload(), "priority": priority})
+    assert ei.value.code == "INVALID_PAYLOAD"
+    assert client.record({**_minimal_payload(), "priority": None}) is None
+    client.flush(2.0)
+
+
+def test_duplicate_records_are_suppressed_within_window():
+    client = XaseClient({"api_key": "k", "fire_and_forget": False, "dedup_window_s": 60})
+    d = DummyHttp()
+    client.http_client = d
+
+    assert client.record(_minimal_payload()) is not None
+    assert client.record(_minimal_payload()) is None
+    other = _minimal_payload()
+    other["output"] = {"y": 2}
+    assert client.record(other) is not None
+    assert client.record(_minimal_payload(), idempotency_key="key_0000000000000001") is not None
+    assert client.record(other, idempotency_key="key_0000000000000001") is None
+
+    assert len(d.calls) == 3
+    assert client.dedup.get_stats()["suppressed"] == 2
+
+
+def test_failed_record_is_not_remembered_as_duplicate():
+    class FailingHttp(DummyHttp):
+        def post(self, endpoint, body, headers=None, deferrable=False):
+            if not self.calls:
+                self.calls.append(None)
+                raise XaseError("down", "MAX_RETRIES")
+            return super().post(endpoint, body, headers)
+
+    client = XaseClient({"api_key": "k", "fire_and_forget": False, "dedup_window_s": 60})
+    client.http_client = FailingHttp()
+
+    with pytest.raises(XaseError):
+        client.record(_minimal_payload())
+    assert client.record(_minimal_payload()) is not None
+
+
+def test_records_lost_by_a_background_send_are_not_remembered_as_duplicates():
+    class FailingHttp(DummyHttp):
+        def post(self, endpoint, body, headers=None, deferrable=False):
+            if len(self.calls) < 2:
+                self.calls.append(None)
+                # A transient failure with no spool, then a rejection
+                if len(self.calls) == 1:
+                    raise XaseError("down", "MAX_RETRIES")
+                raise XaseError("bad", "INVALID", 400)
+            return super().post(endpoint, body, headers)
+
+    client = XaseClient({"api_key": "k", "fire_and_forget": True, "dedup_window_s": 60})
+    d = FailingHttp()
+    client.http_client = client.queue.http_client = d
+
+    for _ in range(3):
+        client.record(_minimal_payload())
+        client.flush(2.0)
+    assert len(d.calls) == 3 and d.calls[-1][0] == "/records"
+    assert client.dedup.get_stats()["suppressed"] == 0
+
+
+def test_records_refused_by_the_queue_are_not_remembered_as_duplicates():
+    import threading
+
+    release = threading.Event()
+
+    class StalledHttp(DummyHttp):
+        def post(self, endpoint, body, headers=None, deferrable=False):
+            release.wait(5)
+            return super().post(endpoint, body, headers)
+
+    client = XaseClient({
+        "api_key": "k",
+        "fire_and_forget": True,
+        "dedup_window_s": 60,
+        "queue_max_size": 1,
+        "overflow_policy": "drop_newest",
+    })
+    d = StalledHttp()
+    client.http_client = client.queue.http_client = d
+
+    def payload(n):
+        p = _minimal_payload()
+        p["input"] = {"tx": f"t{n}"}
+        return p
+
+    client.record(payload(1))
+    deadline = time.monotonic() + 2.0
+    while client.queue.get_stats()["size"] and time.monotonic() < deadline:
+        time.sleep(0.01)  # the worker holds record 1
+    client.record(payload(2))
+    client.record(payload(3))  # queue full: dropped
+    assert client.queue.get_stats()["overflow"]["dropped_newest"] == 1
+
+    release.set()
+    client.flush(2.0)
+    client.record(payload(3))
+    client.flush(2.0)
+    assert [body["input"]["tx"] for _, body, _ in d.calls] == ["t1", "t2", "t3"]
+
+    client.queue.close()
+    with pytest.raises(XaseError):
+        client.record(payload(4))
+    with pytest.raises(XaseError) as exc_info:
+        client.record(payload(4))
+    assert exc_info.value.code == "QUEUE_CLOSED"
+
+
+def test_unserializable_payload_with_dedup_raises_invalid_payload():
+    client = XaseClient({"api_key": "k", "fire_and_forget": False, "dedup_window_s": 60})
+    payload = _minimal_payload()
+    payload["input"] = {"when": object()}
+
+    with pytest.raises(XaseError) as exc_info:
+        client.record(payload)
+    assert exc_info.value.code == "INVALID_PAYLOAD"
+
+
+def test_dedup_window_expires_and_is_bounded(monkeypatch):
+    from xase import dedup
+
+    now = [100.0]
+    monkeypatch.setattr(dedup.time, "monotonic", lambda: now[0])
+    window = dedup.DedupWindow(window_s=10, max_keys=2)
+
+    assert window.check(b"a") is False
+    assert window.check(b"a") is True
+    now[0] += 11
+    assert window.check(b"a") is False
+    window.check(b"b")
+    window.check(b"c")
+    assert window.get_stats()["keys"] == 2
+    assert window.check(b"a") is False
+
+
+def test_signal_handlers_chain_to_previous_handler():
+    calls = []
+    previous = signal.signal(signal.SIGTERM, lambda signum, frame: calls.append(signum))
+    try:
+        client = XaseClient({"api_key": "k", "fire_and_forget": True})
+        client.queue.http_client = DummyHttp()
+        client.record(_minimal_payload())
+        signal.raise_signal(signal.SIGTERM)
+        assert calls == [signal.SIGTERM]
+        assert client.queue.get_stats()["closed"]
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def test_signal_handlers_can_be_disabled():
+    before = signal.getsignal(signal.SIGTERM)
+    client = XaseClient({"api_key": "k", "fire_and_forget": True, "handle_signals": False})
+    assert signal.getsignal(signal.SIGTERM) is before
+    client.close()
@@ -0,0 +1,60 @@
+import socket
+
+import xase.context as context_mod
+from xase.context import (
+    capture_context,
+    register_context_provider,
+    reset_static_context,
+    unregister_context_provider,
+)
+
+
+def test_static_context_is_computed_once(monkeypatch):
+    calls = {"n": 0}
+    real = socket.gethostname
+
+    def counting_gethostname():
+        calls["n"] += 1
+        return real()
+
+    monkeypatch.setattr(socket, "gethostname", counting_gethostname)
+    reset_static_context()
+
+    first = capture_context()
+    for _ in range(10):
+        ctx = capture_context()
+    assert calls["n"] == 1
+    assert ctx["hostname"] == first["hostname"]
+    assert "timestamp" in ctx and "pid" in ctx
+
+    # Callers may mutate the returned dict without corrupting the cache
+    ctx["hostname"] = "mutated"
+    assert capture_context()["hostname"] == first["hostname"]
+
+
+def test_static_context_recaptured_after_reset(monkeypatch):
+    capture_context()
+    monkeypatch.setattr(context_mod.os, "getpid", lambda: 424242)
+    reset_static_context()  # what the after-fork hook does in a child
+    assert capture_context()["pid"] == 424242
+    monkeypatch.undo()
+    reset_static_context()
+
+
+def test_dynamic_providers_evaluated_per_capture():
+    counter = iter(range(100))
+    register_context_provider("trace_id", lambda: f"trace-{next(counter)}")
+    register_context_provider("broken", lambda: 1 / 0)
+    register_context_provider("absent", lambda: None)
+    try:
+        a = capture_context()
+        b = capture_context()
+        assert a["trace_id"] == "trace-0"
+        assert b["trace_id"] == "trace-1"
+        assert "broken" not in a
+        assert "absent" not in a
+    finally:
+        unregister_context_provider("trace_id")
+        unregister_context_provider("broken")
+        unregister_context_provider("absent")
+    assert "trace_id" not in capture_context()
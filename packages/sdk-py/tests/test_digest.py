@@ -0,0 +1,88 @@
+import hashlib
+import json
+
+import pytest
+
+from xase.client import XaseClient
+from xase.digest import DIGEST_KEY, PayloadDigester, payload_digest, verify_digest
+from xase.types import XaseError
+
+from test_client import DummyHttp
+
+
+def _payload():
+    return {
+        "policy": "credit_policy_v4",
+        "input": {
+            "user_id": "u_1",
+            "features": [i / 7 for i in range(5000)],
+            "applicant": {"age": 41, "name": "Zoë"},
+        },
+        "output": {"decision": "APPROVED", "score": 0.87},
+    }
+
+
+def test_digest_matches_plain_canonical_json():
+    value = _payload()["input"]
+    expected = hashlib.sha256(
+        json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    assert payload_digest(value) == f"sha256:{expected}"
+    # Key order does not matter
+    assert payload_digest({"b": 1, "a": [1, 2]}) == payload_digest({"a": [1, 2], "b": 1})
+
+
+def test_digester_keeps_whitelisted_fields_only():
+    digester = PayloadDigester(
+        ["input.user_id", "input.applicant.age", "output.decision", "output.missing"]
+    )
+    digested = digester.apply(_payload())
+    assert digested["input"] == {
+        DIGEST_KEY: payload_digest(_payload()["input"]),
+        "user_id": "u_1",
+        "applicant": {"age": 41},
+    }
+    assert digested["output"] == {
+        DIGEST_KEY: payload_digest(_payload()["output"]),
+        "decision": "APPROVED",
+    }
+    assert len(json.dumps(digested)) < len(json.dumps(_payload())) / 50
+
+
+def test_verify_digest_detects_tampering():
+    digested = PayloadDigester(["output.decision"]).apply(_payload())
+    assert verify_digest(_payload(), digested)
+
+    changed = _payload()
+    changed["input"]["features"][10] = 0.0
+    assert not verify_digest(changed, digested)
+
+    forged = {**digested, "output": {**digested["output"], "decision": "DENIED"}}
+    assert not verify_digest(_payload(), forged)
+
+
+def test_invalid_digest_config():
+    with pytest.raises(XaseError) as exc:
+        PayloadDigester(["features"])
+    assert exc.value.code == "INVALID_CONFIG"
+    with pytest.raises(XaseError) as exc:
+        XaseClient({"api_key": "k", "payload_mode": "hashes"})
+    assert exc.value.code == "INVALID_CONFIG"
+
+
+def test_client_sends_digests_in_digest_mode():
+    client = XaseClient({
+        "api_key": "k",
+        "fire_and_forget": False,
+        "payload_mode": "digest",
+        "digest_fields": ["output.decision"],
+    })
+    http = DummyHttp()
+    client.http_client = http
+
+    client.record(_payload())
+    _, body, _ = http.calls[0]
+    assert body["input"] == {DIGEST_KEY: payload_digest(_payload()["input"])}
+    assert body["output"]["decision"] == "APPROVED"
+    assert verify_digest(_payload(), body)
+    assert client.digester.get_stats()["records"] == 1
@@ -22,6 +22,22 @@ class _Resp:
         return self._json
 
 
+class _FakeClient:
+    def __init__(self, handler):
+        self.handler = handler
+        self.closed = False
+
+    def post(self, url, headers, timeout, json=None, content=None):
+        return self.handler(url, json if content is None else content, headers, timeout)
+
+    def close(self):
+        self.closed = True
+
+
+def _patch_client(monkeypatch, handler):
+    monkeypatch.setattr(httpx, "Client", lambda **kwargs: _FakeClient(handler))
+
+
 def test_post_success(monkeypatch):
     called = {"n": 0}
 
@@ -29,7 +45,7 @@ def test_post_success(monkeypatch):
         called["n"] += 1
         return _Resp(200, {"ok": True})
 
-    monkeypatch.setattr(httpx, "post", fake_post)
+    _patch_client(monkeypatch, fake_post)
 
     client = HttpClient(api_key="k", base_url="https://api", timeout=1.0, max_retries=2)
     res = client.post("/records", {"a": 1})
@@ -46,7 +62,7 @@ def test_post_retry_on_429_with_retry_after(monkeypatch):
             return _Resp(429, {"error": "rate"}, headers={"Retry-After": "0"}, text="{ }")
         return _Resp(200, {"ok": True})
 
-    monkeypatch.setattr(httpx, "post", fake_post)
+    _patch_client(monkeypatch, fake_post)
 
     client = HttpClient(api_key="k", base_url="https://api", timeout=1.0, max_retries=3, base_delay=0.0)
     t0 = time.time()
@@ -64,7 +80,7 @@ def test_post_retry_on_5xx_and_then_fail(monkeypatch):
         calls["n"] += 1
         return _Resp(502, {"error": "bad gw"}, text="{ }")
 
-    monkeypatch.setattr(httpx, "post", fake_post)
+    _patch_client(monkeypatch, fake_post)
 
     client = HttpClient(api_key="k", base_url="https://api", timeout=1.0, max_retries=1, base_delay=0.0)
     with pytest.raises(XaseError) as ei:
@@ -73,6 +89,41 @@ def test_post_retry_on_5xx_and_then_fail(monkeypatch):
     assert calls["n"] >= 2
 
 
+@pytest.mark.parametrize("error", [httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError])
+def test_post_retries_a_pooled_connection_the_server_closed(monkeypatch, error):
+    calls = {"n": 0}
+
+    def fake_post(url, json, headers, timeout):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise error("Server disconnected without sending a response.")
+        return _Resp(200, {"ok": True})
+
+    _patch_client(monkeypatch, fake_post)
+
+    client = HttpClient(
+        api_key="k", base_url="https://api", timeout=1.0, max_retries=2, base_delay=0.0
+    )
+    assert client.post("/records", {"a": 1}) == {"ok": True}
+    assert calls["n"] == 2
+
+
+def test_non_json_5xx_keeps_status_code(monkeypatch):
+    class _HtmlResp(_Resp):
+        def json(self):
+            raise ValueError("Expecting value")
+
+    _patch_client(
+        monkeypatch, lambda url, json, headers, timeout: _HtmlResp(503, text="<html>busy</html>")
+    )
+
+    client = HttpClient(api_key="k", base_url="https://api", timeout=1.0, max_retries=0)
+    with pytest.raises(XaseError) as ei:
+        client.post("/records", {"a": 1})
+    assert ei.value.code == "REQUEST_FAILED"
+    assert ei.value.status_code == 503
+
+
 def test_post_client_error_400_no_retry(monkeypatch):
     calls = {"n": 0}
 
@@ -80,10 +131,98 @@ def test_post_client_error_400_no_retry(monkeypatch):
         calls["n"] += 1
         return _Resp(400, {"error": "bad req", "code": "BAD"}, text="{ }")
 
-    monkeypatch.setattr(httpx, "post", fake_post)
+    _patch_client(monkeypatch, fake_post)
 
     client = HttpClient(api_key="k", base_url="https://api", timeout=1.0, max_retries=3)
     with pytest.raises(XaseError) as ei:
         client.post("/records", {"a": 1})
     assert ei.value.code == "BAD"
     assert calls["n"] == 1
+
+
+def test_client_is_reused_across_requests(monkeypatch):
+    created = []
+
+    def factory(**kwargs):
+        created.append(kwargs)
+        return _FakeClient(lambda url, json, headers, timeout: _Resp(200, {"ok": True}))
+
+    monkeypatch.setattr(httpx, "Client", factory)
+
+    client = HttpClient(api_key="k", base_url="https://api", timeout=1.0, max_retries=0,
+                        max_keepalive_connections=7)
+    for _ in range(5):
+        client.post("/records", {"a": 1})
+    assert len(created) == 1
+    assert created[0]["limits"].max_keepalive_connections == 7
+    stats = client.get_pool_stats()
+    assert stats["requests"] == 5
+    assert stats["clients_created"] == 1
+
+
+def test_client_rebuilt_after_fork(monkeypatch):
+    created = []
+
+    def factory(**kwargs):
+        c = _FakeClient(lambda url, json, headers, timeout: _Resp(200, {"ok": True}))
+        created.append(c)
+        return c
+
+    monkeypatch.setattr(httpx, "Client", factory)
+
+    client = HttpClient(api_key="k", base_url="https://api", timeout=1.0, max_retries=0)
+    client.post("/records", {"a": 1})
+    # Simulate running in a forked child
+    client._reset_in_child()
+    client.post("/records", {"a": 1})
+    assert len(created) == 2
+    # The parent's client must not be closed from the child
+    assert created[0].closed is False
+    client.close()
+    assert created[1].closed is True
+
+
+def test_pool_stats_with_real_client():
+    client = HttpClient(api_key="k", base_url="https://api", timeout=1.0, max_retries=0)
+    stats = client.get_pool_stats()
+    assert stats["connections"] == 0
+    assert stats["http2"] is False
+    client.close()
+
+
+def test_post_compresses_bodies_above_threshold(monkeypatch):
+    import gzip
+    import json as jsonlib
+
+    seen = []
+
+    def fake_post(url, body, headers, timeout):
+        seen.append((body, dict(headers)))
+        return _Resp(200, {"ok": True})
+
+    _patch_client(monkeypatch, fake_post)
+
+    client = HttpClient(
+        api_key="k", base_url="https://api", timeout=1.0, max_retries=0,
+        compression="gzip", compression_threshold=256,
+    )
+    client.post("/records", {"a": 1})
+    client.post("/records", {"blob": "x" * 4096})
+
+    small, large = seen
+    assert "Content-Encoding" not in small[1]
+    assert large[1]["Content-Encoding"] == "gzip"
+    assert jsonlib.loads(gzip.decompress(large[0])) == {"blob": "x" * 4096}
+
+    stats = client.get_compression_stats()
+    assert stats["compressed_requests"] == 1
+    assert stats["ratio"] < 0.1
+    assert stats["time_ms"] >= 0.0
+
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(XaseError) as ei:
+        HttpClient(
+            api_key="k", base_url="https://api", timeout=1.0, max_retries=0, compression="br"
+        )
+    assert ei.value.code == "INVALID_CONFIG"
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+
+from xase.async_queue import AsyncQueue
+from xase.metrics import Histogram, Metrics
+from xase.queue import Queue
+
+
+def _payload(i):
+    return {"policy": "p", "input": {"i": i}, "output": {"y": 1}}
+
+
+class _Http:
+    def post(self, endpoint, body, headers=None, deferrable=False):
+        return {"success": True, "transaction_id": "t"}
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    h = Histogram((1, 2, 5, 10))
+    for v in [0.5] * 50 + [4] * 49 + [8]:
+        h.observe(v)
+    assert h.count == 100
+    assert 0 < h.quantile(0.5) <= 1
+    assert 2 <= h.quantile(0.99) <= 5
+    assert Histogram((1,)).quantile(0.5) is None
+
+
+def test_queue_reports_enqueue_ack_latency_batches_and_drops():
+    metrics = Metrics()
+    release = threading.Event()
+
+    class BlockedHttp(_Http):
+        def post(self, endpoint, body, headers=None, deferrable=False):
+            release.wait(5.0)
+            return super().post(endpoint, body, headers)
+
+    q = Queue(http_client=BlockedHttp(), max_size=2, overflow_policy="drop_newest", metrics=metrics)
+    for i in range(6):
+        q.enqueue(_payload(i))
+    release.set()
+    q.flush(2.0)
+    q.close()
+
+    snap = metrics.snapshot()
+    sent = snap["records_acked_total"]
+    assert snap["records_enqueued_total"] == sent
+    assert snap["records_dropped_total"]["queue_full"] == 6 - sent
+    assert snap["queue_high_water_mark"] == 2
+    assert snap["record_ack_latency_seconds"]["count"] == sent
+    assert snap["record_ack_latency_seconds"]["p99"] is not None
+    assert snap["batch_size"]["count"] == sent
+    assert snap["enqueue_rate_per_s"] > 0
+
+
+def test_async_queue_reports_enqueue_ack_latency_batches_and_drops():
+    metrics = Metrics()
+
+    class _AsyncHttp:
+        async def post(self, endpoint, body, headers=None):
+            await asyncio.sleep(0.01)
+            return {"success": True, "transaction_id": "t"}
+
+    async def main():
+        q = AsyncQueue(
+            http_client=_AsyncHttp(), max_size=2, overflow_policy="drop_newest", metrics=metrics
+        )
+        for i in range(6):
+            await q.enqueue(_payload(i))
+        await q.flush(2.0)
+        await q.close()
+
+    asyncio.run(main())
+
+    snap = metrics.snapshot()
+    assert snap["records_enqueued_total"] == 2
+    assert snap["records_acked_total"] == 2
+    assert snap["records_dropped_total"]["queue_full"] == 4
+    assert snap["queue_high_water_mark"] == 2
+    assert snap["record_ack_latency_seconds"]["count"] == 2
+    assert snap["batch_size"]["count"] == 2
+
+
+def test_prometheus_export_format():
+    metrics = Metrics()
+    metrics.inc("records_dropped_total", reason="shed")
+    metrics.observe("http_request_duration_seconds", 0.02)
+    text = metrics.to_prometheus()
+
+    assert "# TYPE xase_records_dropped_total counter" in text
+    assert 'xase_records_dropped_total{reason="shed"} 1' in text
+    assert 'xase_http_request_duration_seconds_bucket{le="0.025"} 1' in text
+    assert 'xase_http_request_duration_seconds_bucket{le="+Inf"} 1' in text
+    assert "xase_http_request_duration_seconds_count 1" in text
+    assert "xase_queue_high_water_mark 0" in text
+
+
+def test_opentelemetry_bridge_forwards_measurements():
+    import pytest
+
+    pytest.importorskip("opentelemetry.metrics")
+
+    class Instrument:
+        def __init__(self):
+            self.values = []
+
+        def add(self, value, attributes=None):
+            self.values.append((value, attributes))
+
+        def record(self, value, attributes=None):
+            self.values.append((value, attributes))
+
+    class Meter:
+        def __init__(self):
+            self.instruments = {}
+
+        def _make(self, name, **kwargs):
+            return self.instruments.setdefault(name, Instrument())
+
+        create_counter = create_histogram = create_observable_gauge = _make
+
+    meter = Meter()
+    metrics = Metrics()
+    metrics.bind_opentelemetry(meter)
+    metrics.inc("records_dropped_total", reason="shed")
+    metrics.observe("batch_size", 10)
+
+    assert meter.instruments["xase.records_dropped_total"].values == [(1.0, {"reason": "shed"})]
+    assert meter.instruments["xase.batch_size"].values == [(10, None)]
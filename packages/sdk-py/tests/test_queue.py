@@ -0,0 +1,443 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from xase.queue import Queue, QueuedRecord, build_batch_content, encode_record, shed_probability
+from xase.types import XaseError
+
+
+def _decode(body):
+    return json.loads(body) if isinstance(body, bytes) else body
+
+
+class BatchHttp:
+    def __init__(self, fail_index=None, raise_error=None):
+        self.calls = []
+        self.fail_index = fail_index
+        self.raise_error = raise_error
+        self.lock = threading.Lock()
+
+    def post(self, endpoint, body, headers=None, deferrable=False):
+        body = _decode(body)
+        with self.lock:
+            self.calls.append((endpoint, body, headers or {}))
+        if self.raise_error:
+            raise self.raise_error
+        if endpoint == "/records":
+            return {"success": True, "transaction_id": body["input"]["i"]}
+        results = []
+        for i, rec in enumerate(body["records"]):
+            if i == self.fail_index:
+                results.append({"error": "bad record", "code": "BAD", "status": 422})
+            else:
+                results.append({"success": True, "transaction_id": rec["input"]["i"]})
+        return {"results": results}
+
+
+def _payload(i):
+    return {"policy": "p", "input": {"i": i}, "output": {"y": 1}}
+
+
+def _make_queue(http, **kwargs):
+    successes, errors = [], []
+    q = Queue(
+        http_client=http,
+        max_size=1000,
+        on_success=successes.append,
+        on_error=errors.append,
+        **kwargs,
+    )
+    return q, successes, errors
+
+
+def test_batch_drains_up_to_batch_size():
+    http = BatchHttp()
+    q, successes, errors = _make_queue(http, batch_size=10, batch_linger_ms=200)
+    for i in range(25):
+        q.enqueue(_payload(i), f"key_{i:016d}")
+    q.flush(2.0)
+    q.close()
+
+    batch_calls = [c for c in http.calls if c[0] == "/records/batch"]
+    assert batch_calls
+    assert all(len(c[1]["records"]) <= 10 for c in batch_calls)
+    assert (
+        sum(len(c[1]["records"]) for c in batch_calls) + (len(http.calls) - len(batch_calls)) == 25
+    )
+    assert batch_calls[0][1]["records"][0]["idempotencyKey"] == "key_0000000000000000"
+    assert sorted(r["transaction_id"] for r in successes) == list(range(25))
+    assert errors == []
+
+
+def test_batch_per_item_errors_reach_on_error():
+    http = BatchHttp(fail_index=1)
+    q, successes, errors = _make_queue(http, batch_size=3, batch_linger_ms=500)
+    for i in range(3):
+        q.enqueue(_payload(i))
+    q.flush(2.0)
+    stats = q.get_stats()
+    q.close()
+
+    assert len(http.calls) == 1
+    assert stats["workers"][0]["sent"] == 2
+    assert [r["transaction_id"] for r in successes] == [0, 2]
+    assert len(errors) == 1
+    assert errors[0].code == "BAD"
+    assert errors[0].status_code == 422
+
+
+def test_batch_request_failure_reports_every_item():
+    http = BatchHttp(raise_error=XaseError("down", "MAX_RETRIES"))
+    q, successes, errors = _make_queue(http, batch_size=5, batch_linger_ms=500)
+    for i in range(5):
+        q.enqueue(_payload(i))
+    q.flush(2.0)
+    stats = q.get_stats()
+    q.close()
+
+    assert stats["workers"][0]["sent"] == 0
+    assert successes == []
+    assert len(errors) == 5
+    assert all(e.code == "MAX_RETRIES" for e in errors)
+
+
+def test_default_batch_size_sends_single_records():
+    http = BatchHttp()
+    q, successes, errors = _make_queue(http)
+    for i in range(3):
+        q.enqueue(_payload(i))
+    q.flush(2.0)
+    q.close()
+
+    assert [c[0] for c in http.calls] == ["/records"] * 3
+    assert len(successes) == 3
+
+
+class SlowHttp:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.sent = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def post(self, endpoint, body, headers=None, deferrable=False):
+        body = _decode(body)
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+            self.sent.append(body["input"])
+        return {"success": True, "transaction_id": "t"}
+
+
+def test_worker_pool_sends_concurrently():
+    http = SlowHttp()
+    q, successes, _ = _make_queue(http, num_workers=4)
+    for i in range(8):
+        q.enqueue(_payload(i))
+    q.flush(2.0)
+    stats = q.get_stats()
+    q.close()
+
+    assert http.max_active > 1
+    assert len(successes) == 8
+    assert len(stats["workers"]) == 4
+    assert sum(w["sent"] for w in stats["workers"]) == 8
+    assert stats["size"] == 0
+
+
+def test_preserve_order_keeps_transaction_sequence():
+    http = SlowHttp(delay=0.001)
+    q, _, _ = _make_queue(http, num_workers=4, preserve_order=True)
+    for seq in range(20):
+        for tx in ("tx-a", "tx-b", "tx-c"):
+            payload = _payload(seq)
+            payload["transaction_id"] = tx
+            payload["input"] = {"tx": tx, "seq": seq}
+            q.enqueue(payload)
+    q.flush(5.0)
+    q.close()
+
+    for tx in ("tx-a", "tx-b", "tx-c"):
+        seqs = [r["seq"] for r in http.sent if r["tx"] == tx]
+        assert seqs == list(range(20))
+
+
+class BlockedHttp:
+    """Holds the worker inside post() until released, so the queue fills up."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.sent = []
+
+    def post(self, endpoint, body, headers=None, deferrable=False):
+        body = _decode(body)
+        self.started.set()
+        self.release.wait(5.0)
+        self.sent.append(body["input"]["i"])
+        return {"success": True, "transaction_id": "t"}
+
+
+def _filled_queue(policy, **kwargs):
+    http = BlockedHttp()
+    errors = []
+    q = Queue(
+        http_client=http, max_size=2, on_error=errors.append, overflow_policy=policy, **kwargs
+    )
+    q.enqueue(_payload(0))
+    assert http.started.wait(2.0)  # worker holds item 0
+    q.enqueue(_payload(1))
+    q.enqueue(_payload(2))
+    return q, http, errors
+
+
+def _finish(q, http):
+    http.release.set()
+    q.flush(2.0)
+    q.close()
+
+
+def test_overflow_drop_newest():
+    q, http, errors = _filled_queue("drop_newest")
+    q.enqueue(_payload(3))
+    stats = q.get_stats()["overflow"]
+    _finish(q, http)
+    assert stats["dropped_newest"] == 1
+    assert http.sent == [0, 1, 2]
+    assert errors[0].code == "QUEUE_FULL"
+
+
+def test_overflow_drop_oldest():
+    q, http, errors = _filled_queue("drop_oldest")
+    q.enqueue(_payload(3))
+    stats = q.get_stats()["overflow"]
+    _finish(q, http)
+    assert stats["dropped_oldest"] == 1
+    assert http.sent == [0, 2, 3]
+
+
+def test_overflow_block_times_out():
+    q, http, errors = _filled_queue("block", block_timeout_s=0.05)
+    t0 = time.monotonic()
+    q.enqueue(_payload(3))
+    assert time.monotonic() - t0 >= 0.05
+    stats = q.get_stats()["overflow"]
+    _finish(q, http)
+    assert stats["blocked"] == 1
+    assert stats["block_timeouts"] == 1
+    assert http.sent == [0, 1, 2]
+
+
+def test_overflow_block_waits_for_space():
+    q, http, errors = _filled_queue("block", block_timeout_s=2.0)
+    threading.Timer(0.05, http.release.set).start()
+    q.enqueue(_payload(3))
+    _finish(q, http)
+    assert http.sent == [0, 1, 2, 3]
+    assert errors == []
+
+
+def test_overflow_shed_keeps_high_priority_records():
+    q, http, errors = _filled_queue(
+        "shed",
+        shed_threshold=0.5,
+        priority_fn=lambda p: 1.0 if p["output"].get("decision") == "DENIED" else 0.0,
+    )
+    for i in range(3, 20):
+        q.enqueue(_payload(i))
+    denial = {"policy": "p", "input": {"i": 99}, "output": {"decision": "DENIED"}}
+    q.enqueue(denial)
+    stats = q.get_stats()["overflow"]
+    _finish(q, http)
+    assert stats["shed"] == 17
+    assert 99 in http.sent
+    assert all(e.code == "QUEUE_SHED" for e in errors[:17])
+
+
+def test_shed_probability_scales_with_load_and_priority():
+    assert shed_probability(0.5, 0.0, 0.8) == 0.0
+    assert shed_probability(1.0, 0.0, 0.8) == 1.0
+    assert shed_probability(1.0, 1.0, 0.8) == 0.0
+    assert 0.0 < shed_probability(0.9, 0.5, 0.8) < shed_probability(0.9, 0.0, 0.8)
+
+
+def test_spill_policy_requires_spool():
+    with pytest.raises(XaseError):
+        Queue(http_client=BatchHttp(), max_size=10, overflow_policy="spill")
+
+
+def test_queue_is_bounded_by_bytes():
+    http = BlockedHttp()
+    big = {"policy": "p", "input": {"i": 1, "blob": "x" * 100}, "output": {"y": 1}}
+    size = encode_record(big).size
+    q = Queue(
+        http_client=http, max_size=1000, max_bytes=2 * size + 10, overflow_policy="drop_newest"
+    )
+    q.enqueue(_payload(0))
+    assert http.started.wait(2.0)
+    for _ in range(10):
+        q.enqueue(big)
+    stats = q.get_stats()
+    _finish(q, http)
+
+    assert stats["size"] == 2
+    assert stats["bytes"] == 2 * size
+    assert stats["overflow"]["dropped_newest"] == 8
+
+
+def test_records_are_serialized_at_enqueue_and_spliced_into_batches():
+    record = encode_record(_payload(1), "key_0000000000000001")
+    assert isinstance(record, QueuedRecord)
+    assert json.loads(record.body)["policyId"] == "p"
+    assert QueuedRecord.from_bytes(record.to_bytes()).idempotency_key == "key_0000000000000001"
+
+    body = json.loads(build_batch_content([record, encode_record(_payload(2))]))
+    assert body["records"][0]["idempotencyKey"] == "key_0000000000000001"
+    assert "idempotencyKey" not in body["records"][1]
+    assert body["records"][1]["input"] == {"i": 2}
+
+
+def test_batches_splice_keys_into_bodies_of_custom_serializers():
+    def pretty(obj):
+        return (json.dumps(obj, indent=2) + "\n").encode()
+
+    records = [encode_record(_payload(i), f"key_000000000000000{i}", pretty) for i in range(2)]
+    body = json.loads(build_batch_content(records))
+    keys = [record["idempotencyKey"] for record in body["records"]]
+    assert keys == ["key_0000000000000000", "key_0000000000000001"]
+
+    with pytest.raises(XaseError) as ei:
+        encode_record(_payload(1), serializer=lambda obj: b"[]")
+    assert ei.value.code == "INVALID_PAYLOAD"
+
+
+def test_unserializable_payload_is_rejected_at_enqueue():
+    q = Queue(http_client=BatchHttp(), max_size=10)
+    with pytest.raises(XaseError) as ei:
+        q.enqueue({"policy": "p", "input": {"x": object()}, "output": {"y": 1}})
+    q.close()
+    assert ei.value.code == "INVALID_PAYLOAD"
+
+
+def test_slow_callbacks_do_not_throttle_senders():
+    http = BatchHttp()
+    release = threading.Event()
+    successes = []
+
+    def slow_success(result):
+        release.wait(5.0)
+        successes.append(result)
+
+    q = Queue(http_client=http, max_size=100, on_success=slow_success)
+    for i in range(20):
+        q.enqueue(_payload(i))
+    deadline = time.monotonic() + 2.0
+    while len(http.calls) < 20 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(http.calls) == 20  # all sent while the first callback is still blocked
+
+    stats = q.get_stats()["callbacks"]
+    assert stats["pending"] >= 18
+    release.set()
+    q.flush(2.0)
+    q.close()
+    assert len(successes) == 20
+
+
+def test_callbacks_can_be_batched_and_are_bounded():
+    http = BatchHttp()
+    release = threading.Event()
+    batches = []
+
+    def on_success(results):
+        release.wait(5.0)
+        batches.append(results)
+
+    q = Queue(http_client=http, max_size=100, on_success=on_success,
+              callback_queue_size=5, callback_batch_size=4)
+    for i in range(12):
+        q.enqueue(_payload(i))
+    deadline = time.monotonic() + 2.0
+    while len(http.calls) < 12 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    q.flush(2.0)
+    stats = q.get_stats()["callbacks"]
+    q.close()
+
+    assert all(isinstance(b, list) and len(b) <= 4 for b in batches)
+    delivered = sum(len(b) for b in batches)
+    assert stats["dropped"] == 12 - delivered
+    assert stats["dropped"] > 0
+
+
+def test_flush_returns_as_soon_as_records_are_acked():
+    http = BatchHttp()
+    q, successes, _ = _make_queue(http)
+    q.enqueue(_payload(1))
+    start = time.monotonic()
+    q.flush(2.0)
+    assert time.monotonic() - start < 0.04  # no 50ms polling interval
+    assert len(successes) == 1
+
+    # An idle worker wakes up immediately for the next record
+    start = time.monotonic()
+    q.enqueue(_payload(2))
+    q.flush(2.0)
+    assert time.monotonic() - start < 0.04
+    start = time.monotonic()
+    q.close()
+    assert time.monotonic() - start < 0.05
+
+
+def test_close_drains_then_drops_what_misses_the_deadline():
+    release = threading.Event()
+
+    class SlowHttp(BatchHttp):
+        def post(self, endpoint, body, headers=None, deferrable=False):
+            release.wait(1.0)
+            return super().post(endpoint, body, headers)
+
+    http = SlowHttp()
+    q, successes, errors = _make_queue(http, callback_queue_size=0)
+    for i in range(3):
+        q.enqueue(_payload(i))
+    start = time.monotonic()
+    q.close(timeout_s=0.1)
+    assert time.monotonic() - start < 0.5
+    # One record was in flight; the two still queued were dropped and reported
+    assert [e.code for e in errors] == ["QUEUE_CLOSED", "QUEUE_CLOSED"]
+    with pytest.raises(XaseError):
+        q.enqueue(_payload(9))
+    release.set()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_forked_child_gets_its_own_workers():
+    http = BatchHttp()
+    q, _, _ = _make_queue(http)
+    q.enqueue(_payload(0))
+    q.flush(2.0)
+
+    pid = os.fork()
+    if pid == 0:  # child
+        ok = False
+        try:
+            q.enqueue(_payload(1))
+            q.flush(2.0)
+            ok = [c[1]["input"]["i"] for c in http.calls] == [0, 1] and all(
+                t.is_alive() for t in q._worker_threads
+            )
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert [c[1]["input"]["i"] for c in http.calls] == [0]
+    q.close()
@@ -0,0 +1,106 @@
+import pytest
+
+from xase import sampling
+from xase.client import XaseClient
+from xase.sampling import RecordGate, TokenBucket
+from xase.types import XaseError
+
+
+def _payload(policy, decision="APPROVED"):
+    return {"policy": policy, "input": {"a": 1}, "output": {"decision": decision}}
+
+
+def test_unlisted_policies_are_always_recorded():
+    gate = RecordGate({"low_risk": {"sample_rate": 0.0}})
+    assert all(gate.admit(_payload("critical")) for _ in range(100))
+    assert not any(gate.admit(_payload("low_risk")) for _ in range(100))
+    assert gate.get_stats()["low_risk"]["sampled_out"] == 100
+
+
+def test_sample_rate_keeps_representative_fraction(monkeypatch):
+    values = iter([0.05, 0.5, 0.09, 0.95])
+    monkeypatch.setattr(sampling.random, "random", lambda: next(values))
+    gate = RecordGate({"*": {"sample_rate": 0.1}})
+    assert [gate.admit(_payload("p")) for _ in range(4)] == [True, False, True, False]
+
+
+def test_always_record_predicate_bypasses_sampling_and_limits():
+    gate = RecordGate({
+        "fraud": {
+            "sample_rate": 0.0,
+            "always_record": lambda output: output["decision"] == "DENIED",
+        },
+    })
+    assert gate.admit(_payload("fraud", "DENIED"))
+    assert not gate.admit(_payload("fraud"))
+    stats = gate.get_stats()["fraud"]
+    assert stats["always_recorded"] == 1
+    assert stats["sampled_out"] == 1
+
+
+def test_token_bucket_throttles_and_refills(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(sampling.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2.0, burst=2.0)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    now[0] += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(XaseError) as ei:
+        RecordGate({"p": {"sample_rate": 1.5}})
+    assert ei.value.code == "INVALID_CONFIG"
+    with pytest.raises(XaseError):
+        RecordGate({"p": {"rate_limit": 0}})
+
+
+def test_client_drops_throttled_records_before_sending():
+    class Http:
+        calls = 0
+
+        def post(self, endpoint, body, headers=None, deferrable=False):
+            Http.calls += 1
+            return {"success": True}
+
+    client = XaseClient({
+        "api_key": "k",
+        "fire_and_forget": False,
+        "policy_rules": {"bulk": {"rate_limit": 1, "burst": 2}},
+    })
+    client.http_client = Http()
+    results = [client.record(_payload("bulk")) for _ in range(5)]
+    assert results.count(None) == 3
+    assert Http.calls == 2
+    assert client.gate.get_stats()["bulk"]["throttled"] == 3
+
+
+def test_duplicates_do_not_spend_rate_limit_tokens():
+    class Http:
+        calls = 0
+
+        def post(self, endpoint, body, headers=None, deferrable=False):
+            Http.calls += 1
+            return {"success": True}
+
+    client = XaseClient({
+        "api_key": "k",
+        "fire_and_forget": False,
+        "dedup_window_s": 60,
+        "policy_rules": {"bulk": {"rate_limit": 0.001, "burst": 2}},
+    })
+    client.http_client = Http()
+    first, second = _payload("bulk"), {**_payload("bulk"), "input": {"a": 2}}
+    for _ in range(3):
+        client.record(first)
+    assert client.record(second) is not None
+    assert Http.calls == 2
+    assert client.gate.get_stats()["bulk"]["throttled"] == 0
+    assert client.dedup.get_stats()["suppressed"] == 2
+
+    # A throttled record is forgotten, so its retry is throttled again rather than suppressed
+    third = {**_payload("bulk"), "input": {"a": 3}}
+    assert client.record(third) is None and client.record(third) is None
+    assert client.gate.get_stats()["bulk"]["throttled"] == 2
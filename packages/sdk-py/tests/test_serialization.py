@@ -0,0 +1,111 @@
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import uuid
+
+import pytest
+
+from xase.queue import encode_record
+from xase.serialization import resolve_serializer
+from xase.types import XaseError
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+def _rich_payload():
+    return {
+        "when": datetime.datetime(2024, 1, 2, 3, 4, 5),
+        "day": datetime.date(2024, 1, 2),
+        "amount": decimal.Decimal("10.25"),
+        "id": uuid.UUID(int=1),
+        "color": Color.RED,
+        "tags": {"a"},
+        "point": Point(1, 2),
+    }
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson", "msgspec"])
+def test_backends_encode_common_types(backend):
+    try:
+        dumps = resolve_serializer(backend)
+    except XaseError as e:
+        assert e.code == "MISSING_DEPENDENCY"
+        pytest.skip(f"{backend} not installed")
+
+    out = dumps(_rich_payload())
+    assert isinstance(out, bytes)
+    assert json.loads(out) == {
+        "when": "2024-01-02T03:04:05",
+        "day": "2024-01-02",
+        "amount": "10.25",
+        "id": "00000000-0000-0000-0000-000000000001",
+        "color": "red",
+        "tags": ["a"],
+        "point": {"x": 1, "y": 2},
+    }
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_numpy_values_are_encoded(backend):
+    np = pytest.importorskip("numpy")
+    try:
+        dumps = resolve_serializer(backend)
+    except XaseError:
+        pytest.skip(f"{backend} not installed")
+
+    out = dumps({"score": np.float32(0.5), "n": np.int64(3), "v": np.arange(3)})
+    assert json.loads(out) == {"score": 0.5, "n": 3, "v": [0, 1, 2]}
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson", "msgspec"])
+def test_non_finite_floats_are_encoded_as_null(backend):
+    try:
+        dumps = resolve_serializer(backend)
+    except XaseError:
+        pytest.skip(f"{backend} not installed")
+
+    values = {"nan": float("nan"), "inf": [float("inf"), 1.5], "ninf": (float("-inf"),)}
+    out = dumps({**values, "point": Point(float("nan"), 2)})
+    assert json.loads(out, parse_constant=pytest.fail) == {
+        "nan": None,
+        "inf": [None, 1.5],
+        "ninf": [None],
+        "point": {"x": None, "y": 2},
+    }
+
+    np = pytest.importorskip("numpy")
+    out = dumps({"score": np.float64("nan"), "v": np.array([np.inf, 1.0])})
+    assert json.loads(out, parse_constant=pytest.fail) == {"score": None, "v": [None, 1.0]}
+
+
+def test_resolve_serializer_accepts_callable_and_rejects_unknown():
+    def custom(obj):
+        return b"{}"
+
+    assert resolve_serializer(custom) is custom
+    assert resolve_serializer("auto")({"a": 1}) == b'{"a":1}'
+    with pytest.raises(XaseError) as ei:
+        resolve_serializer("yaml")
+    assert ei.value.code == "INVALID_CONFIG"
+
+
+def test_encode_record_uses_configured_serializer():
+    payload = {
+        "policy": "p",
+        "input": {"at": datetime.date(2024, 1, 2)},
+        "output": {"y": decimal.Decimal("1.5")},
+    }
+    record = encode_record(payload, serializer=resolve_serializer("json"))
+    body = json.loads(record.body)
+    assert body["input"] == {"at": "2024-01-02"}
+    assert body["output"] == {"y": "1.5"}
@@ -0,0 +1,362 @@
+import socket
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from xase.sidecar import (
+    SidecarClient,
+    V2_HEADER,
+    V2_STATUS_OK,
+    encode_v2_frame,
+)
+from xase.types import XaseError
+
+from stand_in_sidecar import recv_exact
+
+
+def test_v2_matches_out_of_order_responses(sidecar):
+    server = sidecar({"slow": b"S" * 1000, "fast": b"F"}, delays={"slow": 0.3})
+    client = SidecarClient(server.server_address, protocol="v2", timeout=5.0)
+    finished = []
+
+    def fetch(segment_id):
+        finished.append((segment_id, client.get_segment(segment_id)))
+
+    slow = threading.Thread(target=fetch, args=("slow",))
+    slow.start()
+    time.sleep(0.05)
+    fetch("fast")
+    slow.join()
+    client.close()
+
+    assert finished == [("fast", b"F"), ("slow", b"S" * 1000)]
+    assert server.connections == 1
+
+
+def test_v2_throughput_scales_with_sidecar_concurrency(sidecar):
+    segments = {f"seg_{i:03d}": bytes([i]) * 100 for i in range(16)}
+    server = sidecar(segments, default_delay=0.1)
+    client = SidecarClient(server.server_address, protocol="v2", timeout=5.0)
+    results = {}
+
+    def fetch(segment_id):
+        results[segment_id] = client.get_segment(segment_id)
+
+    threads = [threading.Thread(target=fetch, args=(segment_id,)) for segment_id in segments]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    client.close()
+
+    assert results == segments
+    # Lock-step would need 16 round trips of 100 ms
+    assert elapsed < 0.8
+    assert server.connections == 1
+    assert server.max_active > 1
+
+
+def test_v2_max_in_flight_bounds_outstanding_requests(sidecar):
+    segments = {f"seg_{i}": b"x" for i in range(8)}
+    server = sidecar(segments, default_delay=0.05)
+    client = SidecarClient(server.server_address, protocol="v2", max_in_flight=2, timeout=5.0)
+
+    threads = [
+        threading.Thread(target=client.get_segment, args=(segment_id,)) for segment_id in segments
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client.close()
+
+    assert server.max_active <= 2
+
+
+def test_v2_error_status_raises_without_dropping_connection(sidecar):
+    server = sidecar({"seg_1": b"A"})
+    client = SidecarClient(server.server_address, protocol="v2", timeout=5.0)
+
+    with pytest.raises(XaseError) as exc_info:
+        client.get_segment("missing")
+    assert exc_info.value.code == "SIDECAR_ERROR"
+    assert "unknown segment missing" in str(exc_info.value)
+
+    assert client.get_segment("seg_1") == b"A"
+    client.close()
+    assert server.connections == 1
+
+
+def test_v2_reconnects_after_connection_loss(sidecar):
+    server = sidecar({"seg_1": b"A"})
+    server.drop_once.add("seg_1")
+    client = SidecarClient(server.server_address, protocol="v2", timeout=5.0, backoff_base=0.01)
+
+    assert client.get_segment("seg_1") == b"A"
+    client.close()
+    assert server.connections == 2
+
+
+def test_v1_remains_default_lock_step(sidecar):
+    server = sidecar({"seg_1": b"A", "seg_2": b"BB"})
+    with SidecarClient(server.server_address) as client:
+        assert client.protocol == "v1"
+        assert client.get_segment("seg_1") == b"A"
+        assert client.get_segment("seg_2") == b"BB"
+
+
+def test_get_segments_completion_and_request_order(sidecar):
+    segments = {f"seg_{i}": bytes([i]) for i in range(4)}
+    server = sidecar(segments, delays={"seg_0": 0.2})
+    client = SidecarClient(server.server_address, protocol="v2", timeout=5.0)
+
+    completed = list(client.get_segments(segments))
+    assert completed[-1] == ("seg_0", b"\x00")
+    assert dict(completed) == segments
+
+    assert list(client.get_segments(iter(segments), ordered=True)) == list(segments.items())
+    client.close()
+
+
+def test_get_segments_reports_per_item_errors(sidecar):
+    server = sidecar({"seg_1": b"A", "seg_3": b"C"})
+    client = SidecarClient(server.server_address, protocol="v2", timeout=5.0)
+
+    results = list(client.get_segments(["seg_1", "missing", "seg_3"], ordered=True))
+    client.close()
+
+    assert [segment_id for segment_id, _ in results] == ["seg_1", "missing", "seg_3"]
+    assert results[0][1] == b"A" and results[2][1] == b"C"
+    assert isinstance(results[1][1], XaseError)
+    assert results[1][1].code == "SIDECAR_ERROR"
+
+
+def test_get_segments_retries_only_failed_ids(sidecar):
+    segments = {f"seg_{i}": bytes([i]) for i in range(4)}
+    server = sidecar(segments)
+    server.drop_once.add("seg_2")
+    client = SidecarClient(server.server_address, protocol="v2", timeout=5.0, backoff_base=0.01)
+
+    results = dict(client.get_segments(segments, max_in_flight=1))
+    client.close()
+
+    assert results == segments
+    assert server.requests == Counter({"seg_0": 1, "seg_1": 1, "seg_2": 2, "seg_3": 1})
+
+
+def test_get_segments_bounded_by_max_in_flight(sidecar):
+    segments = {f"seg_{i}": b"x" for i in range(12)}
+    server = sidecar(segments, default_delay=0.03)
+    client = SidecarClient(server.server_address, protocol="v2", timeout=5.0)
+
+    assert len(list(client.get_segments(segments, max_in_flight=3))) == 12
+    client.close()
+    assert 1 < server.max_active <= 3
+
+
+def test_get_segments_abandoned_iterator_releases_requests(sidecar):
+    segments = {f"seg_{i}": b"x" for i in range(8)}
+    server = sidecar(segments, default_delay=0.05)
+    client = SidecarClient(server.server_address, protocol="v2", timeout=5.0)
+
+    results = client.get_segments(segments, max_in_flight=4)
+    next(results)
+    results.close()
+
+    assert client._pipeline.in_flight == 0
+    assert client.get_segment("seg_7") == b"x"
+    client.close()
+
+
+def test_get_segments_v1_yields_errors_in_order(tmp_path):
+    client = SidecarClient(str(tmp_path / "missing.sock"), max_retries=1)
+
+    results = list(client.get_segments(["seg_1", "seg_2"]))
+
+    assert [segment_id for segment_id, _ in results] == ["seg_1", "seg_2"]
+    assert all(isinstance(error, ConnectionError) for _, error in results)
+
+
+def test_unknown_protocol_rejected():
+    with pytest.raises(XaseError) as exc_info:
+        SidecarClient("/tmp/none.sock", protocol="v3")
+    assert exc_info.value.code == "INVALID_CONFIG"
+
+
+@pytest.mark.parametrize("protocol", ["v1", "v2"])
+def test_get_segment_fills_caller_buffer(sidecar, protocol):
+    server = sidecar({"seg_1": b"ABCD"})
+    client = SidecarClient(server.server_address, protocol=protocol, timeout=5.0)
+    buffer = bytearray(16)
+
+    data = client.get_segment("seg_1", out=buffer)
+    assert isinstance(client.get_segment("seg_1"), bytearray)
+    client.close()
+
+    assert isinstance(data, memoryview)
+    assert data == b"ABCD"
+    assert buffer[:4] == b"ABCD"
+
+
+@pytest.mark.parametrize("protocol", ["v1", "v2"])
+def test_get_segment_into_numpy_array(sidecar, protocol):
+    np = pytest.importorskip("numpy")
+    payload = np.arange(256, dtype=np.float32)
+    server = sidecar({"seg_1": payload.tobytes()})
+    client = SidecarClient(server.server_address, protocol=protocol, timeout=5.0)
+    array = np.zeros(256, dtype=np.float32)
+
+    client.get_segment("seg_1", out=array)
+    client.close()
+
+    assert (array == payload).all()
+
+
+@pytest.mark.parametrize("protocol", ["v1", "v2"])
+def test_get_segment_buffer_too_small_keeps_connection(sidecar, protocol):
+    server = sidecar({"big": b"x" * 100, "small": b"ok"})
+    client = SidecarClient(server.server_address, protocol=protocol, timeout=5.0)
+
+    with pytest.raises(XaseError) as exc_info:
+        client.get_segment("big", out=bytearray(10))
+    assert exc_info.value.code == "BUFFER_TOO_SMALL"
+
+    assert client.get_segment("small", out=bytearray(10)) == b"ok"
+    client.close()
+    assert server.connections == 1
+
+
+def test_get_segment_rejects_read_only_buffer():
+    client = SidecarClient("/tmp/none.sock")
+    with pytest.raises(XaseError) as exc_info:
+        client.get_segment("seg_1", out=b"immutable")
+    assert exc_info.value.code == "INVALID_BUFFER"
+
+
+def test_timed_out_request_does_not_write_late_reply_into_buffer(tmp_path):
+    path = str(tmp_path / "stall.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+
+    def serve():
+        conn, _ = listener.accept()
+        with conn:
+            header = recv_exact(conn, V2_HEADER.size)
+            _, _, _, request_id, length = V2_HEADER.unpack(header)
+            recv_exact(conn, length)
+            frame = encode_v2_frame(V2_STATUS_OK, request_id, b"L" * 64)
+            conn.sendall(frame[:V2_HEADER.size + 32])
+            time.sleep(0.5)  # the client gives up mid-reply
+            conn.sendall(frame[V2_HEADER.size + 32:])
+            header = recv_exact(conn, V2_HEADER.size)
+            _, _, _, request_id, length = V2_HEADER.unpack(header)
+            recv_exact(conn, length)
+            conn.sendall(encode_v2_frame(V2_STATUS_OK, request_id, b"ok"))
+            recv_exact(conn, 1)
+
+    server = threading.Thread(target=serve, daemon=True)
+    server.start()
+    client = SidecarClient(path, protocol="v2", timeout=0.2, max_retries=1)
+    buffer = bytearray(64)
+
+    start = time.monotonic()
+    with pytest.raises(ConnectionError):
+        client.get_segment("seg_1", out=buffer)
+    # Giving up does not wait on the reader, which is stuck mid-reply
+    assert time.monotonic() - start < 0.3
+    snapshot = bytes(buffer)
+    time.sleep(0.6)
+
+    assert bytes(buffer) == snapshot
+    assert buffer[32:] == bytes(32)
+    client.timeout = 5.0
+    assert client.get_segment("seg_2") == b"ok"
+    client.close()
+    server.join(timeout=2.0)
+    listener.close()
+
+
+def test_timed_out_request_keeps_its_slot_until_the_late_reply(tmp_path):
+    path = str(tmp_path / "late.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+    events = []
+
+    def serve():
+        conn, _ = listener.accept()
+        with conn:
+            header = recv_exact(conn, V2_HEADER.size)
+            _, _, _, first_id, length = V2_HEADER.unpack(header)
+            recv_exact(conn, length)
+            conn.settimeout(0.5)
+            try:
+                # The client gave up on the first request but must not send a second yet
+                recv_exact(conn, 1)
+                events.append("early request")
+                return
+            except socket.timeout:
+                pass
+            conn.settimeout(None)
+            conn.sendall(encode_v2_frame(V2_STATUS_OK, first_id, b"late"))
+            header = recv_exact(conn, V2_HEADER.size)
+            _, _, _, second_id, length = V2_HEADER.unpack(header)
+            recv_exact(conn, length)
+            events.append(second_id != first_id)
+            conn.sendall(encode_v2_frame(V2_STATUS_OK, second_id, b"ok"))
+            recv_exact(conn, 1)
+
+    server = threading.Thread(target=serve, daemon=True)
+    server.start()
+    client = SidecarClient(path, protocol="v2", timeout=0.2, max_retries=1, max_in_flight=1)
+
+    with pytest.raises(ConnectionError):
+        client.get_segment("seg_1")
+    client.timeout = 5.0
+    assert client.get_segment("seg_2") == b"ok"
+    client.close()
+    server.join(timeout=2.0)
+    listener.close()
+
+    assert events == [True]
+
+
+def test_connection_is_reset_when_forgotten_requests_hold_every_slot(tmp_path):
+    path = str(tmp_path / "mute.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(2)
+    connections = []
+
+    def serve():
+        conn, _ = listener.accept()
+        connections.append(conn)
+        recv_exact(conn, 1)  # never answered
+        conn, _ = listener.accept()
+        connections.append(conn)
+        header = recv_exact(conn, V2_HEADER.size)
+        _, _, _, request_id, length = V2_HEADER.unpack(header)
+        recv_exact(conn, length)
+        conn.sendall(encode_v2_frame(V2_STATUS_OK, request_id, b"ok"))
+
+    server = threading.Thread(target=serve, daemon=True)
+    server.start()
+    client = SidecarClient(path, protocol="v2", timeout=0.2, max_retries=2, max_in_flight=1)
+    client.backoff_base = 0.01
+
+    with pytest.raises(ConnectionError):
+        client.get_segment("seg_1")
+    # The slot is still held by the unanswered request: the next call reconnects
+    assert client.get_segment("seg_2") == b"ok"
+    client.close()
+    server.join(timeout=2.0)
+    for conn in connections:
+        conn.close()
+    listener.close()
+
+    assert len(connections) == 2
@@ -0,0 +1,149 @@
+import pickle
+import threading
+import time
+
+import pytest
+
+from xase.sidecar import SidecarClient
+from xase.types import XaseError
+
+
+def _client(server, **kwargs):
+    return SidecarClient(
+        server.server_address, protocol="v2", transport="shm", timeout=5.0, **kwargs
+    )
+
+
+def test_acquire_segment_returns_read_only_view_of_ring(sidecar):
+    server = sidecar({"seg_1": b"hello shared memory"}, shm=True)
+    client = _client(server)
+
+    segment = client.acquire_segment("seg_1")
+    assert isinstance(segment.data, memoryview)
+    assert segment.data.readonly
+    assert segment.data == b"hello shared memory"
+    assert server.free_slots == 3
+
+    segment.release()
+    segment.release()
+    client.close()
+
+    deadline = time.monotonic() + 2.0
+    while not server.released and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert server.released == [segment.slot]
+    with pytest.raises(ValueError):
+        bytes(segment.data)
+
+
+def test_slots_are_reused_only_after_release(sidecar):
+    server = sidecar({f"seg_{i}": bytes([i]) * 10 for i in range(3)}, shm=True, slots=2)
+    client = _client(server)
+
+    first = client.acquire_segment("seg_0")
+    second = client.acquire_segment("seg_1")
+    waiting = {}
+    fetch = threading.Thread(target=lambda: waiting.update(third=client.acquire_segment("seg_2")))
+    fetch.start()
+    fetch.join(timeout=0.2)
+    assert fetch.is_alive()  # ring full until a slot is released
+    assert first.data == bytes([0]) * 10
+
+    with first:
+        pass
+    fetch.join(timeout=5.0)
+    third = waiting["third"]
+    assert third.slot == first.slot
+    assert third.data == bytes([2]) * 10
+    assert second.data == bytes([1]) * 10
+
+    second.release()
+    third.release()
+    client.close()
+
+
+def test_get_segment_and_get_segments_copy_and_release(sidecar):
+    segments = {f"seg_{i}": bytes([i]) * 100 for i in range(6)}
+    server = sidecar(segments, shm=True, slots=2)
+    client = _client(server)
+
+    assert client.get_segment("seg_1") == segments["seg_1"]
+    buffer = bytearray(200)
+    assert client.get_segment("seg_2", out=buffer) == segments["seg_2"]
+    assert dict(client.get_segments(segments, ordered=True)) == segments
+    client.close()
+
+    # Releases carry no reply; give the stand-in a moment to process them
+    deadline = time.monotonic() + 2.0
+    while server.free_slots < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert server.free_slots == 2
+
+
+def _wait_free(server, expected):
+    deadline = time.monotonic() + 2.0
+    while server.free_slots < expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return server.free_slots
+
+
+def test_get_segments_closed_early_releases_every_slot(sidecar):
+    segments = {f"seg_{i}": bytes([i]) * 10 for i in range(4)}
+    server = sidecar(segments, shm=True, slots=4)
+    client = _client(server)
+
+    results = client.get_segments(segments, max_in_flight=4)
+    next(results)
+    results.close()
+
+    assert _wait_free(server, 4) == 4
+    client.close()
+
+
+def test_timed_out_acquire_releases_late_slot(sidecar):
+    server = sidecar({"seg_1": b"x"}, shm=True, slots=1)
+    client = _client(server)
+    held = client.acquire_segment("seg_1")
+
+    client.timeout = 0.1
+    client.max_retries = 1
+    with pytest.raises(ConnectionError):
+        client.acquire_segment("seg_1")  # waits for the only slot, then gives up
+
+    held.release()
+    assert _wait_free(server, 1) == 1
+    client.close()
+
+
+def test_release_keeps_slot_while_data_is_exported(sidecar):
+    server = sidecar({"seg_1": b"exported"}, shm=True)
+    client = _client(server)
+    segment = client.acquire_segment("seg_1")
+
+    export = pickle.PickleBuffer(segment.data)
+    with pytest.raises(BufferError):
+        segment.release()
+    assert not segment.released
+    assert server.free_slots == 3
+
+    export.release()
+    segment.release()
+    assert segment.released
+    assert _wait_free(server, 4) == 4
+    client.close()
+
+
+def test_sidecar_error_and_config_validation(sidecar):
+    server = sidecar({"seg_1": b"x"}, shm=True)
+    client = _client(server)
+    with pytest.raises(XaseError) as exc_info:
+        client.acquire_segment("missing")
+    assert exc_info.value.code == "SIDECAR_ERROR"
+    client.close()
+
+    with pytest.raises(XaseError) as exc_info:
+        SidecarClient("/tmp/none.sock", transport="shm")
+    assert exc_info.value.code == "INVALID_CONFIG"
+    with pytest.raises(XaseError) as exc_info:
+        SidecarClient("/tmp/none.sock", protocol="v2").acquire_segment("seg_1")
+    assert exc_info.value.code == "INVALID_CONFIG"
@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+
+from xase import spool as spool_module
+from xase.queue import Queue
+from xase.spool import Spool
+from xase.types import XaseError
+
+
+def _decode(body):
+    return json.loads(body) if isinstance(body, bytes) else body
+
+
+def _payload(i):
+    return {"policy": "p", "input": {"i": i}, "output": {"y": 1}}
+
+
+def _item(i):
+    return json.dumps({"i": i}).encode()
+
+
+def test_spool_append_claim_read_release(tmp_path):
+    spool = Spool(str(tmp_path), max_bytes=1024 * 1024, segment_max_bytes=200)
+    for i in range(10):
+        assert spool.append(_item(i))
+    assert spool.has_pending()
+
+    seen = []
+    while True:
+        segment = spool.claim()
+        if segment is None:
+            break
+        items = spool.read(segment)
+        seen.extend(json.loads(item)["i"] for item in items)
+        spool.release(segment, replayed=len(items))
+
+    assert seen == list(range(10))
+    assert not spool.has_pending()
+    assert spool.get_stats()["bytes"] == 0
+    assert spool.get_stats()["replayed"] == 10
+
+
+def test_unclaim_drops_records_already_replayed(tmp_path):
+    spool = Spool(str(tmp_path))
+    for i in range(3):
+        spool.append(_item(i))
+    segment = spool.claim()
+    before = spool.get_stats()["bytes"]
+
+    spool.unclaim(segment, replayed=2)
+    assert spool.get_stats()["bytes"] < before
+    assert spool.get_stats()["replayed"] == 2
+
+    segment = spool.claim()
+    assert [json.loads(item)["i"] for item in spool.read(segment)] == [2]
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(segment)]
+
+
+def _crash_before_rewrite_rename(tmp_path, monkeypatch):
+    """Leave a claimed segment of items 0-2 and the rewrite of its last item behind."""
+    spool = Spool(str(tmp_path))
+    for i in range(3):
+        spool.append(_item(i))
+    segment = spool.claim()
+    real_replace = os.replace
+
+    def crash(src, dst):
+        if src.endswith(".tmp"):
+            raise OSError("crashed")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(spool_module.os, "replace", crash)
+    spool.unclaim(segment, replayed=2)
+    monkeypatch.setattr(spool_module.os, "replace", real_replace)
+    assert os.path.exists(segment + ".tmp")
+    return segment
+
+
+def _replay_all(spool):
+    items = []
+    while True:
+        segment = spool.claim()
+        if segment is None:
+            return items
+        items += [json.loads(item)["i"] for item in spool.read(segment)]
+        spool.release(segment)
+
+
+def test_recovery_finishes_a_complete_segment_rewrite(tmp_path, monkeypatch):
+    _crash_before_rewrite_rename(tmp_path, monkeypatch)
+
+    restarted = Spool(str(tmp_path))
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+    assert _replay_all(restarted) == [2]
+
+
+def test_recovery_deletes_a_torn_segment_rewrite(tmp_path, monkeypatch):
+    segment = _crash_before_rewrite_rename(tmp_path, monkeypatch)
+    with open(segment + ".tmp", "r+b") as f:
+        f.truncate(5)
+
+    restarted = Spool(str(tmp_path))
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+    assert restarted.get_stats()["bytes"] == sum(
+        os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)
+    )
+    assert _replay_all(restarted) == [0, 1, 2]
+
+
+def test_spool_is_bounded(tmp_path):
+    spool = Spool(str(tmp_path), max_bytes=100, segment_max_bytes=100)
+    accepted = sum(spool.append(_item(i)) for i in range(20))
+    assert 0 < accepted < 20
+    assert spool.get_stats()["rejected"] == 20 - accepted
+
+
+def test_spool_ignores_torn_tail_and_recovers_on_restart(tmp_path):
+    spool = Spool(str(tmp_path), fsync="always")
+    for i in range(3):
+        spool.append(_item(i))
+    # Simulate a crash mid-write: the active segment is left open with a torn frame
+    spool._active.write(b"\x00\x00\x01\x00garbage")
+    spool._active.close()
+    # A previous process with our pid (e.g. before a container restart) left the file behind
+    spool_module._disown(spool._active_path)
+
+    restarted = Spool(str(tmp_path))
+    segment = restarted.claim()
+    assert segment is not None
+    assert [json.loads(item)["i"] for item in restarted.read(segment)] == [0, 1, 2]
+
+
+def test_second_spool_in_process_leaves_live_segments_alone(tmp_path):
+    first = Spool(str(tmp_path))
+    first.append(_item(0))
+    claimed = first.claim()
+    first.append(_item(1))
+    active = first._active_path
+
+    second = Spool(str(tmp_path))
+    assert os.path.exists(claimed) and os.path.exists(active)
+    second.append(_item(2))
+    assert second._active_path != active
+
+    first.release(claimed)
+    first.close()
+    second.close()
+    items = []
+    while True:
+        segment = second.claim()
+        if segment is None:
+            break
+        items += [json.loads(item)["i"] for item in second.read(segment)]
+        second.release(segment)
+    assert sorted(items) == [1, 2]
+
+
+class FlakyHttp:
+    def __init__(self):
+        self.available = False
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def post(self, endpoint, body, headers=None, deferrable=False):
+        body = _decode(body)
+        if not self.available:
+            raise XaseError("Max retries exceeded", "MAX_RETRIES")
+        with self.lock:
+            self.sent.append(body["input"]["i"])
+        return {"success": True, "transaction_id": "t"}
+
+
+def test_queue_spools_send_failures_and_replays(tmp_path):
+    http = FlakyHttp()
+    errors = []
+    spool = Spool(str(tmp_path))
+    q = Queue(http_client=http, max_size=100, on_error=errors.append, spool=spool,
+              replay_interval_s=0.05, replay_max_backoff_s=0.1)
+    for i in range(5):
+        q.enqueue(_payload(i))
+    q.flush(2.0)
+    assert http.sent == []
+    assert errors == []
+    assert q.get_stats()["spool"]["appended"] == 5
+
+    http.available = True
+    deadline = time.time() + 3.0
+    while len(http.sent) < 5 and time.time() < deadline:
+        time.sleep(0.02)
+    q.close()
+
+    assert sorted(http.sent) == list(range(5))
+    assert errors == []
+
+
+def test_queue_overflow_spills_to_spool(tmp_path):
+    http = FlakyHttp()
+    spool = Spool(str(tmp_path))
+    release = threading.Event()
+    blocking_post = http.post
+
+    def post(endpoint, body, headers=None, deferrable=False):
+        release.wait(2.0)  # hold the only worker so the queue fills up
+        return blocking_post(endpoint, body, headers)
+
+    http.post = post
+    q = Queue(http_client=http, max_size=2, spool=spool, replay_interval_s=10.0)
+    q.enqueue(_payload(0))
+    deadline = time.time() + 2.0
+    while q.get_stats()["workers"][0]["in_flight"] == 0 and time.time() < deadline:
+        time.sleep(0.005)
+    for i in range(1, 7):
+        q.enqueue(_payload(i))
+
+    assert q.get_stats()["size"] == 2
+    assert spool.get_stats()["appended"] == 4
+    release.set()
+    q.close()
+    assert any(name.endswith(".seg") for name in os.listdir(tmp_path))
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+
+# Generous for slow CI runners; eager imports of httpx/asyncio/torch blow well past it
+IMPORT_BUDGET_S = 0.25
+
+HEAVY_MODULES = (
+    "httpx",
+    "asyncio",
+    "torch",
+    "numpy",
+    "xase.training",
+    "xase.sidecar",
+    "xase.async_client",
+)
+
+
+def _run(code, *flags):
+    env = {**os.environ, "PYTHONPATH": SRC}
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def test_import_xase_skips_heavy_dependencies():
+    out = _run(f"import sys, xase; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])")
+    assert out.stdout.strip() == "[]"
+
+
+def test_import_xase_within_budget():
+    # -X importtime reports the cumulative microseconds of the top-level import
+    out = _run("import xase", "-X", "importtime")
+    line = [entry for entry in out.stderr.splitlines() if entry.rstrip().endswith("| xase")][-1]
+    cumulative_us = int(line.split("|")[1])
+    assert cumulative_us / 1e6 < IMPORT_BUDGET_S
+
+
+def test_lazy_attributes_resolve_on_access():
+    out = _run(
+        "import sys, xase; "
+        "from xase import SidecarClient, AsyncXaseClient, AsyncSidecarClient; "
+        "print(SidecarClient.__module__, AsyncXaseClient.__module__, "
+        "AsyncSidecarClient.__module__, 'SidecarDataset' in dir(xase))"
+    )
+    assert out.stdout.split() == ["xase.sidecar", "xase.async_client", "xase.async_sidecar", "True"]